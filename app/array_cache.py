@@ -0,0 +1,113 @@
+# app/array_cache.py
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+
+class NpyCache:
+    """
+    Anahtar -> .npy (+ .json meta) şeklinde disk cache'i.
+
+    - Okumalar np.load(mmap_mode="r") ile: dosya belleğe kopyalanmaz
+    - Yazma atomik (tmp + replace), yarım dosya kalmaz
+    - Toplam boyut max_bytes'ı aşınca en eski kullanılanlar (mtime) silinir
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return self.root / f"{key}.npy", self.root / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, Dict[str, Any]]]:
+        npy_path, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            arr = np.load(npy_path, mmap_mode="r")
+        except (FileNotFoundError, ValueError):
+            return None
+        # LRU için son kullanım zamanını güncelle
+        os.utime(npy_path)
+        return arr, meta
+
+    def tmp_path(self, key: str) -> Path:
+        """Dışarıda (ör. blok blok) yazılıp commit() ile eklenecek .npy için yol."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        return self.root / f"{key}.{os.getpid()}.tmp.npy"
+
+    def put(self, key: str, arr: np.ndarray, meta: Dict[str, Any]) -> np.ndarray:
+        tmp_npy = self.tmp_path(key)
+        np.save(tmp_npy, np.ascontiguousarray(arr))
+        return self.commit(key, tmp_npy, meta)
+
+    def commit(self, key: str, tmp_npy: Path, meta: Dict[str, Any]) -> np.ndarray:
+        npy_path, meta_path = self._paths(key)
+        tmp_npy.replace(npy_path)
+
+        tmp_meta = meta_path.with_name(f"{key}.{os.getpid()}.tmp.json")
+        tmp_meta.write_text(json.dumps(meta), encoding="utf-8")
+        tmp_meta.replace(meta_path)
+
+        self.evict(keep=key)
+        return np.load(npy_path, mmap_mode="r")
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        with self._lock:
+            evict_lru(self.root, "*.npy", self.max_bytes, keep=keep, companions=(".json",))
+
+
+def evict_lru(
+    root: Path,
+    pattern: str,
+    max_bytes: Optional[int] = None,
+    max_files: Optional[int] = None,
+    keep: Optional[str] = None,
+    companions: Iterable[str] = (),
+    stale_tmp_sec: Optional[float] = None,
+) -> int:
+    """
+    root/pattern dosyalarını mtime'a göre (en eski önce) siler; toplam boyut
+    max_bytes'a ve dosya sayısı max_files'a inene kadar. `keep` stem'li dosya
+    ve `.tmp.` içeren yarım yazımlar korunur; stale_tmp_sec verilirse bundan
+    eski yarım yazımlar (çökmüş yazıcılardan kalan) silinir. Silinen dosya
+    sayısını döndürür.
+    """
+    entries = []
+    total = 0
+    now = time.time()
+    for p in root.glob(pattern):
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        if ".tmp." in p.name:
+            if stale_tmp_sec is not None and now - st.st_mtime > stale_tmp_sec:
+                p.unlink(missing_ok=True)
+            continue
+        entries.append((st.st_mtime, st.st_size, p))
+        total += st.st_size
+
+    entries.sort()
+    count = len(entries)
+    removed = 0
+    for _, size, p in entries:
+        over_bytes = max_bytes is not None and total > max_bytes
+        over_files = max_files is not None and count > max_files
+        if not (over_bytes or over_files):
+            break
+        if p.stem == keep:
+            continue
+        p.unlink(missing_ok=True)
+        for suffix in companions:
+            p.with_suffix(suffix).unlink(missing_ok=True)
+        total -= size
+        count -= 1
+        removed += 1
+    return removed
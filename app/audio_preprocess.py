@@ -1,13 +1,75 @@
 # app/audio_preprocess.py
+import hashlib
+import heapq
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from itertools import chain, islice
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
+import numpy as np
+import soundfile as sf
 from pydub import AudioSegment
-
-from .config import VOICES_DIR, MIN_DURATION_SECONDS
+from pydub.utils import mediainfo
+
+from . import metrics
+from .array_cache import NpyCache
+from .block_preprocess import (
+    RCFilterChain,
+    Segment,
+    clean_file_to_npy,
+    energy,
+    gain_to_target,
+    mul_int16,
+    snap_segments,
+)
+from .config import (
+    VOICES_DIR,
+    MIN_DURATION_SECONDS,
+    DECODE_WORKERS,
+    CACHE_DIR,
+    CLEANED_CACHE_MAX_BYTES,
+    PREPROCESS_BLOCK_SEC,
+    REF_SCORE_MARGIN_DB,
+    REF_SELECTION,
+    REF_TARGET_SEC,
+    STREAM_PREPROCESS_MIN_SEC,
+)
+from .clean_cache import atomic_write_text
+from .fingerprint import file_sha256
+from .loudness import LoudnessIndex, samples_from_raw
 
 SUPPORTED_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".mp4")
 
+# Temizleme parametreleri (cache anahtarına da girer)
+HIGH_PASS_HZ = 80
+LOW_PASS_HZ = 8000
+TARGET_DBFS = -20.0
+TRIM_SILENCE_DBFS = -45.0
+TRIM_CHUNK_MS = 300
+
+# Temizleme zinciri değişirse bunu artır: eski cache kayıtları geçersiz olur
+# (2: temizlik ve skorlar dosya başına, 3: sessizliğe oturtulan parçalar)
+PREPROCESS_VERSION = 3
+
+# Dosya başına cache'lenen referans parçaları: ~8 sn, kesimler ızgaradan
+# en fazla SNAP_SEARCH_MS kayarak en sessiz 20 ms'lik çerçeveye oturur
+SEGMENT_MS = 8000
+SNAP_SEARCH_MS = 1500
+REF_FADE_MS = 30
+# voice klasöründe ref dosyası -> kaynak chunk eşlemesi (yerinde güncelleme için)
+REF_MANIFEST = "refs.json"
+
+_cleaned_cache = NpyCache(CACHE_DIR / "cleaned", CLEANED_CACHE_MAX_BYTES)
+
+
+@dataclass
+class ReferenceSegment:
+    path: Path
+    score: float
+    duration_sec: float
+
 
 def list_audio_files(person_dir: Path) -> List[Path]:
     """
@@ -29,20 +91,22 @@ def list_audio_files(person_dir: Path) -> List[Path]:
     return files
 
 
-def load_and_concat_files(files: List[Path], target_sr: int = 24000) -> AudioSegment:
-    """
-    Verilen dosyaları sırayla okuyup tek bir AudioSegment halinde birleştirir.
-    Hepsini mono + target_sr'e çevirir.
-    """
-    combined = None
-    for f in files:
-        seg = AudioSegment.from_file(f)
-        seg = seg.set_frame_rate(target_sr).set_channels(1)
-        if combined is None:
-            combined = seg
-        else:
-            combined += seg
-    return combined
+def probe_duration_sec(path: Path) -> float | None:
+    """ffprobe ile süreyi okur (decode etmeden). Okunamazsa None."""
+    try:
+        return float(mediainfo(str(path))["duration"])
+    except (KeyError, ValueError, OSError):
+        return None
+
+
+def decode_file(path: Path, target_sr: int = 24000) -> np.ndarray:
+    """Tek dosyayı mono / int16 / target_sr olarak decode eder."""
+    with metrics.span("decode", file=path.name) as sp:
+        seg = AudioSegment.from_file(path)
+        sp.set(audio_sec=seg.duration_seconds)
+    with metrics.span("resample", audio_sec=seg.duration_seconds, from_sr=seg.frame_rate, to_sr=target_sr):
+        seg = seg.set_frame_rate(target_sr).set_channels(1).set_sample_width(2)
+    return np.frombuffer(seg.raw_data, dtype=np.int16)
 
 
 def basic_denoise_and_normalize(audio: AudioSegment) -> AudioSegment:
@@ -52,154 +116,420 @@ def basic_denoise_and_normalize(audio: AudioSegment) -> AudioSegment:
     - Low-pass filter ile 8000 Hz üstünü kes (çok tiz gürültü)
     - dBFS seviyesini sabitle (ör: -20 dBFS civarı)
     """
-    audio = audio.high_pass_filter(80)
-    audio = audio.low_pass_filter(8000)
-
-    target_dbfs = -20.0
-    change_in_dbfs = target_dbfs - audio.dBFS
-    audio = audio.apply_gain(change_in_dbfs)
-
-    return audio
+    if audio.channels != 1 or audio.sample_width != 2:
+        with metrics.span("filter", audio_sec=audio.duration_seconds):
+            audio = audio.high_pass_filter(HIGH_PASS_HZ)
+            audio = audio.low_pass_filter(LOW_PASS_HZ)
+            return audio.apply_gain(TARGET_DBFS - audio.dBFS)
+
+    # Mono 16 bit: akışlı yol (block_preprocess) ile aynı filtre zinciri ve kazanç
+    with metrics.span("filter", audio_sec=audio.duration_seconds):
+        samples = samples_from_raw(audio.raw_data, audio.sample_width)
+        filtered = RCFilterChain(audio.frame_rate, HIGH_PASS_HZ, LOW_PASS_HZ).process(samples)
+        del samples
+        factor = gain_to_target(energy(filtered), len(filtered), TARGET_DBFS)
+        if factor is not None:
+            filtered = mul_int16(filtered, factor)
+        return audio._spawn(data=filtered.tobytes())
 
 
 def trim_leading_trailing_silence(
     audio: AudioSegment,
-    silence_thresh_dbfs: float = -45.0,
-    chunk_ms: int = 300,
+    silence_thresh_dbfs: float = TRIM_SILENCE_DBFS,
+    chunk_ms: int = TRIM_CHUNK_MS,
+    loudness: LoudnessIndex | None = None,
 ) -> AudioSegment:
     """
     Baş ve sondaki uzun sessizlikleri kırpar.
+    Hazır bir LoudnessIndex verilirse ses tekrar taranmaz.
     """
     if len(audio) <= chunk_ms:
         return audio
 
-    # Baştan
-    start_ms = 0
-    while start_ms + chunk_ms < len(audio):
-        chunk = audio[start_ms:start_ms + chunk_ms]
-        if chunk.dBFS > silence_thresh_dbfs:
-            break
-        start_ms += chunk_ms
+    with metrics.span("trim", audio_sec=audio.duration_seconds):
+        if loudness is None:
+            loudness = LoudnessIndex.from_segment(audio)
+        start_ms, end_ms = loudness.trim_bounds(silence_thresh_dbfs, chunk_ms)
+        return audio[start_ms:end_ms]
+
+
+@dataclass
+class CleanedAudio:
+    """Denoise + normalize + trim edilmiş kayıt (genelde cache'ten memmap)."""
+    samples: np.ndarray        # int16, mono
+    sample_rate: int
+    cache_key: str
+
+    @property
+    def duration_sec(self) -> float:
+        return len(self.samples) / float(self.sample_rate)
+
+    def to_segment(self) -> AudioSegment:
+        return AudioSegment(
+            data=np.ascontiguousarray(self.samples).tobytes(),
+            sample_width=2,
+            frame_rate=self.sample_rate,
+            channels=1,
+        )
 
-    # Sondan
-    end_ms = len(audio)
-    while end_ms - chunk_ms > start_ms + chunk_ms:
-        chunk = audio[end_ms - chunk_ms:end_ms]
-        if chunk.dBFS > silence_thresh_dbfs:
-            break
-        end_ms -= chunk_ms
 
-    return audio[start_ms:end_ms]
+def _file_cache_key(sha256: str, target_sr: int) -> str:
+    h = hashlib.sha256()
+    for item in (
+        sha256, "cleaned_file", PREPROCESS_VERSION, target_sr, HIGH_PASS_HZ,
+        LOW_PASS_HZ, TARGET_DBFS, TRIM_SILENCE_DBFS, TRIM_CHUNK_MS, SEGMENT_MS, SNAP_SEARCH_MS,
+    ):
+        h.update(repr(item).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
 
+@dataclass
+class CleanedFile:
+    """Tek kaynak dosyanın temizlenmiş hali + SEGMENT_MS'lik skorlu parçaları."""
+    path: Path
+    sha256: str
+    samples: np.ndarray        # int16, mono (cache'ten memmap)
+    sample_rate: int
+    cache_key: str
+    segments: List[Segment]
 
-def split_into_chunks(audio: AudioSegment, chunk_ms: int) -> List[AudioSegment]:
-    chunks = []
-    for start in range(0, len(audio), chunk_ms):
-        end = min(start + chunk_ms, len(audio))
-        chunks.append(audio[start:end])
-    return chunks
+    @property
+    def duration_sec(self) -> float:
+        return len(self.samples) / float(self.sample_rate)
 
+    def segments_for(self, segment_ms: int) -> List[Segment]:
+        if segment_ms == SEGMENT_MS:
+            return self.segments
+        return _segments(self.samples, self.sample_rate, segment_ms)
 
-def compute_speech_score(
-    chunk: AudioSegment,
-    silence_threshold_dbfs: float = -45.0,
-    frame_ms: int = 200,
-) -> float | None:
+
+def _segments(samples: np.ndarray, sample_rate: int, segment_ms: int = SEGMENT_MS) -> List[Segment]:
+    search_ms = min(SNAP_SEARCH_MS, segment_ms // 4)
+    return snap_segments(lambda a, b: samples[a:b], len(samples), sample_rate, segment_ms, search_ms)
+
+
+def _source_duration_sec(path: Path) -> float | None:
+    try:
+        return float(sf.info(str(path)).duration)
+    except RuntimeError:
+        return probe_duration_sec(path)
+
+
+def clean_file(path: Path, target_sr: int = 24000) -> Tuple[np.ndarray, List[Segment]]:
     """
-    Bir chunk için 'konuşma skorunu' hesaplar.
-    - Çok sessizse None döner
-    - Orta-yüksek enerji + düşük sessizlik oranı = yüksek skor
+    Tek dosya: decode -> denoise/normalize -> trim -> skorlu parçalar.
+    Dosyalar birbirinden bağımsız temizlenir; klasöre yeni kayıt eklenince
+    sadece o dosya işlenir (process havuzunda çalışabilsin diye modül seviyesinde).
     """
-    if len(chunk) < frame_ms:
-        return None
+    raw = decode_file(path, target_sr=target_sr)
+    audio = AudioSegment(data=raw.tobytes(), sample_width=2, frame_rate=target_sr, channels=1)
+    del raw
+    cleaned = basic_denoise_and_normalize(audio)
+    del audio
+    cleaned = trim_leading_trailing_silence(cleaned)
+    samples = samples_from_raw(cleaned.raw_data, cleaned.sample_width)
+    with metrics.span("score", audio_sec=len(samples) / target_sr):
+        segments = _segments(samples, target_sr)
+    return samples, segments
+
+
+def load_cleaned_files(
+    files: List[Path],
+    target_sr: int = 24000,
+    known_sha256: Optional[Dict[str, str]] = None,
+    workers: int | None = None,
+) -> List[CleanedFile]:
+    """
+    Her dosyanın temizlenmiş halini ve chunk skorlarını döndürür.
+    Sonuçlar dosya içeriği (sha256) + parametrelerle CACHE_DIR/cleaned altında
+    saklanır; sadece yeni / değişmiş dosyalar decode edilip filtrelenir.
+    `known_sha256` (dosya adı -> özet) verilirse o dosyalar tekrar hash'lenmez
+    (bkz. fingerprint.refresh_fingerprints).
+    """
+    if workers is None:
+        workers = DECODE_WORKERS
+    known_sha256 = known_sha256 or {}
+
+    out: List[Optional[CleanedFile]] = [None] * len(files)
+    todo: List[Tuple[int, str, str]] = []
+    for i, f in enumerate(files):
+        sha = known_sha256.get(f.name) or file_sha256(f)
+        key = _file_cache_key(sha, target_sr)
+        hit = _cleaned_cache.get(key)
+        if hit is None:
+            todo.append((i, sha, key))
+            continue
+        samples, meta = hit
+        segments = [tuple(s) for s in meta["segments"]]
+        out[i] = CleanedFile(f, sha, samples, int(meta["sample_rate"]), key, segments)
+    if len(todo) < len(files):
+        print(f"[INFO] Temizlenmiş ses cache'ten: {len(files) - len(todo)}/{len(files)} dosya")
+
+    # Uzun kayıtlar blok blok temizlenip doğrudan cache dosyasına yazılır;
+    # sırayla: bellek tavanı aynı anda işlenen dosya sayısıyla çarpılmasın
+    streamed = [t for t in todo if (_source_duration_sec(files[t[0]]) or 0.0) > STREAM_PREPROCESS_MIN_SEC]
+    for i, sha, key in streamed:
+        tmp = _cleaned_cache.tmp_path(key)
+        n, segments = clean_file_to_npy(
+            files[i], tmp, target_sr, HIGH_PASS_HZ, LOW_PASS_HZ, TARGET_DBFS, TRIM_SILENCE_DBFS,
+            TRIM_CHUNK_MS, SEGMENT_MS, SNAP_SEARCH_MS, block_sec=PREPROCESS_BLOCK_SEC,
+        )
+        stored = _cleaned_cache.commit(
+            key, tmp, {"sample_rate": target_sr, "file": files[i].name, "segments": segments}
+        )
+        out[i] = CleanedFile(files[i], sha, stored, target_sr, key, segments)
+        print(f"[INFO] Akışlı temizlendi: {files[i].name} ({n / target_sr:.1f} sn)")
+    todo = [t for t in todo if t not in streamed]
 
-    frames = []
-    for start in range(0, len(chunk), frame_ms):
-        end = min(start + frame_ms, len(chunk))
-        frame = chunk[start:end]
-        frames.append(frame)
+    def store(i: int, sha: str, key: str, samples: np.ndarray, segments: List[Segment]) -> None:
+        stored = _cleaned_cache.put(
+            key, samples, {"sample_rate": target_sr, "file": files[i].name, "segments": segments}
+        )
+        out[i] = CleanedFile(files[i], sha, stored, target_sr, key, segments)
+        done = sum(c is not None for c in out)
+        print(f"[{done}/{len(files)}] temizlendi: {files[i].name} ({len(samples) / target_sr:.1f} sn)")
+
+    if workers <= 1 or len(todo) <= 1:
+        for i, sha, key in todo:
+            store(i, sha, key, *clean_file(files[i], target_sr))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as ex:
+            futures = {ex.submit(clean_file, files[i], target_sr): (i, sha, key) for i, sha, key in todo}
+            for fut in as_completed(futures):
+                store(*futures[fut], *fut.result())
+
+    return out  # type: ignore[return-value]
+
+
+def load_cleaned_audio(
+    files: List[Path],
+    target_sr: int = 24000,
+    known_sha256: Optional[Dict[str, str]] = None,
+) -> CleanedAudio:
+    """
+    Dosyaların temizlenmiş hallerini (load_cleaned_files) sırayla tek kayıtta
+    birleştirir. Tek dosyada cache'teki memmap doğrudan döner.
+    """
+    parts = load_cleaned_files(files, target_sr, known_sha256)
+    key = hashlib.sha256("".join(c.cache_key for c in parts).encode("ascii")).hexdigest()
+    if len(parts) == 1:
+        return CleanedAudio(parts[0].samples, target_sr, key)
 
-    if not frames:
-        return None
+    buf = np.empty(sum(len(c.samples) for c in parts), dtype=np.int16)
+    pos = 0
+    for c in parts:
+        buf[pos:pos + len(c.samples)] = c.samples
+        pos += len(c.samples)
+    return CleanedAudio(buf, target_sr, key)
 
-    silent_frames = 0
-    loudness_values = []
 
-    for fr in frames:
-        loud = fr.dBFS
-        loudness_values.append(loud)
-        if loud < silence_threshold_dbfs:
-            silent_frames += 1
+def slice_ms(samples: np.ndarray, sample_rate: int, start_ms: int, end_ms: int) -> np.ndarray:
+    """
+    AudioSegment[start_ms:end_ms] karşılığı, kopyasız view döndürür.
+    Sınırlar kayıt sonuna kırpılır (pydub'daki <=2 ms sessizlik dolgusu yapılmaz).
+    """
+    start = int(max(start_ms, 0) * (sample_rate / 1000.0))
+    end = int(max(end_ms, 0) * (sample_rate / 1000.0))
+    return samples[min(start, len(samples)):min(end, len(samples))]
 
-    avg_loudness = sum(loudness_values) / len(loudness_values)
-    silence_ratio = silent_frames / len(frames)
 
-    if silence_ratio > 0.7:
-        # %70'ten fazlası sessizlikse konuşma sayma
-        return None
+def fade_gains(sample_rate: int, fade_ms: int, fade_in: bool) -> np.ndarray:
+    """
+    pydub'ın kısa (<= 100 ms) fade_in/fade_out'unun örnek başına kazanç rampası.
+    -120 dB'den 0 dB'e (fade_in) ya da tersine (fade_out), pydub ile aynı aritmetik.
+    """
+    floor_gain = 10 ** (-120.0 / 20)
+    from_power = floor_gain if fade_in else 1.0
+    gain_delta = (1.0 if fade_in else floor_gain) - from_power
+    n = fade_ms * (sample_rate / 1000.0)
+    return from_power + (gain_delta / n) * np.arange(int(n), dtype=np.float64)
+
 
-    # Skor: daha yüksek ses + daha az sessizlik daha iyi
-    score = avg_loudness - silence_ratio * 20.0
-    return float(score)
+_apply_gain = mul_int16
 
 
-def save_wav(audio: AudioSegment, out_path: Path) -> Path:
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    audio.export(out_path, format="wav")
+def faded_parts(
+    samples: np.ndarray,
+    fade_in_gains: np.ndarray,
+    fade_out_gains: np.ndarray,
+) -> List[np.ndarray]:
+    """
+    seg.fade_in(x).fade_out(x) sonucunu [baş, gövde, kuyruk] parçaları olarak verir.
+    Gövde orijinal dizinin view'ıdır; sadece kenarlardaki birkaç yüz örnek kopyalanır.
+    """
+    n_in, n_out = len(fade_in_gains), len(fade_out_gains)
+    if len(samples) < n_in + n_out:
+        # Kenarlar çakışıyor: iki fade'i sırayla uygula
+        out = samples.copy()
+        k = min(n_in, len(out))
+        out[:k] = _apply_gain(out[:k], fade_in_gains[:k])
+        k = min(n_out, len(out))
+        out[len(out) - k:] = _apply_gain(out[len(out) - k:], fade_out_gains[:k])
+        return [out]
+    return [
+        _apply_gain(samples[:n_in], fade_in_gains),
+        samples[n_in:len(samples) - n_out],
+        _apply_gain(samples[len(samples) - n_out:], fade_out_gains),
+    ]
+
+
+def write_wav_parts(parts: List[np.ndarray], sample_rate: int, out_path: Path) -> Path:
+    """int16 parçaları birleştirmeden tek bir 16 bit mono WAV'a yazar."""
+    with sf.SoundFile(
+        str(out_path), "w", samplerate=sample_rate, channels=1, subtype="PCM_16"
+    ) as f:
+        for part in parts:
+            f.write(part)
     return out_path
 
 
+def _read_ref_manifest(voice_dir: Path) -> Dict[str, str]:
+    try:
+        return json.loads((voice_dir / REF_MANIFEST).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+# (skor, dosya sırası, parça sırası, start_ms, end_ms)
+_Candidate = Tuple[float, int, int, int, int]
+
+
+def select_references(
+    ranked: Iterator[_Candidate],
+    mode: str = REF_SELECTION,
+    max_segments: int = 12,
+    target_sec: float = REF_TARGET_SEC,
+    score_margin_db: float = REF_SCORE_MARGIN_DB,
+) -> List[_Candidate]:
+    """
+    Skora göre azalan sırada gelen adaylardan referansları seçer.
+
+    - "top_n": en iyi max_segments parça
+    - "min_duration": en iyi skora score_margin_db yakın adaylar arasından
+      toplamı target_sec'i karşılayan en az sayıda parça (uzundan kısaya);
+      yetmezse sıradaki en iyi skorlularla tamamlanır
+
+    Dönüş skora göre azalan sırada (latent anahtarı seçim sırasından bağımsız).
+    """
+    if mode == "top_n":
+        return list(islice(ranked, max_segments))
+    if mode != "min_duration":
+        raise ValueError(f"Bilinmeyen referans seçim modu: {mode}")
+
+    first = next(ranked, None)
+    if first is None:
+        return []
+    good = [first]
+    rest: Iterator[_Candidate] = ranked
+    for cand in ranked:
+        if cand[0] < first[0] - score_margin_db:
+            rest = chain([cand], ranked)
+            break
+        good.append(cand)
+
+    target_ms = target_sec * 1000
+    chosen: List[_Candidate] = []
+    total_ms = 0
+    for cand in sorted(good, key=lambda c: (c[4] - c[3], c[0]), reverse=True):
+        if total_ms >= target_ms or len(chosen) >= max_segments:
+            break
+        chosen.append(cand)
+        total_ms += cand[4] - cand[3]
+    for cand in rest:
+        if total_ms >= target_ms or len(chosen) >= max_segments:
+            break
+        chosen.append(cand)
+        total_ms += cand[4] - cand[3]
+
+    return sorted(chosen, key=lambda c: c[0], reverse=True)
+
+
+@metrics.traced("extract_speaker_segments")
 def extract_speaker_segments(
     person_dir: Path,
     voice_id: str,
     segment_sec: float = 8.0,
     max_segments: int = 12,
-) -> Tuple[List[Path], float]:
+    known_sha256: Optional[Dict[str, str]] = None,
+    selection: str = REF_SELECTION,
+    target_sec: float = REF_TARGET_SEC,
+) -> Tuple[List[ReferenceSegment], float]:
     """
     Aynı kişiye ait klasördeki tüm sesleri:
-    1) Birleştirir
-    2) Denoise + normalize + baş/son sessizliği kırpar
-    3) 8s'lik chunk'lara böler
-    4) Her chunk için 'konuşma skoru' hesaplar
-    5) En iyi N chunk'ı ref_01.wav, ref_02.wav... olarak kaydeder
+    1) Dosya dosya denoise + normalize + baş/son sessizliği kırpar (cache'li)
+    2) ~8s'lik parçalara böler (kesimler sessiz çerçevelere oturur), her
+       parça için 'konuşma skoru' hesaplar
+    3) Dosyaların skor listelerini heap ile birleştirip referansları seçer
+       (select_references: en iyi N ya da hedef süreye yeten en az parça)
+    4) ref_01.wav, ref_02.wav... olarak kaydeder
+
+    Aynı voice_id ile tekrar çağrılırsa referanslar yerinde güncellenir:
+    içeriği değişmeyen ref dosyasına dokunulmaz (refs.json), fazlası silinir.
+    Böylece latent / çıktı cache'leri (içerik anahtarlı) sadece referanslar
+    gerçekten değiştiğinde geçersiz olur.
     """
     files = list_audio_files(person_dir)
-    combined = load_and_concat_files(files, target_sr=24000)
+    cleaned = load_cleaned_files(files, target_sr=24000, known_sha256=known_sha256)
 
-    cleaned = basic_denoise_and_normalize(combined)
-    cleaned = trim_leading_trailing_silence(cleaned)
-
-    duration_sec = len(cleaned) / 1000.0
+    duration_sec = sum(c.duration_sec for c in cleaned)
     if duration_sec < MIN_DURATION_SECONDS:
         raise ValueError(
             f"Toplam süre çok kısa ({duration_sec:.2f} sn). "
             f"En az {MIN_DURATION_SECONDS} sn olmalı."
         )
 
-    chunk_ms = int(segment_sec * 1000)
-    chunks = split_into_chunks(cleaned, chunk_ms=chunk_ms)
-
-    scored_chunks: List[tuple[float, int, AudioSegment]] = []
-    for idx, ch in enumerate(chunks):
-        score = compute_speech_score(ch)
-        if score is None:
-            continue
-        scored_chunks.append((score, idx, ch))
+    # Her dosyanın skorları kendi içinde azalan sırada; heapq.merge ile
+    # tüm dosyalar tek seferde sıralanmadan skor sırasıyla okunur
+    segment_ms = int(segment_sec * 1000)
+    per_file = []
+    for file_idx, c in enumerate(cleaned):
+        ranked = sorted(
+            (
+                (score, file_idx, idx, start, end)
+                for idx, (start, end, score) in enumerate(c.segments_for(segment_ms))
+                if score is not None
+            ),
+            key=lambda x: x[0],
+            reverse=True,
+        )
+        per_file.append(ranked)
+    merged = heapq.merge(*per_file, key=lambda x: x[0], reverse=True)
+    top = select_references(merged, selection, max_segments, target_sec)
 
-    if not scored_chunks:
+    if not top:
         raise RuntimeError("Konuşma içeren uygun segment bulunamadı.")
 
-    # Skora göre sırala, en iyileri al
-    scored_chunks.sort(key=lambda x: x[0], reverse=True)
-    top = scored_chunks[:max_segments]
-
     voice_dir = VOICES_DIR / voice_id
-    ref_paths: List[Path] = []
-
-    for rank, (score, idx, ch) in enumerate(top, start=1):
-        seg = ch.fade_in(30).fade_out(30)
-        ref_path = voice_dir / f"ref_{rank:02d}.wav"
-        save_wav(seg, ref_path)
-        ref_paths.append(ref_path)
-
-    return ref_paths, duration_sec
+    voice_dir.mkdir(parents=True, exist_ok=True)
+    previous = _read_ref_manifest(voice_dir)
+    manifest: Dict[str, str] = {}
+    refs: List[ReferenceSegment] = []
+    sr = 24000
+    fade_in = fade_gains(sr, REF_FADE_MS, fade_in=True)
+    fade_out = fade_gains(sr, REF_FADE_MS, fade_in=False)
+
+    with metrics.span("export_refs", files=len(top)) as sp:
+        written = 0
+        for rank, (score, file_idx, idx, start_ms, end_ms) in enumerate(top, start=1):
+            c = cleaned[file_idx]
+            ref_path = voice_dir / f"ref_{rank:02d}.wav"
+            chunk = slice_ms(c.samples, c.sample_rate, start_ms, end_ms)
+            source = f"{c.cache_key}:{start_ms}-{end_ms}"
+            if previous.get(ref_path.name) != source or not ref_path.exists():
+                write_wav_parts(faded_parts(chunk, fade_in, fade_out), c.sample_rate, ref_path)
+                written += 1
+            manifest[ref_path.name] = source
+            refs.append(ReferenceSegment(ref_path, score, len(chunk) / c.sample_rate))
+        sp.set(audio_sec=sum(r.duration_sec for r in refs), written=written)
+
+    for stale in voice_dir.glob("ref_*.wav"):
+        if stale.name not in manifest:
+            stale.unlink(missing_ok=True)
+    atomic_write_text(voice_dir / REF_MANIFEST, json.dumps(manifest, indent=2))
+    ref_sec = sum(r.duration_sec for r in refs)
+    print(f"[INFO] {len(refs)} referans ({ref_sec:.1f} sn, seçim: {selection})")
+    if previous:
+        print(f"[INFO] Referanslar güncellendi: {written}/{len(refs)} dosya yeniden yazıldı")
+
+    return refs, duration_sec
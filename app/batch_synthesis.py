@@ -0,0 +1,190 @@
+# app/batch_synthesis.py
+import json
+import shutil
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+import soundfile as sf
+
+from .pipeline import VOICE_REGISTRY, prepare_tts_text
+from .speaker_latents import get_speaker_latents
+from .tts_engine import synthesize_with_latents
+
+JOURNAL_NAME = "batch_journal.jsonl"
+
+
+@dataclass
+class BatchJob:
+    voice_id: str
+    text: str
+    language: str
+    output_name: str
+
+    @property
+    def dedupe_key(self) -> Tuple[str, str, str]:
+        return self.voice_id, " ".join(self.text.split()), self.language
+
+
+@dataclass
+class BatchReport:
+    jobs: int = 0
+    rendered: int = 0        # gerçekten inference yapılan
+    deduplicated: int = 0    # aynı metnin kopyası olarak yazılan
+    resumed: int = 0         # önceki çalıştırmada bitmiş, atlanan
+    failed: int = 0
+    wall_sec: float = 0.0
+    synth_sec: float = 0.0   # sadece inference süresi (worker'lar toplamı)
+    audio_sec: float = 0.0   # üretilen toplam ses
+
+    @property
+    def jobs_per_sec(self) -> float:
+        done = self.rendered + self.deduplicated
+        return done / self.wall_sec if self.wall_sec > 0 else 0.0
+
+    @property
+    def real_time_factor(self) -> float:
+        return self.synth_sec / self.audio_sec if self.audio_sec > 0 else 0.0
+
+
+def read_manifest(path: Path) -> List[BatchJob]:
+    """
+    Manifest formatı (metadata.csv gibi '|' ayraçlı, metin en sonda):
+        voice_id|language|output_name|text
+    Boş satırlar ve '#' ile başlayan satırlar atlanır. Aynı output_name iki
+    kez geçerse (biri diğerinin üzerine yazacağı için) ValueError.
+    """
+    jobs: List[BatchJob] = []
+    seen: Dict[str, int] = {}
+    for lineno, line in enumerate(path.read_text(encoding="utf-8").splitlines(), start=1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        parts = line.split("|", 3)
+        if len(parts) != 4:
+            raise ValueError(f"{path}:{lineno}: 'voice_id|language|output_name|text' bekleniyordu")
+        voice_id, language, output_name, text = (p.strip() for p in parts)
+        job = BatchJob(voice_id, text, language or "tr", output_name)
+        name = _output_name(job)
+        if name in seen:
+            raise ValueError(f"{path}:{lineno}: output_name '{name}' {seen[name]}. satırda da var")
+        seen[name] = lineno
+        jobs.append(job)
+    return jobs
+
+
+def _output_name(job: BatchJob) -> str:
+    return job.output_name if job.output_name.endswith(".wav") else f"{job.output_name}.wav"
+
+
+def _output_path(out_dir: Path, job: BatchJob) -> Path:
+    return out_dir / _output_name(job)
+
+
+def _load_journal(journal_path: Path) -> Set[str]:
+    done: Set[str] = set()
+    if not journal_path.exists():
+        return done
+    for line in journal_path.read_text(encoding="utf-8").splitlines():
+        try:
+            done.add(json.loads(line)["output"])
+        except (ValueError, KeyError):
+            continue  # yarım yazılmış son satır
+    return done
+
+
+def synthesize_batch(
+    jobs: List[BatchJob],
+    out_dir: Path,
+    workers: int = 1,
+    resume: bool = True,
+) -> BatchReport:
+    """
+    Çok sayıda metni toplu okutur.
+
+    - İşler voice_id'ye göre gruplanır: latent'ler voice başına bir kez hazırlanır
+    - Aynı (voice, metin, dil) tekrar render edilmez, ilk çıktı kopyalanır
+    - Her biten çıktı out_dir/batch_journal.jsonl'a yazılır; resume=True ise
+      yarıda kalan bir çalıştırma kaldığı yerden devam eder
+    - workers > 1: aynı voice'un işleri thread havuzunda paralel çalışır
+    - Aynı output_name'li iki iş birbirinin üzerine yazacağı için ValueError
+    """
+    counts = Counter(_output_name(job) for job in jobs)
+    duplicates = sorted(n for n, c in counts.items() if c > 1)
+    if duplicates:
+        raise ValueError(f"Aynı output_name birden fazla işte: {', '.join(duplicates)}")
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    journal_path = out_dir / JOURNAL_NAME
+    done = _load_journal(journal_path) if resume else set()
+
+    report = BatchReport(jobs=len(jobs))
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    # voice_id -> dedupe_key -> [job, ...] (manifest sırası korunur)
+    groups: Dict[str, Dict[Tuple[str, str, str], List[BatchJob]]] = {}
+    for job in jobs:
+        out_path = _output_path(out_dir, job)
+        if out_path.name in done and out_path.exists():
+            report.resumed += 1
+            continue
+        groups.setdefault(job.voice_id, {}).setdefault(job.dedupe_key, []).append(job)
+
+    with journal_path.open("a", encoding="utf-8") as journal:
+
+        def record(out_path: Path, audio_sec: float, synth_sec: float, copied: bool) -> None:
+            with lock:
+                journal.write(json.dumps({"output": out_path.name, "audio_sec": audio_sec}) + "\n")
+                journal.flush()
+                report.audio_sec += audio_sec
+                if copied:
+                    report.deduplicated += 1
+                else:
+                    report.rendered += 1
+                    report.synth_sec += synth_sec
+
+        def render(latents, same_text: List[BatchJob]) -> None:
+            first = same_text[0]
+            first_path = _output_path(out_dir, first)
+            try:
+                t0 = time.perf_counter()
+                text = prepare_tts_text(first.text, first.language)
+                synthesize_with_latents(text, latents, first_path, first.language)
+                synth_sec = time.perf_counter() - t0
+            except Exception as e:
+                print(f"[WARN] {first.output_name} üretilemedi: {e}")
+                with lock:
+                    report.failed += len(same_text)
+                return
+
+            audio_sec = sf.info(str(first_path)).duration
+            record(first_path, audio_sec, synth_sec, copied=False)
+            for dup in same_text[1:]:
+                dup_path = _output_path(out_dir, dup)
+                shutil.copyfile(first_path, dup_path)
+                record(dup_path, audio_sec, 0.0, copied=True)
+
+        for voice_id, by_text in groups.items():
+            profile = VOICE_REGISTRY.get(voice_id)
+            if profile is None:
+                n = sum(len(v) for v in by_text.values())
+                print(f"[WARN] Geçersiz voice_id, {n} iş atlandı: {voice_id}")
+                report.failed += n
+                continue
+
+            print(f"[INFO] Voice {voice_id}: {len(by_text)} benzersiz metin")
+            latents = get_speaker_latents(profile.voice_id, profile.speaker_wav_paths)
+
+            if workers <= 1:
+                for same_text in by_text.values():
+                    render(latents, same_text)
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as ex:
+                    list(ex.map(lambda group: render(latents, group), by_text.values()))
+
+    report.wall_sec = time.perf_counter() - started
+    return report
@@ -0,0 +1,423 @@
+# app/block_preprocess.py
+"""
+Sabit bellekli (blok blok) temizlik yapı taşları.
+
+Saatlerce süren tek bir kaydı belleğe almadan temizlemek için:
+
+    1. geçiş: decode -> (ratecv / tomono) -> high-pass -> low-pass
+              filtre çıktısı geçici ham dosyaya, karesel toplam sayaçta
+    2. kazanç: toplam enerjiden tek bir dBFS -> hedef kazanç
+    trim    : baştan ve sondan pencere pencere, kazanç anında uygulanarak
+    3. geçiş: [trim] aralığı kazançla .npy'ye yazılır
+    parçalar: kesimler sessiz çerçevelere oturtulur, skorlar blok blok
+
+Filtreler pydub'ın RC filtreleriyle aynı özyinelemedir, durumu bloklar
+arasında taşınır; bu yüzden blok boyundan bağımsız olarak tüm dizi tek
+blokta işlenmiş gibi aynı örnekleri verir. basic_denoise_and_normalize de
+aynı zinciri kullanır: akışlı ve bellek içi yol birebir aynı sonucu üretir.
+
+Parametreler (kesim frekansları, hedef dBFS...) çağırandan gelir; politika
+audio_preprocess'te.
+"""
+import math
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from . import metrics
+from .loudness import LoudnessIndex
+
+try:
+    import audioop
+except ImportError:  # Python 3.13+: pydub'ın kullandığı saf Python yedeği
+    import pyaudioop as audioop
+
+_INT16_MAX_AMPLITUDE = 32768.0
+
+
+def mul_int16(samples: np.ndarray, gains) -> np.ndarray:
+    # audioop.mul ile aynı: aşağı yuvarla, int16 sınırlarına kırp
+    out = np.floor(samples.astype(np.float64) * gains)
+    out[out > 32767] = 32767
+    out[out < -32767] = -32768
+    return out.astype(np.int16)
+
+
+class RCFilterChain:
+    """
+    pydub `high_pass_filter(hp_hz)` ardından `low_pass_filter(lp_hz)`
+    (mono, 16 bit). process() ardışık bloklarla çağrılır; filtre durumu
+    (float) bloklar arasında korunur.
+
+    pydub'daki Python döngüsüyle aynı özyineleme, ama scipy.signal.lfilter
+    ile (~1000x hızlı). Denemelerde çıktı pydub ile birebir; kayan nokta
+    işlem sırası farklı olduğundan nadiren 1 LSB fark teorik olarak mümkün.
+    """
+
+    def __init__(self, sample_rate: int, high_pass_hz: float, low_pass_hz: float):
+        dt = 1.0 / sample_rate
+        rc = 1.0 / (high_pass_hz * 2 * math.pi)
+        self.hp_alpha = rc / (rc + dt)
+        rc = 1.0 / (low_pass_hz * 2 * math.pi)
+        self.lp_alpha = dt / (rc + dt)
+        self._hp_zi: Optional[np.ndarray] = None
+        self._lp_zi: Optional[np.ndarray] = None
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        # scipy.signal ~1 sn import süresi: app.pipeline importunu yavaşlatmasın
+        from scipy.signal import lfilter
+
+        if len(block) == 0:
+            return np.zeros(0, dtype=np.int16)
+        x = block.astype(np.float64)
+
+        # high-pass: y[n] = a * (y[n-1] + x[n] - x[n-1]); pydub'da y[0] = x[0]
+        a = self.hp_alpha
+        if self._hp_zi is None:
+            hp = np.empty_like(x)
+            hp[0] = x[0]
+            hp[1:], self._hp_zi = lfilter([a, -a], [1.0, -a], x[1:], zi=[0.0])
+        else:
+            hp, self._hp_zi = lfilter([a, -a], [1.0, -a], x, zi=self._hp_zi)
+        # pydub: int(min(max(y, minval), maxval)) -> sıfıra doğru kes
+        hp = np.trunc(np.clip(hp, -32768.0, 32767.0))
+
+        # low-pass: y[n] = y[n-1] + a * (x[n] - y[n-1]); y[0] = x[0]
+        a = self.lp_alpha
+        if self._lp_zi is None:
+            lp = np.empty_like(hp)
+            lp[0] = hp[0]
+            lp[1:], self._lp_zi = lfilter([a], [1.0, a - 1.0], hp[1:], zi=[(1.0 - a) * hp[0]])
+        else:
+            lp, self._lp_zi = lfilter([a], [1.0, a - 1.0], hp, zi=self._lp_zi)
+        return np.trunc(lp).astype(np.int16)
+
+
+def energy(samples: np.ndarray) -> int:
+    s = samples.astype(np.int64)
+    return int(np.dot(s, s))
+
+
+def gain_to_target(sum_squares: int, n_samples: int, target_dbfs: float) -> Optional[float]:
+    """
+    `audio.apply_gain(target_dbfs - audio.dBFS)`'in çarpanı (sessiz kayıtta None).
+    audioop.rms gibi: int(sqrt(toplam / n)); toplam burada tam sayı.
+    """
+    if n_samples == 0:
+        return None
+    rms = int(math.sqrt(sum_squares / n_samples))
+    if rms == 0:
+        return None
+    dbfs = 20 * math.log(rms / _INT16_MAX_AMPLITUDE, 10)
+    return 10 ** ((target_dbfs - dbfs) / 20)
+
+
+# --- decode ---
+
+def _to_mono_target(
+    data: bytes,
+    channels: int,
+    in_sr: int,
+    target_sr: int,
+    state,
+) -> Tuple[np.ndarray, object]:
+    """decode_file ile aynı sıra: set_frame_rate -> set_channels(1), 16 bit."""
+    if in_sr != target_sr:
+        data, state = audioop.ratecv(data, 2, channels, in_sr, target_sr, state)
+    if channels == 2:
+        data = audioop.tomono(data, 2, 0.5, 0.5)
+    elif channels > 2:
+        # pydub: her kanal // kanal sayısı, toplanır
+        frames = np.frombuffer(data, dtype=np.int16).reshape(-1, channels).astype(np.int32)
+        return (frames // channels).sum(axis=1).astype(np.int16), state
+    return np.frombuffer(data, dtype=np.int16), state
+
+
+def _read_exact(stream: BinaryIO, n: int) -> bytes:
+    parts, got = [], 0
+    while got < n:
+        chunk = stream.read(n - got)
+        if not chunk:
+            break
+        parts.append(chunk)
+        got += len(chunk)
+    return b"".join(parts)
+
+
+def iter_decoded_blocks(path: Path, target_sr: int, block_frames: int) -> Iterator[np.ndarray]:
+    """
+    Dosyayı mono / int16 / target_sr bloklar halinde verir.
+    libsndfile'ın açabildiği formatlar doğrudan, diğerleri ffmpeg borusuyla
+    okunur. 16 bit PCM kaynaklarda çıktı decode_file ile birebir aynıdır
+    (ratecv durumu bloklar arasında taşınır).
+    """
+    try:
+        f = sf.SoundFile(str(path))
+    except RuntimeError:
+        yield from _iter_ffmpeg_blocks(path, target_sr, block_frames)
+        return
+
+    state = None
+    with f:
+        for block in f.blocks(blocksize=block_frames, dtype="int16", always_2d=True):
+            samples, state = _to_mono_target(block.tobytes(), f.channels, f.samplerate, target_sr, state)
+            yield samples
+
+
+def _iter_ffmpeg_blocks(path: Path, target_sr: int, block_frames: int) -> Iterator[np.ndarray]:
+    from pydub.utils import get_encoder_name, mediainfo
+
+    info = mediainfo(str(path))
+    in_sr = int(info["sample_rate"])
+    channels = int(info["channels"])
+    frame_bytes = 2 * channels
+
+    proc = subprocess.Popen(
+        [get_encoder_name(), "-v", "error", "-i", str(path), "-f", "s16le", "-acodec", "pcm_s16le", "-"],
+        stdout=subprocess.PIPE,
+    )
+    state = None
+    try:
+        while True:
+            data = _read_exact(proc.stdout, block_frames * frame_bytes)
+            data = data[:len(data) - len(data) % frame_bytes]
+            if not data:
+                break
+            samples, state = _to_mono_target(data, channels, in_sr, target_sr, state)
+            yield samples
+    finally:
+        proc.stdout.close()
+        if proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg decode başarısız: {path}")
+
+
+# --- akışlı trim + chunk skoru ---
+
+class _Int16File:
+    """Ham int16 dosyasından [start, stop) okur (memmap yok: RSS blokla sınırlı)."""
+
+    def __init__(self, f: BinaryIO, n: int, offset: int = 0):
+        self.f = f
+        self.n = n
+        self.offset = offset
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        start, stop = max(0, start), min(stop, self.n)
+        if stop <= start:
+            return np.zeros(0, dtype=np.int16)
+        self.f.seek(self.offset + start * 2)
+        return np.frombuffer(self.f.read((stop - start) * 2), dtype=np.int16)
+
+
+def _window_loudness(
+    read: Callable[[int, int], np.ndarray],
+    sample_rate: int,
+    start_ms: int,
+    end_ms: int,
+) -> LoudnessIndex:
+    # ms sınırında başlayan dilim: indeks ms'leri dilimin başına göre
+    fpm = sample_rate // 1000
+    return LoudnessIndex(read(start_ms * fpm, end_ms * fpm), sample_rate, 2)
+
+
+def stream_trim_bounds(
+    read: Callable[[int, int], np.ndarray],
+    n_frames: int,
+    sample_rate: int,
+    silence_thresh_dbfs: float,
+    chunk_ms: int,
+    batch_ms: int,
+) -> Tuple[int, int]:
+    """
+    LoudnessIndex.trim_bounds ile aynı sonuç; ses baştan ve sondan
+    batch_ms'lik dilimler halinde, ilk sesli pencere bulunana kadar okunur.
+    """
+    total = round(1000 * (n_frames / float(sample_rate)))
+    if total <= chunk_ms:
+        return 0, total
+    per_batch = max(1, batch_ms // chunk_ms)
+
+    # Baştan: start + chunk < len olduğu sürece chunk chunk ilerle
+    n_lead = (total - 1) // chunk_ms
+    start_ms = n_lead * chunk_ms
+    for k0 in range(0, n_lead, per_batch):
+        starts = np.arange(k0, min(k0 + per_batch, n_lead), dtype=np.int64) * chunk_ms
+        base = int(starts[0])
+        idx = _window_loudness(read, sample_rate, base, int(starts[-1]) + chunk_ms)
+        loud = idx.dbfs(starts - base, starts - base + chunk_ms) > silence_thresh_dbfs
+        if loud.any():
+            start_ms = int(starts[np.argmax(loud)])
+            break
+
+    # Sondan: end - chunk > start + chunk olduğu sürece geri çekil
+    span = total - start_ms - 2 * chunk_ms
+    n_tail = max(0, -(-span // chunk_ms))
+    end_ms = total - n_tail * chunk_ms
+    for k0 in range(0, n_tail, per_batch):
+        ends = total - np.arange(k0, min(k0 + per_batch, n_tail), dtype=np.int64) * chunk_ms
+        base = int(ends[-1]) - chunk_ms
+        # Son dilim kaydın gerçek sonuna kadar okunur (pydub'ın son pencere dolgusu)
+        stop = n_frames if k0 == 0 else int(ends[0]) * (sample_rate // 1000)
+        idx = LoudnessIndex(read(base * (sample_rate // 1000), stop), sample_rate, 2)
+        loud = idx.dbfs(ends - chunk_ms - base, ends - base) > silence_thresh_dbfs
+        if loud.any():
+            end_ms = int(ends[np.argmax(loud)])
+            break
+
+    return start_ms, end_ms
+
+
+# Referans parçası: (start_ms, end_ms, skor | None)
+Segment = Tuple[int, int, Optional[float]]
+
+
+def snap_segments(
+    read: Callable[[int, int], np.ndarray],
+    n_frames: int,
+    sample_rate: int,
+    segment_ms: int,
+    search_ms: int,
+    frame_ms: int = 20,
+    batch_ms: int = 60_000,
+) -> List[Segment]:
+    """
+    Kaydı ~segment_ms'lik parçalara böler; her kesim noktası sabit ızgaradan
+    (k * segment_ms) en fazla search_ms kayarak o aralıktaki en sessiz
+    frame_ms'lik çerçevenin ortasına oturur. Böylece parçalar kelime
+    ortasında başlayıp bitmez.
+
+    Çerçeve enerjileri tüm kayıt için (bloklar halinde okunarak) bir kez
+    hesaplanır, kesim noktaları tek bir argmin ile bulunur. Skor,
+    LoudnessIndex.segment_scores (chunk_scores ile aynı ölçü).
+    """
+    if sample_rate % 1000:
+        raise ValueError(f"ms hizalı örnekleme hızı gerekli: {sample_rate}")
+    if 2 * search_ms >= segment_ms:
+        raise ValueError(f"search_ms ({search_ms}) segment_ms'in ({segment_ms}) yarısından küçük olmalı")
+    fpm = sample_rate // 1000
+    total_ms = round(1000 * (n_frames / float(sample_rate)))
+    if total_ms <= 0:
+        return []
+
+    # Çerçeve başına ortalama enerji (son yarım çerçeve kendi uzunluğuyla)
+    frame_len = frame_ms * fpm
+    step = max(frame_len, (batch_ms * fpm) // frame_len * frame_len)
+    energies: List[np.ndarray] = []
+    for pos in range(0, n_frames, step):
+        block = read(pos, min(pos + step, n_frames)).astype(np.int64)
+        full = len(block) // frame_len * frame_len
+        energies.append((block[:full] ** 2).reshape(-1, frame_len).mean(axis=1))
+        if full < len(block):
+            energies.append(np.array([np.mean(block[full:] ** 2)]))
+    frame_energy = np.concatenate(energies)
+
+    # Izgara noktaları; son parça segment_ms'in yarısından kısa kalmasın
+    nominal = np.arange(segment_ms, total_ms - segment_ms // 2, segment_ms, dtype=np.int64)
+    if len(nominal):
+        radius = search_ms // frame_ms
+        cand = nominal[:, None] // frame_ms + np.arange(-radius, radius + 1, dtype=np.int64)[None, :]
+        cand = np.clip(cand, 0, len(frame_energy) - 1)
+        best = cand[np.arange(len(nominal)), np.argmin(frame_energy[cand], axis=1)]
+        edges = np.minimum(best * frame_ms + frame_ms // 2, total_ms - 1)
+        edges = np.unique(edges)
+    else:
+        edges = np.zeros(0, dtype=np.int64)
+    starts = np.concatenate([[0], edges]).astype(np.int64)
+    ends = np.concatenate([edges, [total_ms]]).astype(np.int64)
+
+    # Skorlar: batch_ms'lik gruplar, her grup için ms hizalı dilimden indeks
+    out: List[Segment] = []
+    i = 0
+    while i < len(starts):
+        j = i + 1
+        while j < len(starts) and ends[j] - starts[i] <= batch_ms:
+            j += 1
+        base = int(starts[i])
+        stop = n_frames if j == len(starts) else int(ends[j - 1]) * fpm
+        idx = LoudnessIndex(read(base * fpm, stop), sample_rate, 2)
+        scores = idx.segment_scores(starts[i:j] - base, ends[i:j] - base)
+        out.extend(zip(starts[i:j].tolist(), ends[i:j].tolist(), scores))
+        i = j
+    return out
+
+
+def _write_npy_header(f: BinaryIO, n: int) -> None:
+    np.lib.format.write_array_header_1_0(
+        f, {"descr": np.lib.format.dtype_to_descr(np.dtype(np.int16)), "fortran_order": False, "shape": (n,)}
+    )
+
+
+def clean_file_to_npy(
+    path: Path,
+    out_path: Path,
+    target_sr: int,
+    high_pass_hz: float,
+    low_pass_hz: float,
+    target_dbfs: float,
+    trim_silence_dbfs: float,
+    trim_chunk_ms: int,
+    segment_ms: int,
+    snap_search_ms: int,
+    block_sec: float = 30.0,
+    spill_dir: Optional[Path] = None,
+) -> Tuple[int, List[Segment]]:
+    """
+    decode -> filtre -> normalize -> trim -> parçalama + skor, bellekte en
+    fazla birkaç blok tutarak. Sonuç int16 .npy olarak out_path'e yazılır.
+    Dönüş: (örnek sayısı, snap_segments parçaları).
+    """
+    if target_sr % 1000:
+        raise ValueError(f"Akışlı temizlik ms hizalı örnekleme hızı ister: {target_sr}")
+    fpm = target_sr // 1000
+    block_frames = max(1, int(block_sec * 1000)) * fpm
+
+    with tempfile.TemporaryFile(dir=spill_dir) as spill:
+        # 1. geçiş: decode + filtre, enerji sayacı
+        chain = RCFilterChain(target_sr, high_pass_hz, low_pass_hz)
+        n = 0
+        sum_squares = 0
+        with metrics.span("decode_filter", file=Path(path).name) as sp:
+            for block in iter_decoded_blocks(path, target_sr, block_frames):
+                filtered = chain.process(block)
+                spill.write(filtered.tobytes())
+                sum_squares += energy(filtered)
+                n += len(filtered)
+            sp.set(audio_sec=n / target_sr)
+        spill.flush()
+
+        source = _Int16File(spill, n)
+        factor = gain_to_target(sum_squares, n, target_dbfs)
+
+        def gained(start: int, stop: int) -> np.ndarray:
+            raw = source.read(start, stop)
+            return raw if factor is None else mul_int16(raw, factor)
+
+        # trim: pydub audio[start_ms:end_ms] dilimi
+        with metrics.span("trim", audio_sec=n / target_sr):
+            if round(1000 * (n / float(target_sr))) <= trim_chunk_ms:
+                first, last = 0, n
+            else:
+                start_ms, end_ms = stream_trim_bounds(
+                    gained, n, target_sr, trim_silence_dbfs, trim_chunk_ms, int(block_sec * 1000)
+                )
+                first, last = start_ms * fpm, min(end_ms * fpm, n)
+
+        # 3. geçiş: kazançlı örnekleri yaz
+        with metrics.span("normalize", audio_sec=(last - first) / target_sr), open(out_path, "wb") as out:
+            _write_npy_header(out, last - first)
+            header = out.tell()
+            for pos in range(first, last, block_frames):
+                out.write(gained(pos, min(pos + block_frames, last)).tobytes())
+
+    # Parçalama ve skorlar yazılan dosyadan blok blok
+    with open(out_path, "rb") as f, metrics.span("score", audio_sec=(last - first) / target_sr):
+        result = _Int16File(f, last - first, offset=header)
+        segments = snap_segments(
+            result.read, last - first, target_sr, segment_ms, snap_search_ms,
+            batch_ms=int(block_sec * 1000),
+        )
+    return last - first, segments
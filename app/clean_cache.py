@@ -0,0 +1,73 @@
+# app/clean_cache.py
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def clean_key(raw_text: str, prompt_version: str, model: str) -> str:
+    payload = json.dumps([raw_text, prompt_version, model], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CleanCache:
+    """
+    LLM temizlik sonuçlarının append-only JSONL günlüğü.
+
+    Her başarılı LLM cevabı geldiği anda bir satır olarak eklenir ve fsync
+    edilir; süreç yarıda ölse bile o ana kadar ödenmiş çağrılar kaybolmaz.
+    Dosya aynı zamanda cache'tir: açılışta bir kez okunur, sonra
+    hash(metin, prompt sürümü, model) ile O(1) bakılır. Çökme anında yarım
+    kalmış son satır okunurken atlanır.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._entries: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+        self._fh = None
+
+    def _load(self) -> Dict[str, str]:
+        if self._entries is None:
+            entries: Dict[str, str] = {}
+            if self.path.exists():
+                with self.path.open("r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            rec = json.loads(line)
+                            entries[rec["key"]] = rec["cleaned"]
+                        except (ValueError, KeyError):
+                            continue
+            self._entries = entries
+        return self._entries
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._load().get(key)
+
+    def put(self, key: str, cleaned: str) -> None:
+        line = json.dumps({"key": key, "cleaned": cleaned}, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._load()[key] = cleaned
+            if self._fh is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fh = self.path.open("a", encoding="utf-8")
+            self._fh.write(line)
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Önce geçici dosyaya yaz, sonra tek adımda yerine koy."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
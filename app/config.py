@@ -7,21 +7,103 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 RAW_SPEAKERS_DIR = BASE_DIR / "speakers"
 
 # Veri klasörleri
-DATA_DIR = BASE_DIR / "data"
+DATA_DIR = Path(os.getenv("DATA_DIR", str(BASE_DIR / "data")))
 VOICES_DIR = DATA_DIR / "voices"
 OUTPUTS_DIR = DATA_DIR / "outputs"
 
-# Klasörleri oluştur
-VOICES_DIR.mkdir(parents=True, exist_ok=True)
-OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
+
+def ensure_data_dirs() -> None:
+    """Veri klasörlerini oluşturur (import sırasında değil, ihtiyaç olunca çağrılır)."""
+    VOICES_DIR.mkdir(parents=True, exist_ok=True)
+    OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
+
 
 # XTTS model adı
 TTS_MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
 
+# Sentez backend'i: "xtts" (gerçek model) veya "fake" (model indirmeden test / benchmark)
+TTS_BACKEND = os.getenv("TTS_BACKEND", "xtts")
+FAKE_TTS_BASE_LATENCY_SEC = float(os.getenv("FAKE_TTS_BASE_LATENCY_SEC", "0.02"))
+FAKE_TTS_SEC_PER_CHAR = float(os.getenv("FAKE_TTS_SEC_PER_CHAR", "0.001"))
+
+# XTTS'in CPU'da çalışma profili (bkz. tts_backends.CPU_PROFILES):
+#   default: torch varsayılanları | tuned: thread ayarı
+#   int8 (deneysel): tuned + GPT2 gövdesi / başlıkları int8; ses kalitesine etkisi ölçülmedi
+# TTS_CPU_THREADS=0: process'e ayrılmış çekirdek sayısı
+TTS_CPU_PROFILE = os.getenv("TTS_CPU_PROFILE", "default")
+TTS_CPU_THREADS = int(os.getenv("TTS_CPU_THREADS", "0"))
+TTS_CPU_INTEROP_THREADS = int(os.getenv("TTS_CPU_INTEROP_THREADS", "1"))
+
 # Varsayılan dil
 DEFAULT_LANGUAGE = "tr"
 
 # OpenAI API anahtarı (environment'tan okunacak)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-MIN_DURATION_SECONDS = 50.0
\ No newline at end of file
+MIN_DURATION_SECONDS = 50.0
+
+# Ses dosyalarını paralel decode edip temizleyen process sayısı (1 = seri)
+DECODE_WORKERS = int(os.getenv("DECODE_WORKERS", str(os.cpu_count() or 1)))
+
+# Bellekte tutulacak en fazla voice latent sayısı (LRU)
+LATENT_CACHE_SIZE = int(os.getenv("LATENT_CACHE_SIZE", "32"))
+
+# Kalıcı voice profile indeksi (SQLite)
+VOICE_DB_PATH = DATA_DIR / "voices.sqlite"
+
+# Ara sonuç cache'leri (temizlenmiş ses, ASR vb.)
+CACHE_DIR = DATA_DIR / "cache"
+CLEANED_CACHE_MAX_BYTES = int(os.getenv("CLEANED_CACHE_MAX_BYTES", str(8 * 1024**3)))
+
+# Referans seçimi: "top_n" = en iyi N parça (varsayılan), "min_duration" = hedef
+# süreyi karşılayan en az sayıda parça (en iyi skora REF_SCORE_MARGIN_DB yakın
+# olanlardan; daha az referans, ses kalitesine etkisi ölçülmedi: isteğe bağlı)
+REF_SELECTION = os.getenv("REF_SELECTION", "top_n")
+REF_TARGET_SEC = float(os.getenv("REF_TARGET_SEC", "30"))
+REF_SCORE_MARGIN_DB = float(os.getenv("REF_SCORE_MARGIN_DB", "3"))
+
+# Bundan uzun kaynak dosyalar blok blok (sabit bellekle) temizlenir
+STREAM_PREPROCESS_MIN_SEC = float(os.getenv("STREAM_PREPROCESS_MIN_SEC", "900"))
+PREPROCESS_BLOCK_SEC = float(os.getenv("PREPROCESS_BLOCK_SEC", "32"))
+
+# XTTS üretim parametrelerini model config'ine göre ezmek için (ör. {"temperature": 0.65})
+XTTS_GENERATION_OVERRIDES: dict = {}
+
+# Sentez çıktı cache'i (aynı voice + metin + dil tekrar üretilmez)
+OUTPUT_CACHE_ENABLED = os.getenv("OUTPUT_CACHE_ENABLED", "1") != "0"
+OUTPUT_CACHE_MAX_BYTES = int(os.getenv("OUTPUT_CACHE_MAX_BYTES", str(2 * 1024**3)))
+OUTPUT_CACHE_MAX_FILES = int(os.getenv("OUTPUT_CACHE_MAX_FILES", "20000"))
+
+# LLM metin temizliği sonuçları (append-only, hash(metin, prompt, model) -> temiz metin)
+LLM_CLEAN_CACHE_PATH = CACHE_DIR / "llm_clean.jsonl"
+
+# Sentez öncesi yerel metin normalizasyonu (sayı/tarih/para, emoji, noktalama)
+# ve sonuç LRU'su; kuralların çözemediği metinler isteğe bağlı olarak arka
+# planda LLM'e gönderilir, cevap sonraki isteklerde kullanılır
+TTS_TEXT_NORMALIZE = os.getenv("TTS_TEXT_NORMALIZE", "1") != "0"
+TEXT_NORMALIZE_CACHE_SIZE = int(os.getenv("TEXT_NORMALIZE_CACHE_SIZE", "4096"))
+TTS_LLM_FALLBACK = os.getenv("TTS_LLM_FALLBACK", "0") == "1"
+TTS_LLM_FALLBACK_MAX_PENDING = int(os.getenv("TTS_LLM_FALLBACK_MAX_PENDING", "64"))
+TTS_CLEAN_CACHE_PATH = CACHE_DIR / "tts_clean.jsonl"
+
+# Whisper: pencere uzunluğu (sessizlikten bölünür), process sayısı ve pencere cache'i
+ASR_WINDOW_SEC = float(os.getenv("ASR_WINDOW_SEC", "60"))
+ASR_WORKERS = int(os.getenv("ASR_WORKERS", str(max(1, (os.cpu_count() or 1) // 4))))
+ASR_CACHE_DIR = CACHE_DIR / "asr"
+
+# Eğitim datası: metadata.csv + audio/ yanında paketli shard'lar (bkz. dataset_shards.py)
+DATASET_PACK_SHARDS = os.getenv("DATASET_PACK_SHARDS", "0") == "1"
+DATASET_SHARD_DTYPE = os.getenv("DATASET_SHARD_DTYPE", "int16")   # int16 | float16
+DATASET_SHARD_BYTES = int(os.getenv("DATASET_SHARD_BYTES", str(256 * 1024**2)))
+
+# HTTP sentez servisi: kuyruk sınırı (dolunca 503), micro-batch boyutu ve bekleme penceresi
+SERVICE_QUEUE_SIZE = int(os.getenv("SERVICE_QUEUE_SIZE", "64"))
+SERVICE_BATCH_MAX = int(os.getenv("SERVICE_BATCH_MAX", "8"))
+SERVICE_BATCH_WINDOW_MS = float(os.getenv("SERVICE_BATCH_WINDOW_MS", "10"))
+# /stream: istemciye gönderilmeyi bekleyen en fazla chunk (dolunca inference bekler)
+SERVICE_STREAM_BUFFER = int(os.getenv("SERVICE_STREAM_BUFFER", "4"))
+
+# Aşama metrikleri (app/metrics.py): kapalıyken span'lar no-op
+METRICS_ENABLED = os.getenv("METRICS", "0") == "1"
+METRICS_PATH = Path(os.environ["METRICS_PATH"]) if os.getenv("METRICS_PATH") else None
+METRICS_TRACEMALLOC = os.getenv("METRICS_TRACEMALLOC", "0") == "1"
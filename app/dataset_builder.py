@@ -1,26 +1,56 @@
 # app/dataset_builder.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 
-import whisper
-from pydub import AudioSegment
-
-from .config import VOICES_DIR, DATA_DIR
+from . import metrics
+from .config import VOICES_DIR, DATA_DIR, DATASET_PACK_SHARDS
 from .audio_preprocess import (
+    CleanedAudio,
     list_audio_files,
-    load_and_concat_files,
-    basic_denoise_and_normalize,
-    trim_leading_trailing_silence,
+    load_cleaned_audio,
+    slice_ms,
+    fade_gains,
+    faded_parts,
+    write_wav_parts,
 )
+from .dataset_shards import export_shards
+from .transcription import AsrPool, transcribe_windows
 import ssl
 # SADECE MODEL DOWNLOAD İÇİN: SSL doğrulamayı devre dışı bırak
 ssl._create_default_https_context = ssl._create_unverified_context
 
+# Kesimleri yumuşatan fade süresi ve bundan kısa segmentler atlanır
+UTTERANCE_FADE_MS = 10
+MIN_UTTERANCE_SEC = 1.5
+
+
+@dataclass
+class DatasetBuildStats:
+    """Tek konuşmacının dataset üretiminde aşama süreleri (sn)."""
+    files: int = 0
+    audio_sec: float = 0.0
+    preprocess_sec: float = 0.0
+    asr_sec: float = 0.0
+    export_sec: float = 0.0
+    utterances: int = 0
+
+
+@metrics.traced("build_training_dataset")
 def build_training_dataset_for_person(
     person_dir: Path,
     speaker_id: str,
     model_name: str = "medium",
     language: str = "tr",
+    write_long_wav: bool = False,
+    export_workers: int = 4,
+    asr_workers: Optional[int] = None,
+    asr_model=None,
+    asr_pool: Optional[AsrPool] = None,
+    stats: Optional[DatasetBuildStats] = None,
+    pack_shards: bool = DATASET_PACK_SHARDS,
 ) -> Path:
     """
     Bir kişi klasöründen (speakers/speaker_X) eğitim datası üretir.
@@ -28,38 +58,90 @@ def build_training_dataset_for_person(
     Adımlar:
     1) Tüm ses dosyalarını birleştir
     2) Denoise + normalize + sessizlik kırp
-    3) Geçici tek bir long_wav olarak diske yaz
-    4) Whisper ile transcribe et (segment segment)
-    5) Her segment için küçük wav dosyası üret ve metadata.csv'ye yaz
+    3) (write_long_wav=True ise) geçici tek bir long_wav olarak diske yaz
+    4) Sessizlikten bölünmüş pencereleri Whisper ile transcribe et
+       (asr_workers process, pencere bazlı cache; bkz. transcription.py;
+       asr_model verilirse tek process'te o model, asr_pool verilirse
+       konuşmacılar arasında paylaşılan havuz kullanılır)
+    5) Her segment için küçük wav dosyası üret (export_workers thread ile)
+       ve metadata.csv'ye sırayla yaz
+    6) (pack_shards=True ise) aynı datayı shards/ altına memmap'lenebilir
+       paket olarak da yaz (bkz. dataset_shards.py)
 
     Dönüş: metadata.csv'nin yolu
     """
-    # 1) Kişi seslerini yükle ve birleştir
-    files = list_audio_files(person_dir)
-    combined = load_and_concat_files(files, target_sr=24000)
-
-    # 2) Temizleme
-    cleaned = basic_denoise_and_normalize(combined)
-    cleaned = trim_leading_trailing_silence(cleaned)
+    if stats is None:
+        stats = DatasetBuildStats()
 
-    # 3) Geçici long wav olarak kaydet
-    tmp_dir = VOICES_DIR / f"{speaker_id}_training_tmp"
-    tmp_dir.mkdir(parents=True, exist_ok=True)
-    long_wav_path = tmp_dir / "long_cleaned.wav"
-    cleaned.export(long_wav_path, format="wav")
-
-    # 4) Whisper modeli
-    print(f"[INFO] Whisper modeli yükleniyor: {model_name}")
-    asr_model = whisper.load_model(model_name)
-
-    print(f"[INFO] Transkripsiyon başlıyor: {long_wav_path}")
-    result = asr_model.transcribe(
-        str(long_wav_path),
+    # 1-2) Kişi seslerini yükle, birleştir ve temizle (enroll ile ortak cache)
+    t0 = time.perf_counter()
+    files = list_audio_files(person_dir)
+    cleaned_audio = load_cleaned_audio(files, target_sr=24000)
+    stats.files = len(files)
+    stats.preprocess_sec = time.perf_counter() - t0
+    print(f"[INFO] {len(files)} dosya hazır ({cleaned_audio.duration_sec:.1f} sn)")
+
+    return build_training_dataset_from_audio(
+        cleaned_audio,
+        speaker_id,
+        model_name=model_name,
         language=language,
-        verbose=False,
+        write_long_wav=write_long_wav,
+        export_workers=export_workers,
+        asr_workers=asr_workers,
+        asr_model=asr_model,
+        asr_pool=asr_pool,
+        stats=stats,
+        pack_shards=pack_shards,
     )
 
-    segments = result.get("segments", [])
+
+def build_training_dataset_from_audio(
+    cleaned_audio: CleanedAudio,
+    speaker_id: str,
+    model_name: str = "medium",
+    language: str = "tr",
+    write_long_wav: bool = False,
+    export_workers: int = 4,
+    asr_workers: Optional[int] = None,
+    asr_model=None,
+    asr_pool: Optional[AsrPool] = None,
+    stats: Optional[DatasetBuildStats] = None,
+    pack_shards: bool = DATASET_PACK_SHARDS,
+) -> Path:
+    """
+    build_training_dataset_for_person'ın 3-6. adımları: önceden temizlenmiş
+    kayıttan transkripsiyon + segment export. Çok konuşmacılı zamanlayıcı
+    (dataset_scheduler) bir sonraki konuşmacının temizliğini bununla
+    paralel yürütür.
+    """
+    if stats is None:
+        stats = DatasetBuildStats()
+    stats.audio_sec = cleaned_audio.duration_sec
+
+    samples = cleaned_audio.samples
+    sample_rate = cleaned_audio.sample_rate
+
+    # 3) İstenirse long wav'ı diske de yaz (Whisper bellekteki diziyle çalışır)
+    if write_long_wav:
+        tmp_dir = VOICES_DIR / f"{speaker_id}_training_tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        write_wav_parts([samples], sample_rate, tmp_dir / "long_cleaned.wav")
+
+    # 4) Pencereli / paralel Whisper; zaman damgaları global zamana taşınır
+    print(f"[INFO] Transkripsiyon başlıyor ({cleaned_audio.duration_sec:.1f} sn)")
+    t0 = time.perf_counter()
+    with metrics.span("whisper", audio_sec=cleaned_audio.duration_sec, model=model_name):
+        segments = transcribe_windows(
+            samples,
+            sample_rate,
+            model_name=model_name,
+            language=language,
+            workers=1 if asr_model is not None else asr_workers,
+            model=asr_model,
+            pool=asr_pool,
+        )
+    stats.asr_sec = time.perf_counter() - t0
     if not segments:
         raise RuntimeError("Whisper transkripsiyon sonucu segment içermiyor.")
 
@@ -72,38 +154,58 @@ def build_training_dataset_for_person(
     metadata_path = train_root / "metadata.csv"
 
     # 6) Her ASR segmentini ayrı wav + metadata satırı olarak kaydet
-    #    Not: segment start/end saniye cinsinden, pydub için ms'e çevireceğiz
+    #    Not: segment start/end saniye cinsinden; kesim ms'e yuvarlanır (pydub ile aynı)
+    #    Segmentler temiz kaydın view'ı; fade sadece kenar örneklerine uygulanır,
+    #    dosyalar thread havuzunda yazılır, metadata satırları sırayla üretilir.
     print(f"[INFO] {len(segments)} segment bulundu. Eğitim datası üretiliyor...")
 
-    with metadata_path.open("w", encoding="utf-8") as mf:
+    fade_in = fade_gains(sample_rate, UTTERANCE_FADE_MS, fade_in=True)
+    fade_out = fade_gains(sample_rate, UTTERANCE_FADE_MS, fade_in=False)
+
+    def export(start_ms: int, end_ms: int, utt_path: Path) -> None:
+        utt = slice_ms(samples, sample_rate, start_ms, end_ms)
+        write_wav_parts(faded_parts(utt, fade_in, fade_out), sample_rate, utt_path)
+
+    t0 = time.perf_counter()
+    lines: List[str] = []
+    exported_ms = 0
+    with metrics.span("export_utterances") as sp, ThreadPoolExecutor(max_workers=max(1, export_workers)) as ex:
+        futures = []
         for idx, seg in enumerate(segments, start=1):
             start_s = seg["start"]
             end_s = seg["end"]
             text = seg["text"].strip()
 
             # Çok kısa segmentleri atla (< 1.5 sn gibi)
-            if (end_s - start_s) < 1.5:
+            if (end_s - start_s) < MIN_UTTERANCE_SEC:
                 continue
 
-            start_ms = int(start_s * 1000)
-            end_ms = int(end_s * 1000)
-
-            audio_seg: AudioSegment = cleaned[start_ms:end_ms]
-
-            # Küçük fade-in/out ile kesimleri yumuşat
-            audio_seg = audio_seg.fade_in(10).fade_out(10)
-
             utt_name = f"utt_{idx:04d}.wav"
-            utt_path = audio_dir / utt_name
-            audio_seg.export(utt_path, format="wav")
+            futures.append(
+                ex.submit(export, int(start_s * 1000), int(end_s * 1000), audio_dir / utt_name)
+            )
+            exported_ms += int(end_s * 1000) - int(start_s * 1000)
 
             # metadata satırı: path|text
-            rel_path = f"audio/{utt_name}"
-            mf.write(f"{rel_path}|{text}\n")
+            lines.append(f"audio/{utt_name}|{text}\n")
+
+        for fut in futures:
+            fut.result()
+        sp.set(audio_sec=exported_ms / 1000.0, files=len(futures))
+
+    with metadata_path.open("w", encoding="utf-8") as mf:
+        mf.writelines(lines)
+    if pack_shards:
+        with metrics.span("pack_shards", audio_sec=exported_ms / 1000.0):
+            export_shards(metadata_path)
+    stats.export_sec = time.perf_counter() - t0
+    stats.utterances = len(lines)
 
     print(f"[OK] Eğitim datası hazır:")
     print(f"  - Kök klasör : {train_root}")
     print(f"  - metadata   : {metadata_path}")
     print(f"  - audio      : {audio_dir}")
+    if pack_shards:
+        print(f"  - shards     : {train_root / 'shards'}")
 
     return metadata_path
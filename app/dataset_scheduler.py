@@ -0,0 +1,239 @@
+# app/dataset_scheduler.py
+"""
+Çok konuşmacılı eğitim datası üretimi.
+
+    results = build_all_speakers(model_name="medium")
+
+- speakers/ altındaki her kişi klasörü bulunur; kaynak dosyaları (parmak
+  izi), Whisper modeli ve dili son üretimle aynı olanlar atlanır
+- Tek bir AsrPool tüm konuşmacılar boyunca açık kalır: Whisper modeli
+  worker başına bir kez yüklenir
+- Konuşmacı i transcribe edilirken konuşmacı i+1'in temizliği
+  (decode + filtre + trim) arka plan thread'inde yapılır
+- Sonunda konuşmacı başına süreleri içeren build_report.json yazılır
+"""
+import json
+import shutil
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .audio_preprocess import SUPPORTED_EXTENSIONS, CleanedAudio, list_audio_files, load_cleaned_audio
+from .clean_cache import atomic_write_text
+from .config import DATA_DIR, DATASET_PACK_SHARDS, RAW_SPEAKERS_DIR
+from .dataset_builder import DatasetBuildStats, build_training_dataset_from_audio
+from .fingerprint import refresh_fingerprints
+from .transcription import ASR_VERSION, AsrPool
+
+BUILD_MANIFEST = "build.json"
+REPORT_NAME = "build_report.json"
+
+# Export / segment parametreleri değişirse bunu artır: tüm konuşmacılar yeniden üretilir
+DATASET_VERSION = 1
+
+
+@dataclass
+class SpeakerBuildResult:
+    speaker_id: str
+    person_dir: str
+    status: str                     # "built" | "skipped" | "failed"
+    files: int = 0
+    audio_sec: float = 0.0
+    preprocess_sec: float = 0.0
+    asr_sec: float = 0.0
+    export_sec: float = 0.0
+    total_sec: float = 0.0
+    utterances: int = 0
+    metadata_path: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class _SpeakerJob:
+    person_dir: Path
+    speaker_id: str
+    files: List[Path]
+    fingerprints: Dict[str, Dict[str, object]] = field(default_factory=dict)
+
+
+def discover_speakers(root: Path = RAW_SPEAKERS_DIR) -> List[Path]:
+    """root altındaki, en az bir desteklenen ses dosyası içeren kişi klasörleri (sıralı)."""
+    if not root.exists():
+        raise FileNotFoundError(f"Speaker klasörü bulunamadı: {root}")
+    return [
+        d for d in sorted(root.iterdir())
+        if d.is_dir() and any(p.is_file() and p.suffix.lower() in SUPPORTED_EXTENSIONS for p in d.iterdir())
+    ]
+
+
+def _train_root(speaker_id: str) -> Path:
+    return DATA_DIR / "training_data" / speaker_id
+
+
+def _manifest_settings(model_name: str, language: str, pack_shards: bool) -> dict:
+    return {
+        "version": DATASET_VERSION,
+        "asr_version": ASR_VERSION,
+        "model": model_name,
+        "language": language,
+        "shards": pack_shards,
+    }
+
+
+def _load_manifest(speaker_id: str) -> dict:
+    path = _train_root(speaker_id) / BUILD_MANIFEST
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _is_up_to_date(job: _SpeakerJob, manifest: dict, settings: dict) -> bool:
+    return (
+        manifest.get("settings") == settings
+        and manifest.get("sources") == job.fingerprints
+        and (_train_root(job.speaker_id) / "metadata.csv").exists()
+    )
+
+
+def _preprocess(job: _SpeakerJob) -> Tuple[CleanedAudio, float]:
+    t0 = time.perf_counter()
+    known = {name: fp["sha256"] for name, fp in job.fingerprints.items()}
+    cleaned = load_cleaned_audio(job.files, target_sr=24000, known_sha256=known)
+    return cleaned, time.perf_counter() - t0
+
+
+def _print_report(results: List[SpeakerBuildResult]) -> None:
+    print("Dataset özeti:")
+    print(
+        f"  {'konuşmacı':<20} {'durum':<8} {'ses sn':>8} {'temizlik':>9} {'ASR':>8} "
+        f"{'export':>8} {'toplam':>8} {'segment':>8}"
+    )
+    for r in results:
+        print(
+            f"  {r.speaker_id:<20} {r.status:<8} {r.audio_sec:>8.1f} {r.preprocess_sec:>9.2f} "
+            f"{r.asr_sec:>8.2f} {r.export_sec:>8.2f} {r.total_sec:>8.2f} {r.utterances:>8}"
+        )
+
+
+def build_all_speakers(
+    root: Path = RAW_SPEAKERS_DIR,
+    model_name: str = "medium",
+    language: str = "tr",
+    asr_workers: Optional[int] = None,
+    export_workers: int = 4,
+    force: bool = False,
+    asr_model=None,
+    report_path: Optional[Path] = None,
+    pack_shards: bool = DATASET_PACK_SHARDS,
+) -> List[SpeakerBuildResult]:
+    """
+    root altındaki tüm konuşmacılar için eğitim datası üretir
+    (speaker_id = klasör adı, çıktı DATA_DIR/training_data/<speaker_id>).
+    - force=False: kaynakları ve ayarları değişmemiş konuşmacılar atlanır
+    - asr_model verilirse (ör. test/benchmark modeli) tek process'te o kullanılır
+    Bir konuşmacıdaki hata diğerlerini durdurmaz; raporda "failed" olarak görünür.
+    """
+    started = time.perf_counter()
+    settings = _manifest_settings(model_name, language, pack_shards)
+    results: Dict[str, SpeakerBuildResult] = {}
+    pending: List[_SpeakerJob] = []
+    speakers = discover_speakers(root)
+
+    for person_dir in speakers:
+        job = _SpeakerJob(person_dir, person_dir.name, [])
+        try:
+            job.files = list_audio_files(person_dir)
+            manifest = _load_manifest(job.speaker_id)
+            job.fingerprints = refresh_fingerprints(job.files, manifest.get("sources", {}))
+        except Exception as e:
+            results[job.speaker_id] = SpeakerBuildResult(job.speaker_id, str(person_dir), "failed", error=str(e))
+            continue
+        if not force and _is_up_to_date(job, manifest, settings):
+            results[job.speaker_id] = SpeakerBuildResult(
+                job.speaker_id, str(person_dir), "skipped",
+                files=len(job.files),
+                utterances=manifest.get("utterances", 0),
+                metadata_path=str(_train_root(job.speaker_id) / "metadata.csv"),
+            )
+            continue
+        pending.append(job)
+
+    print(f"[INFO] {len(results) + len(pending)} konuşmacı, {len(pending)} tanesi üretilecek")
+
+    with AsrPool(model_name, language, asr_workers, asr_model) as pool, \
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="preprocess") as prep:
+        next_prep: Optional[Future] = prep.submit(_preprocess, pending[0]) if pending else None
+
+        for i, job in enumerate(pending):
+            t0 = time.perf_counter()
+            result = SpeakerBuildResult(job.speaker_id, str(job.person_dir), "failed", files=len(job.files))
+            results[job.speaker_id] = result
+            current, next_prep = next_prep, None
+            # Bu konuşmacı transcribe edilirken sıradakinin temizliği arka planda
+            if i + 1 < len(pending):
+                next_prep = prep.submit(_preprocess, pending[i + 1])
+
+            print(f"\n[{i + 1}/{len(pending)}] {job.speaker_id}")
+            try:
+                cleaned, result.preprocess_sec = current.result()
+                train_root = _train_root(job.speaker_id)
+                # Önce manifest ve metadata: üretim yarıda kalırsa sonraki çalıştırma
+                # silinmiş wav'lara işaret eden eski datayı "güncel" sanıp atlamasın
+                for stale in (BUILD_MANIFEST, "metadata.csv"):
+                    (train_root / stale).unlink(missing_ok=True)
+                # Eski üretimden kalan (artık fazla) utt dosyaları karışmasın
+                shutil.rmtree(train_root / "audio", ignore_errors=True)
+                stats = DatasetBuildStats(files=len(job.files), preprocess_sec=result.preprocess_sec)
+                metadata_path = build_training_dataset_from_audio(
+                    cleaned,
+                    job.speaker_id,
+                    model_name=model_name,
+                    language=language,
+                    export_workers=export_workers,
+                    asr_pool=pool,
+                    stats=stats,
+                    pack_shards=pack_shards,
+                )
+            except Exception as e:
+                result.error = f"{type(e).__name__}: {e}"
+                print(f"[WARN] {job.speaker_id} üretilemedi: {result.error}")
+                traceback.print_exc()
+                continue
+            finally:
+                result.total_sec = time.perf_counter() - t0
+
+            result.status = "built"
+            result.audio_sec = stats.audio_sec
+            result.asr_sec = stats.asr_sec
+            result.export_sec = stats.export_sec
+            result.utterances = stats.utterances
+            result.metadata_path = str(metadata_path)
+            atomic_write_text(
+                train_root / BUILD_MANIFEST,
+                json.dumps(
+                    {"settings": settings, "sources": job.fingerprints, "utterances": stats.utterances},
+                    ensure_ascii=False, indent=2,
+                ),
+            )
+
+    ordered = [results[d.name] for d in speakers]
+    report_path = report_path or DATA_DIR / "training_data" / REPORT_NAME
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(
+        report_path,
+        json.dumps(
+            {
+                "wall_sec": time.perf_counter() - started,
+                "settings": settings,
+                "speakers": [asdict(r) for r in ordered],
+            },
+            ensure_ascii=False, indent=2,
+        ),
+    )
+    _print_report(ordered)
+    print(f"[OK] Rapor: {report_path}")
+    return ordered
@@ -0,0 +1,216 @@
+# app/dataset_shards.py
+"""
+Eğitim datasının paketli (shard) hali: binlerce küçük utt_XXXX.wav yerine
+birkaç büyük, bitişik örnek dizisi + tek bir indeks.
+
+    <train_root>/shards/
+        shard_00000.npy    1-D int16 (veya float16, [-1, 1)) örnekler
+        shard_00001.npy
+        index.json         sample_rate, dtype, her utt için
+                           {path, shard, offset, length, text}
+
+.npy dosyaları np.load(mmap_mode="r") ile açılır; bir utt'in sesi memmap'in
+dilimidir (kopya yok, sadece dokunulan sayfalar okunur). Bir utt hiçbir
+zaman iki shard'a bölünmez.
+
+export_shards / import_shards bugünkü metadata.csv + audio/ düzeniyle
+karşılıklı çevirir; int16'da gidiş-dönüş birebir aynıdır, float16 kayıplıdır.
+"""
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from .clean_cache import atomic_write_text
+from .config import DATASET_SHARD_BYTES, DATASET_SHARD_DTYPE
+
+SHARD_DIR_NAME = "shards"
+INDEX_NAME = "index.json"
+SHARD_FORMAT_VERSION = 1
+SHARD_DTYPES = ("int16", "float16")
+
+
+@dataclass
+class ShardItem:
+    path: str              # metadata.csv'deki göreli yol (audio/utt_XXXX.wav)
+    text: str
+    audio: np.ndarray      # memmap dilimi (salt okunur)
+
+
+def _read_metadata(metadata_path: Path) -> List[Tuple[str, str]]:
+    """metadata.csv -> [(audio/utt_XXXX.wav, metin), ...]"""
+    rows = []
+    for lineno, line in enumerate(metadata_path.read_text(encoding="utf-8").splitlines(), start=1):
+        if not line.strip():
+            continue
+        rel, sep, text = line.partition("|")
+        if not sep:
+            raise ValueError(f"{metadata_path}:{lineno}: 'path|text' bekleniyordu")
+        rows.append((rel, text))
+    return rows
+
+
+def _plan_shards(lengths: List[int], itemsize: int, shard_bytes: int) -> List[int]:
+    """Her utt'in shard numarası: sırayı bozmadan, shard_bytes dolunca yeni shard."""
+    shard_of, shard, used = [], 0, 0
+    for n in lengths:
+        if used and (used + n) * itemsize > shard_bytes:
+            shard, used = shard + 1, 0
+        shard_of.append(shard)
+        used += n
+    return shard_of
+
+
+def export_shards(
+    metadata_path: Path,
+    out_dir: Optional[Path] = None,
+    dtype: str = DATASET_SHARD_DTYPE,
+    shard_bytes: int = DATASET_SHARD_BYTES,
+) -> Path:
+    """
+    metadata.csv + audio/*.wav -> shard_XXXXX.npy + index.json.
+    out_dir verilmezse metadata.csv'nin yanında shards/ kullanılır.
+    Dönüş: index.json yolu.
+    """
+    if dtype not in SHARD_DTYPES:
+        raise ValueError(f"Desteklenmeyen dtype: {dtype} ({', '.join(SHARD_DTYPES)})")
+    metadata_path = Path(metadata_path)
+    root = metadata_path.parent
+    out_dir = Path(out_dir) if out_dir is not None else root / SHARD_DIR_NAME
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    rows = _read_metadata(metadata_path)
+    infos = [sf.info(str(root / rel)) for rel, _ in rows]
+    rates = {info.samplerate for info in infos}
+    if len(rates) > 1:
+        raise ValueError(f"Farklı sample rate'ler tek pakette olamaz: {sorted(rates)}")
+    if any(info.channels != 1 for info in infos):
+        raise ValueError("Sadece mono utt dosyaları paketlenebilir")
+    sample_rate = rates.pop() if rates else 0
+
+    lengths = [info.frames for info in infos]
+    np_dtype = np.dtype(dtype)
+    shard_of = _plan_shards(lengths, np_dtype.itemsize, shard_bytes)
+    n_shards = shard_of[-1] + 1 if shard_of else 0
+
+    # Önce eski index: shard'lar değişirken (veya export yarıda kalırsa) eski
+    # index yeni içeriği yanlış offset/metinle okutmasın
+    index_path = out_dir / INDEX_NAME
+    index_path.unlink(missing_ok=True)
+    # Eski, artık fazla shard dosyaları okuyucuya karışmasın
+    for old in out_dir.glob("shard_*.npy"):
+        old.unlink()
+
+    # shard_of artan sıralı: her shard'ın utt aralığı [bounds[s], bounds[s+1])
+    bounds = np.searchsorted(shard_of, np.arange(n_shards + 1))
+    items = []
+    for shard in range(n_shards):
+        members = range(bounds[shard], bounds[shard + 1])
+        total = sum(lengths[i] for i in members)
+        name = f"shard_{shard:05d}.npy"
+        tmp = out_dir / f".{name}.{os.getpid()}.tmp.npy"
+        arr = np.lib.format.open_memmap(tmp, mode="w+", dtype=np_dtype, shape=(total,))
+        offset = 0
+        for i in members:
+            rel, text = rows[i]
+            samples, _ = sf.read(str(root / rel), dtype="int16")
+            if np_dtype == np.int16:
+                arr[offset:offset + lengths[i]] = samples
+            else:
+                arr[offset:offset + lengths[i]] = samples.astype(np.float32) / 32768.0
+            items.append({
+                "path": rel,
+                "shard": shard,
+                "offset": offset,
+                "length": lengths[i],
+                "text": text,
+            })
+            offset += lengths[i]
+        arr.flush()
+        del arr
+        os.replace(tmp, out_dir / name)
+
+    index = {
+        "version": SHARD_FORMAT_VERSION,
+        "sample_rate": sample_rate,
+        "dtype": dtype,
+        "shards": [f"shard_{s:05d}.npy" for s in range(n_shards)],
+        "items": items,
+    }
+    # index en son yazılır: yarım kalmış bir export okunabilir görünmez
+    atomic_write_text(index_path, json.dumps(index, ensure_ascii=False))
+    total_sec = sum(lengths) / sample_rate if sample_rate else 0.0
+    print(f"[OK] {len(items)} utt ({total_sec:.1f} sn) -> {n_shards} shard ({dtype}): {out_dir}")
+    return index_path
+
+
+class ShardReader:
+    """
+    Paketli datanın okuyucusu. Shard'lar memmap olarak açılır; audio(i)
+    kopya yapmadan dilim döndürür.
+
+        ds = ShardReader(train_root / "shards")
+        for item in ds:
+            item.audio, item.text
+    """
+
+    def __init__(self, shard_dir: Path):
+        self.shard_dir = Path(shard_dir)
+        index = json.loads((self.shard_dir / INDEX_NAME).read_text(encoding="utf-8"))
+        if index.get("version") != SHARD_FORMAT_VERSION:
+            raise ValueError(f"Desteklenmeyen shard sürümü: {index.get('version')}")
+        self.sample_rate: int = index["sample_rate"]
+        self.dtype = np.dtype(index["dtype"])
+        self._shards = [np.load(self.shard_dir / name, mmap_mode="r") for name in index["shards"]]
+        items = index["items"]
+        self.paths: List[str] = [it["path"] for it in items]
+        self.texts: List[str] = [it["text"] for it in items]
+        self._shard = np.array([it["shard"] for it in items], dtype=np.int32)
+        self._offset = np.array([it["offset"] for it in items], dtype=np.int64)
+        self._length = np.array([it["length"] for it in items], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def audio(self, i: int) -> np.ndarray:
+        off = int(self._offset[i])
+        return self._shards[self._shard[i]][off:off + int(self._length[i])]
+
+    def duration_sec(self, i: int) -> float:
+        return int(self._length[i]) / float(self.sample_rate)
+
+    def __getitem__(self, i: int) -> ShardItem:
+        return ShardItem(self.paths[i], self.texts[i], self.audio(i))
+
+    def __iter__(self) -> Iterator[ShardItem]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+def import_shards(shard_dir: Path, out_root: Path) -> Path:
+    """
+    Paketli datayı bugünkü düzene açar: out_root/audio/utt_XXXX.wav +
+    out_root/metadata.csv. Dönüş: metadata.csv yolu.
+    """
+    reader = ShardReader(shard_dir)
+    out_root = Path(out_root)
+
+    lines = []
+    for item in reader:
+        samples = item.audio
+        if reader.dtype != np.int16:
+            samples = np.clip(np.round(samples.astype(np.float32) * 32768.0), -32768, 32767).astype(np.int16)
+        out_path = out_root / item.path
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        sf.write(str(out_path), samples, reader.sample_rate, subtype="PCM_16")
+        lines.append(f"{item.path}|{item.text}\n")
+
+    metadata_path = out_root / "metadata.csv"
+    with metadata_path.open("w", encoding="utf-8") as mf:
+        mf.writelines(lines)
+    print(f"[OK] {len(lines)} utt açıldı: {metadata_path}")
+    return metadata_path
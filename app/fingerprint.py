@@ -0,0 +1,82 @@
+# app/fingerprint.py
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+_HASH_CHUNK = 1024 * 1024
+
+# (path, size, mtime_ns) -> sha256; aynı dosyayı tekrar tekrar okumamak için
+_sha_memo: Dict[Tuple[str, int, int], str] = {}
+_memo_lock = threading.Lock()
+
+
+def file_sha256(path: Path) -> str:
+    """
+    Dosya içeriğinin sha256 özetini döndürür.
+    Boyut + mtime değişmediği sürece sonuç bellekten gelir.
+    """
+    path = Path(path)
+    st = path.stat()
+    memo_key = (str(path.resolve()), st.st_size, st.st_mtime_ns)
+
+    with _memo_lock:
+        cached = _sha_memo.get(memo_key)
+    if cached is not None:
+        return cached
+
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(_HASH_CHUNK), b""):
+            h.update(block)
+    digest = h.hexdigest()
+
+    with _memo_lock:
+        _sha_memo[memo_key] = digest
+    return digest
+
+
+def hash_files(paths: Iterable[Path], *extra: object) -> str:
+    """
+    Birden fazla dosyanın içerik özetini (sırasıyla) ve ek parametreleri
+    tek bir anahtar halinde birleştirir.
+    """
+    h = hashlib.sha256()
+    for p in paths:
+        h.update(file_sha256(p).encode("ascii"))
+        h.update(b"\0")
+    for item in extra:
+        h.update(repr(item).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def file_fingerprint(path: Path) -> Dict[str, object]:
+    """Kaynak dosya parmak izi: boyut + mtime (hızlı kontrol) + içerik özeti."""
+    path = Path(path)
+    st = path.stat()
+    return {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": file_sha256(path),
+    }
+
+
+def refresh_fingerprints(
+    paths: Iterable[Path],
+    previous: Dict[str, Dict[str, object]],
+) -> Dict[str, Dict[str, object]]:
+    """
+    Dosya adı -> parmak izi. Boyutu ve mtime'ı önceki kayıtla aynı olan
+    dosyalar tekrar okunmaz; sadece yeni / değişmiş dosyalar hash'lenir.
+    """
+    out: Dict[str, Dict[str, object]] = {}
+    for p in paths:
+        p = Path(p)
+        st = p.stat()
+        old = previous.get(p.name)
+        if old and old.get("size") == st.st_size and old.get("mtime_ns") == st.st_mtime_ns:
+            out[p.name] = dict(old)
+        else:
+            out[p.name] = file_fingerprint(p)
+    return out
@@ -0,0 +1,157 @@
+# app/llm_batching.py
+import json
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Her öğenin JSON sarmalayıcısı için (id, anahtarlar, tırnaklar) tahmini token
+_ITEM_OVERHEAD_TOKENS = 8
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.S)
+
+
+def estimate_tokens(text: str) -> int:
+    # Türkçe için kaba tahmin: ~3 karakter/token
+    return len(text) // 3 + 1
+
+
+@dataclass
+class BatchStats:
+    requests: int = 0            # gerçekten atılan LLM isteği (paket + tekli)
+    items: int = 0               # temizlenen toplam öğe
+    batched_items: int = 0       # paket içinde sorunsuz dönen öğe
+    fallback_items: int = 0      # paket bozuk geldiği için tek tek istenen öğe
+    malformed_batches: int = 0
+    tokens_saved: int = 0        # tekrar gönderilmeyen talimat token'ları (tahmini)
+
+
+_stats = BatchStats()
+_stats_lock = threading.Lock()
+
+
+def get_batch_stats() -> BatchStats:
+    with _stats_lock:
+        return BatchStats(**vars(_stats))
+
+
+def _count(**deltas: int) -> None:
+    with _stats_lock:
+        for name, delta in deltas.items():
+            setattr(_stats, name, getattr(_stats, name) + delta)
+
+
+def pack_items(
+    texts: Sequence[str],
+    instruction_tokens: int,
+    token_budget: int = 2000,
+    max_items: int = 25,
+) -> List[List[int]]:
+    """
+    Metinleri, talimat + öğeler token bütçesini (ve max_items'ı) aşmayacak
+    şekilde sıralı paketlere böler. Paket = metin indeksleri listesi.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    used = instruction_tokens
+    for i, text in enumerate(texts):
+        cost = estimate_tokens(text) + _ITEM_OVERHEAD_TOKENS
+        if current and (used + cost > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], instruction_tokens
+        current.append(i)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_batch_input(items: Sequence[Tuple[str, str]]) -> str:
+    return json.dumps(
+        [{"id": item_id, "text": text} for item_id, text in items],
+        ensure_ascii=False,
+    )
+
+
+def parse_batch_output(output_text: str, expected_ids: Sequence[str]) -> Optional[Dict[str, str]]:
+    """
+    Modelin JSON dizisi cevabını id -> metin eşlemesine çevirir.
+    Geçersiz JSON, eksik/fazla/tekrarlı id veya boş metin varsa None.
+    """
+    raw = _FENCE_RE.sub("", output_text.strip())
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return None
+    if isinstance(data, dict):
+        data = data.get("items")
+    if not isinstance(data, list):
+        return None
+
+    result: Dict[str, str] = {}
+    for entry in data:
+        if not isinstance(entry, dict):
+            return None
+        item_id, text = entry.get("id"), entry.get("text")
+        if not isinstance(item_id, str) or not isinstance(text, str) or not text.strip():
+            return None
+        if item_id in result:
+            return None
+        result[item_id] = text.strip()
+
+    if set(result) != set(expected_ids):
+        return None
+    return result
+
+
+def clean_in_batches(
+    texts: Sequence[str],
+    call_batch: Callable[[str], str],
+    call_single: Callable[[str], str],
+    instructions: str,
+    token_budget: int = 2000,
+    max_items: int = 25,
+) -> List[Optional[str]]:
+    """
+    Metinleri paketler halinde temizler.
+    - call_batch: JSON dizisi girdisini (build_batch_input) alıp modelin ham
+      cevabını döndürür
+    - call_single: tek metni temizler (paket bozuk gelirse kullanılır)
+    Sonuç listesi girdiyle aynı sırada; tekli istek de hata verdiyse o öğe None.
+    """
+    instruction_tokens = estimate_tokens(instructions)
+    results: List[Optional[str]] = [None] * len(texts)
+
+    for batch in pack_items(texts, instruction_tokens, token_budget, max_items):
+        ids = [f"u{i}" for i in batch]
+        mapping: Optional[Dict[str, str]] = None
+
+        if len(batch) > 1:
+            _count(requests=1)
+            try:
+                output = call_batch(build_batch_input([(f"u{i}", texts[i]) for i in batch]))
+                mapping = parse_batch_output(output, ids)
+            except Exception as e:
+                print(f"[WARN] Paket isteği başarısız, tek tek denenecek: {e}")
+            if mapping is None:
+                _count(malformed_batches=1)
+
+        if mapping is not None:
+            for i, item_id in zip(batch, ids):
+                results[i] = mapping[item_id]
+            _count(
+                items=len(batch),
+                batched_items=len(batch),
+                tokens_saved=(len(batch) - 1) * instruction_tokens
+                - len(batch) * _ITEM_OVERHEAD_TOKENS,
+            )
+            continue
+
+        for i in batch:
+            _count(requests=1, items=1, fallback_items=1 if len(batch) > 1 else 0)
+            try:
+                results[i] = call_single(texts[i])
+            except Exception as e:
+                print(f"[WARN] Öğe temizlenemedi: {e}")
+
+    return results
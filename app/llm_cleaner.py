@@ -1,24 +1,64 @@
 # app/llm_cleaner.py
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Optional, Set
 
-from openai import OpenAI
+from .clean_cache import CleanCache, clean_key
+from .config import OPENAI_API_KEY, TTS_CLEAN_CACHE_PATH, TTS_LLM_FALLBACK_MAX_PENDING
+from .llm_batching import clean_in_batches
 
-from .config import OPENAI_API_KEY
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 
-_client: Optional[OpenAI] = None
+_client: Optional["OpenAI"] = None
 
 
-def get_client() -> OpenAI:
-    """OpenAI client'ı tekil (singleton gibi) oluşturur."""
+def get_client() -> "OpenAI":
+    """OpenAI client'ı tekil (singleton gibi) oluşturur (openai ilk kullanımda import edilir)."""
     global _client
     if _client is None:
+        from openai import OpenAI
+
         if not OPENAI_API_KEY:
             raise RuntimeError("OPENAI_API_KEY environment değişkeni tanımlı değil.")
         _client = OpenAI(api_key=OPENAI_API_KEY)
     return _client
 
 
+TTS_CLEAN_MODEL = "gpt-4o-mini"
+
+# Prompt metni değişirse bunu artır: eski cache kayıtları kullanılmaz
+TTS_CLEAN_PROMPT_VERSION = "v1"
+
+tts_clean_cache = CleanCache(TTS_CLEAN_CACHE_PATH)
+
+
+def _tts_instructions(target_lang: str) -> str:
+    return (
+        f"Sen {target_lang} dilinde çalışan bir metin temizleme asistansın. "
+        "Metni metin-okuma (TTS) için hazırlıyorsun.\n"
+        "- Emojileri ve chat kısaltmalarını kaldır.\n"
+        "- Gerekirse rakamları yazıyla ifade et.\n"
+        "- Cümleleri düzgün noktalama ile bitir.\n"
+        "- ÇIKTI OLARAK SADECE temizlenmiş metni ver."
+    )
+
+
+def _tts_batch_instructions(target_lang: str) -> str:
+    return (
+        f"Sen {target_lang} dilinde çalışan bir metin temizleme asistansın. "
+        "Metinleri metin-okuma (TTS) için hazırlıyorsun.\n"
+        'Girdi bir JSON dizisi: [{"id": "...", "text": "..."}, ...]\n'
+        "Her metin için ayrı ayrı:\n"
+        "- Emojileri ve chat kısaltmalarını kaldır.\n"
+        "- Gerekirse rakamları yazıyla ifade et.\n"
+        "- Cümleleri düzgün noktalama ile bitir.\n"
+        "- Metinleri birleştirme veya bölme; her id için tam bir sonuç ver.\n"
+        'ÇIKTI OLARAK SADECE aynı id\'lerle JSON dizisi ver: [{"id": "...", "text": "..."}, ...]'
+    )
+
+
 def clean_text_for_tts(text: str, target_lang: str = "tr") -> str:
     """
     LLM ile TTS öncesi metin temizliği:
@@ -30,19 +70,100 @@ def clean_text_for_tts(text: str, target_lang: str = "tr") -> str:
     client = get_client()
     try:
         response = client.responses.create(
-            model="gpt-4o-mini",
-            instructions=(
-                f"Sen {target_lang} dilinde çalışan bir metin temizleme asistansın. "
-                "Metni metin-okuma (TTS) için hazırlıyorsun.\n"
-                "- Emojileri ve chat kısaltmalarını kaldır.\n"
-                "- Gerekirse rakamları yazıyla ifade et.\n"
-                "- Cümleleri düzgün noktalama ile bitir.\n"
-                "- ÇIKTI OLARAK SADECE temizlenmiş metni ver."
-            ),
+            model=TTS_CLEAN_MODEL,
+            instructions=_tts_instructions(target_lang),
             input=text,
         )
         cleaned = response.output_text
         return cleaned.strip()
-    except Exception:
+    except Exception as e:
         # LLM'de hata olursa servisi çökertmemek için orijinal metni kullan.
+        print(f"[WARN] LLM temizliği başarısız, metin olduğu gibi kullanılıyor: {e}")
         return text.strip()
+
+
+def _tts_clean_key(text: str, target_lang: str) -> str:
+    return clean_key(f"{target_lang}:{text}", TTS_CLEAN_PROMPT_VERSION, TTS_CLEAN_MODEL)
+
+
+def cached_clean_text_for_tts(text: str, target_lang: str = "tr") -> Optional[str]:
+    """Daha önce arka planda temizlenmiş metin (yoksa None)."""
+    return tts_clean_cache.get(_tts_clean_key(text, target_lang))
+
+
+_fallback_pool: Optional[ThreadPoolExecutor] = None
+_fallback_pending: Set[str] = set()
+_fallback_lock = threading.Lock()
+
+
+def _clean_and_store(key: str, text: str, target_lang: str) -> None:
+    try:
+        response = get_client().responses.create(
+            model=TTS_CLEAN_MODEL,
+            instructions=_tts_instructions(target_lang),
+            input=text,
+        )
+        cleaned = response.output_text.strip()
+        if cleaned:
+            tts_clean_cache.put(key, cleaned)
+    except Exception as e:
+        # Hata cache'e yazılmaz; metin bir sonraki istekte yeniden denenir
+        print(f"[WARN] Arka plan LLM temizliği başarısız: {e}")
+    finally:
+        with _fallback_lock:
+            _fallback_pending.discard(key)
+
+
+def submit_clean_text_for_tts(text: str, target_lang: str = "tr") -> bool:
+    """
+    clean_text_for_tts'in beklemeyen hali: metni arka planda LLM'e gönderir,
+    sonuç cache'e yazılır (bkz. cached_clean_text_for_tts). Sentez yolu
+    cevabı beklemez. Aynı metin için tek istek uçar; bekleyen iş sayısı
+    TTS_LLM_FALLBACK_MAX_PENDING'i aşarsa yeni istekler atlanır.
+    Dönüş: iş kuyruğa alındıysa True.
+    """
+    global _fallback_pool
+    key = _tts_clean_key(text, target_lang)
+    with _fallback_lock:
+        if key in _fallback_pending or len(_fallback_pending) >= TTS_LLM_FALLBACK_MAX_PENDING:
+            return False
+        if tts_clean_cache.get(key) is not None:
+            return False
+        if _fallback_pool is None:
+            _fallback_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tts-llm")
+        _fallback_pending.add(key)
+    _fallback_pool.submit(_clean_and_store, key, text, target_lang)
+    return True
+
+
+def clean_texts_for_tts_batched(
+    texts: List[str],
+    target_lang: str = "tr",
+    token_budget: int = 2000,
+    max_items: int = 25,
+) -> List[str]:
+    """
+    clean_text_for_tts'in paketli hali: birden fazla metni tek istekte temizler.
+    Bozuk/uyumsuz paket cevabında tek tek clean_text_for_tts'e düşer.
+    Hata durumunda (tekil yolda olduğu gibi) orijinal metin kullanılır.
+    """
+    client = get_client()
+    instructions = _tts_batch_instructions(target_lang)
+
+    def call_batch(payload: str) -> str:
+        response = client.responses.create(
+            model=TTS_CLEAN_MODEL,
+            instructions=instructions,
+            input=payload,
+        )
+        return response.output_text
+
+    results = clean_in_batches(
+        texts,
+        call_batch=call_batch,
+        call_single=lambda t: clean_text_for_tts(t, target_lang=target_lang),
+        instructions=instructions,
+        token_budget=token_budget,
+        max_items=max_items,
+    )
+    return [r if r is not None else t.strip() for r, t in zip(results, texts)]
@@ -0,0 +1,203 @@
+# app/loudness.py
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Kümülatif enerji hesabında tek seferde işlenecek sample sayısı
+_ENERGY_BLOCK = 1 << 20
+
+_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+_LN10 = math.log(10)
+
+
+def samples_from_raw(raw_data: bytes, sample_width: int) -> np.ndarray:
+    """AudioSegment.raw_data'yı kopyalamadan NumPy dizisi olarak görür (mono)."""
+    return np.frombuffer(raw_data, dtype=_DTYPES[sample_width])
+
+
+def _cumulative_energy(samples: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """
+    Sıralı `positions` noktalarında sum(samples[:p] ** 2) değerleri.
+    16 bit ses için int64 ile tam (yuvarlamasız) hesaplanır; blok blok
+    ilerlediği için ses boyutunda ek bir kopya oluşmaz.
+    """
+    exact = samples.dtype.itemsize <= 2
+    acc_dtype = np.int64 if exact else np.float64
+    out = np.zeros(len(positions), dtype=acc_dtype)
+    total = acc_dtype(0)
+    n = len(samples)
+
+    for b0 in range(0, n, _ENERGY_BLOCK):
+        b1 = min(b0 + _ENERGY_BLOCK, n)
+        sq = samples[b0:b1].astype(acc_dtype)
+        sq *= sq
+        csum = np.cumsum(sq)
+        lo = np.searchsorted(positions, b0, side="right")
+        hi = np.searchsorted(positions, b1, side="right")
+        if hi > lo:
+            out[lo:hi] = total + csum[positions[lo:hi] - b0 - 1]
+        total += csum[-1]
+
+    return out
+
+
+def _cumulative_energy_per_ms(samples: np.ndarray, frames_per_ms: int, n_ms: int) -> np.ndarray:
+    """
+    Örnekleme hızı 1000'in katıysa (24 kHz vb.) hızlı yol: sesi (ms, örnek)
+    matrisi olarak görüp her ms'nin enerjisini einsum ile (int64, ara kopya
+    olmadan) bulur, sonra ms dizisinde cumsum alır.
+    """
+    n = len(samples)
+    full_ms = min(n // frames_per_ms, n_ms)
+    rows = samples[:full_ms * frames_per_ms].reshape(full_ms, frames_per_ms)
+
+    cum = np.empty(n_ms + 1, dtype=np.int64)
+    cum[0] = 0
+    per_ms = np.einsum("ij,ij->i", rows, rows, dtype=np.int64, casting="unsafe")
+    np.cumsum(per_ms, out=cum[1:full_ms + 1])
+
+    # Tam ms'ye denk gelmeyen kuyruk (pydub pozisyonu sesin sonuna kırpar)
+    if n_ms > full_ms:
+        tail = samples[full_ms * frames_per_ms:].astype(np.int64)
+        cum[full_ms + 1:] = cum[full_ms] + np.dot(tail, tail)
+    return cum
+
+
+class LoudnessIndex:
+    """
+    Bir kaydın her milisaniye sınırındaki kümülatif enerjisi.
+
+    Tek geçişte hesaplanır; sonrasında ms hizalı her pencerenin dBFS'i
+    (pydub'daki `audio[a:b].dBFS` ile aynı) iki dizi okumasıyla bulunur.
+    Trim, chunk skoru ve sessizlik oranı hep bu diziden türetilir.
+    """
+
+    def __init__(self, samples: np.ndarray, frame_rate: int, sample_width: int):
+        self.frame_rate = frame_rate
+        self.max_amplitude = float(2 ** (sample_width * 8)) / 2
+        self.n_frames = len(samples)
+        self.duration_ms = round(1000 * (self.n_frames / float(frame_rate)))
+
+        # Sadece ms başına bir int64 tutulur (16 bit / 24 kHz seste sesin 1/6'sı)
+        if frame_rate % 1000 == 0 and samples.dtype.itemsize <= 2:
+            self._cum = _cumulative_energy_per_ms(
+                samples, frame_rate // 1000, self.duration_ms
+            )
+        else:
+            ms = np.arange(self.duration_ms + 1, dtype=np.int64)
+            self._cum = _cumulative_energy(samples, self._frame_at(ms))
+
+    def _frame_at(self, ms: np.ndarray, clip: bool = True) -> np.ndarray:
+        # pydub: frame = int(ms * (frame_rate / 1000.0))
+        frames = (ms * (self.frame_rate / 1000.0)).astype(np.int64)
+        return np.minimum(frames, self.n_frames) if clip else frames
+
+    @classmethod
+    def from_segment(cls, audio) -> "LoudnessIndex":
+        samples = samples_from_raw(audio.raw_data, audio.sample_width)
+        return cls(samples, audio.frame_rate, audio.sample_width)
+
+    def dbfs(self, start_ms: np.ndarray, end_ms: np.ndarray) -> np.ndarray:
+        """[start_ms, end_ms) pencerelerinin dBFS değerleri (sessiz = -inf)."""
+        s = np.clip(np.asarray(start_ms, dtype=np.int64), 0, self.duration_ms)
+        e = np.clip(np.asarray(end_ms, dtype=np.int64), 0, self.duration_ms)
+        e = np.maximum(e, s)
+
+        # pydub, sesin sonunu birkaç frame aşan dilimleri sıfırla doldurur:
+        # enerji değişmez ama RMS'in paydası dolgulu uzunluktur
+        energy = (self._cum[e] - self._cum[s]).astype(np.float64)
+        count = (self._frame_at(e, clip=False) - self._frame_at(s, clip=False)).astype(np.float64)
+
+        # audioop.rms: (int) sqrt(sum_squares / n)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rms = np.floor(np.sqrt(np.where(count > 0, energy / count, 0.0)))
+            # pydub: 20 * math.log(ratio, 10) == 20 * (log(ratio) / log(10))
+            out = 20.0 * (np.log(rms / self.max_amplitude) / _LN10)
+        return out
+
+    def trim_bounds(
+        self,
+        silence_thresh_dbfs: float = -45.0,
+        chunk_ms: int = 300,
+    ) -> Tuple[int, int]:
+        """trim_leading_trailing_silence'ın kestiği [start_ms, end_ms) aralığı."""
+        total = self.duration_ms
+        if total <= chunk_ms:
+            return 0, total
+
+        # Baştan: start + chunk < len olduğu sürece chunk chunk ilerle
+        n_lead = (total - 1) // chunk_ms
+        starts = np.arange(n_lead, dtype=np.int64) * chunk_ms
+        loud = self.dbfs(starts, starts + chunk_ms) > silence_thresh_dbfs
+        start_ms = int(starts[np.argmax(loud)]) if loud.any() else n_lead * chunk_ms
+
+        # Sondan: end - chunk > start + chunk olduğu sürece geri çekil
+        span = total - start_ms - 2 * chunk_ms
+        n_tail = max(0, -(-span // chunk_ms))
+        ends = total - np.arange(n_tail, dtype=np.int64) * chunk_ms
+        loud = self.dbfs(ends - chunk_ms, ends) > silence_thresh_dbfs
+        end_ms = int(ends[np.argmax(loud)]) if loud.any() else total - n_tail * chunk_ms
+
+        return start_ms, end_ms
+
+    def chunk_scores(
+        self,
+        chunk_ms: int,
+        start_ms: int = 0,
+        end_ms: Optional[int] = None,
+        silence_threshold_dbfs: float = -45.0,
+        frame_ms: int = 200,
+    ) -> List[Optional[float]]:
+        """
+        [start_ms, end_ms) aralığını chunk_ms'lik parçalara bölüp her parçanın
+        konuşma skorunu döndürür: frame'lerin ortalama dBFS'i - 20 * sessiz
+        frame oranı. frame_ms'den kısa ya da %70'ten fazlası sessiz parça: None.
+        """
+        if end_ms is None:
+            end_ms = self.duration_ms
+        if end_ms <= start_ms:
+            return []
+
+        chunk_starts = np.arange(start_ms, end_ms, chunk_ms, dtype=np.int64)
+        chunk_ends = np.minimum(chunk_starts + chunk_ms, end_ms)
+        return self.segment_scores(chunk_starts, chunk_ends, silence_threshold_dbfs, frame_ms)
+
+    def segment_scores(
+        self,
+        starts_ms: np.ndarray,
+        ends_ms: np.ndarray,
+        silence_threshold_dbfs: float = -45.0,
+        frame_ms: int = 200,
+    ) -> List[Optional[float]]:
+        """Uzunlukları farklı olabilen [start, end) parçaları için aynı skor."""
+        chunk_starts = np.asarray(starts_ms, dtype=np.int64)
+        chunk_ends = np.asarray(ends_ms, dtype=np.int64)
+        if len(chunk_starts) == 0:
+            return []
+        chunk_lens = chunk_ends - chunk_starts
+        chunk_ms = int(chunk_lens.max())
+
+        # (chunk, frame) matrisi; chunk sonunu aşan frame'ler maskelenir
+        offsets = np.arange(0, chunk_ms, frame_ms, dtype=np.int64)
+        f_start = chunk_starts[:, None] + offsets[None, :]
+        f_end = np.minimum(f_start + frame_ms, chunk_ends[:, None])
+        valid = f_start < chunk_ends[:, None]
+
+        loud = np.where(valid, self.dbfs(f_start, f_end), 0.0)
+        n_frames = valid.sum(axis=1)
+        silent = ((loud < silence_threshold_dbfs) & valid).sum(axis=1)
+
+        # Python'daki sum() ile aynı sırada toplamak için cumsum
+        avg = np.cumsum(loud, axis=1)[:, -1] / n_frames
+        ratio = silent / n_frames
+        scores = avg - ratio * 20.0
+
+        out: List[Optional[float]] = []
+        for length, r, sc in zip(chunk_lens.tolist(), ratio.tolist(), scores.tolist()):
+            if length < frame_ms or r > 0.7:
+                out.append(None)
+            else:
+                out.append(float(sc))
+        return out
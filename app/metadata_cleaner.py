@@ -1,23 +1,36 @@
 # app/metadata_cleaner.py
 from pathlib import Path
+import asyncio
 import os
+import random
 import time
-from typing import Tuple
+from typing import List, Optional, Tuple
 
-from openai import OpenAI
+import openai
+from openai import AsyncOpenAI, OpenAI
+
+from .clean_cache import CleanCache, atomic_write_text, clean_key
+from .config import LLM_CLEAN_CACHE_PATH
+from .llm_batching import clean_in_batches, estimate_tokens
+from .rate_limit import AsyncTokenBucket
 
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+CLEAN_MODEL = "gpt-4.1-mini"  # veya hesabında hangisi uygunsa
 
-def clean_text_with_llm(raw_text: str) -> str:
-    """
-    Whisper çıkışı bir cümleyi LLM ile temizler:
-    - Yazım ve noktalama düzelt
-    - Türkçe karakterleri düzelt
-    - 'eee, ııı, şey, yani' gibi doldurucu ifadeleri mümkün olduğunca kaldır
-    - Anlamı koru, kısaltma/özetleme yapma
-    """
-    prompt = f"""
+# Prompt metni değişirse bunu artır: eski cache kayıtları kullanılmaz
+CLEAN_PROMPT_VERSION = "v1"
+
+clean_cache = CleanCache(LLM_CLEAN_CACHE_PATH)
+
+
+def _cache_key(raw_text: str, batched: bool = False) -> str:
+    version = f"{CLEAN_PROMPT_VERSION}-batch" if batched else CLEAN_PROMPT_VERSION
+    return clean_key(raw_text, version, CLEAN_MODEL)
+
+
+def build_clean_prompt(raw_text: str) -> str:
+    return f"""
 Aşağıdaki Türkçe cümleyi, sesli konuşma transkriptini eğitim için temizlemeni istiyorum.
 
 Kurallar:
@@ -33,27 +46,234 @@ METİN:
 \"\"\"{raw_text}\"\"\"    
     """.strip()
 
+
+BATCH_CLEAN_INSTRUCTIONS = """
+Sana JSON dizisi olarak Türkçe konuşma transkripti cümleleri veriyorum:
+[{"id": "...", "text": "..."}, ...]
+Her cümleyi eğitim için temizle.
+
+Kurallar:
+- Yazım ve noktalama hatalarını düzelt.
+- Türkçe karakterleri düzelt (ı, ğ, ş, ö, ü, ç).
+- "ııı", "eee", "şey", "yani", "hani" gibi tamamen doldurucu ifadeleri mümkün olduğunca kaldır.
+- Cümlenin anlamını ve kelime dizilimini olabildiğince koru.
+- Yeni bilgi ekleme, cümleyi özetleme veya kısaltma.
+- Sayıları ve özel isimleri değiştirme.
+- Cümleleri birleştirme veya bölme; her id için tam olarak bir sonuç ver.
+
+ÇIKTI: Sadece aynı id'lerle JSON dizisi döndür, açıklama yazma:
+[{"id": "...", "text": "<düzeltilmiş cümle>"}, ...]
+""".strip()
+
+
+def clean_text_with_llm(raw_text: str) -> str:
+    """
+    Whisper çıkışı bir cümleyi LLM ile temizler:
+    - Yazım ve noktalama düzelt
+    - Türkçe karakterleri düzelt
+    - 'eee, ııı, şey, yani' gibi doldurucu ifadeleri mümkün olduğunca kaldır
+    - Anlamı koru, kısaltma/özetleme yapma
+    """
     resp = client.responses.create(
-        model="gpt-4.1-mini",  # veya hesabında hangisi uygunsa
-        input=prompt,
+        model=CLEAN_MODEL,
+        input=build_clean_prompt(raw_text),
     )
 
     cleaned = resp.output[0].content[0].text.strip()
     return cleaned
 
 
+def clean_texts_with_llm_batched(
+    raw_texts: List[str],
+    token_budget: int = 2000,
+    max_items: int = 25,
+) -> List[Optional[str]]:
+    """
+    Birden fazla cümleyi, token bütçesine sığacak kadarını tek istekte
+    (JSON dizisi olarak) temizler. Talimat metni paket başına bir kez gider.
+    Cevap bozuk ya da id'ler uyuşmuyorsa o paket tek tek temizlenir;
+    o da başarısız olan öğe için None döner.
+    Sayaçlar: llm_batching.get_batch_stats().
+    """
+    def call_batch(payload: str) -> str:
+        resp = client.responses.create(
+            model=CLEAN_MODEL,
+            instructions=BATCH_CLEAN_INSTRUCTIONS,
+            input=payload,
+        )
+        return resp.output[0].content[0].text
+
+    return clean_in_batches(
+        raw_texts,
+        call_batch=call_batch,
+        call_single=clean_text_with_llm,
+        instructions=BATCH_CLEAN_INSTRUCTIONS,
+        token_budget=token_budget,
+        max_items=max_items,
+    )
+
+
+def _retry_delay(exc: Exception, attempt: int, base: float, cap: float) -> Optional[float]:
+    """Tekrar denenebilir hata ise beklenecek süre, değilse None."""
+    retryable = isinstance(exc, (openai.RateLimitError, openai.APIConnectionError)) or (
+        isinstance(exc, openai.APIStatusError) and exc.status_code >= 500
+    )
+    if not retryable:
+        return None
+
+    response = getattr(exc, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(cap, float(retry_after))
+        except ValueError:
+            pass
+    # Exponential backoff + jitter
+    return min(cap, base * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
+async def clean_text_with_llm_async(
+    aclient: AsyncOpenAI,
+    raw_text: str,
+    request_bucket: Optional[AsyncTokenBucket] = None,
+    token_bucket: Optional[AsyncTokenBucket] = None,
+    max_retries: int = 6,
+    backoff_base: float = 1.0,
+    backoff_cap: float = 60.0,
+) -> str:
+    """
+    clean_text_with_llm'in async hali.
+    - İstek ve token bütçesi token bucket'lardan alınır
+    - 429 / 5xx / bağlantı hatalarında exponential backoff ile tekrar dener
+    """
+    prompt = build_clean_prompt(raw_text)
+    # Girdi + yaklaşık aynı uzunlukta çıktı
+    tokens = estimate_tokens(prompt) + estimate_tokens(raw_text)
+
+    for attempt in range(max_retries + 1):
+        if request_bucket is not None:
+            await request_bucket.acquire(1)
+        if token_bucket is not None:
+            await token_bucket.acquire(tokens)
+        try:
+            resp = await aclient.responses.create(model=CLEAN_MODEL, input=prompt)
+            return resp.output[0].content[0].text.strip()
+        except Exception as e:
+            delay = _retry_delay(e, attempt, backoff_base, backoff_cap)
+            if delay is None or attempt == max_retries:
+                raise
+            await asyncio.sleep(delay)
+
+    raise RuntimeError("unreachable")
+
+
+def _read_metadata(metadata_path: Path) -> Tuple[int, List[Tuple[int, str, str]]]:
+    """metadata.csv'den (satır no, audio_rel, raw_text) listesi."""
+    lines = metadata_path.read_text(encoding="utf-8").splitlines()
+    entries: List[Tuple[int, str, str]] = []
+    for idx, line in enumerate(lines, start=1):
+        if "|" not in line:
+            continue
+        audio_rel, raw_text = line.split("|", 1)
+        raw_text = raw_text.strip()
+        if not raw_text:
+            continue
+        entries.append((idx, audio_rel, raw_text))
+    return len(lines), entries
+
+
+async def clean_metadata_file_async(
+    metadata_path: Path,
+    out_path: Path | None = None,
+    concurrency: int = 8,
+    requests_per_minute: float = 500,
+    tokens_per_minute: float = 200_000,
+    aclient: Optional[AsyncOpenAI] = None,
+) -> Path:
+    """
+    clean_metadata_file'ın eşzamanlı hali.
+    - Aynı anda en fazla `concurrency` istek
+    - Dakikalık istek ve token limitleri (token bucket)
+    - 429/5xx'te backoff; çıktı sırası girdiyle aynı
+    - Cache'te olan satırlar LLM'e hiç gitmez
+    """
+    metadata_path = metadata_path.resolve()
+    if out_path is None:
+        out_path = metadata_path.with_suffix(".cleaned.csv")
+
+    print(f"[INFO] Metadata temizleme (async, eşzamanlılık={concurrency}) başlıyor:")
+    print(f"  Girdi : {metadata_path}")
+    print(f"  Çıktı : {out_path}")
+
+    n_lines, entries = _read_metadata(metadata_path)
+    if aclient is None:
+        # Tekrar denemeyi kendimiz yapıyoruz, SDK'nınki kapalı
+        aclient = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+
+    request_bucket = AsyncTokenBucket.per_minute(requests_per_minute)
+    token_bucket = AsyncTokenBucket.per_minute(tokens_per_minute)
+    semaphore = asyncio.Semaphore(concurrency)
+    cleaned_texts: List[str] = [""] * len(entries)
+
+    todo = []
+    for pos, (idx, audio_rel, raw_text) in enumerate(entries):
+        cached = clean_cache.get(_cache_key(raw_text))
+        if cached is not None:
+            cleaned_texts[pos] = cached
+        else:
+            todo.append((pos, idx, audio_rel, raw_text))
+    print(f"[INFO] {len(entries) - len(todo)} satır cache'ten, {len(todo)} satır LLM'e gidecek")
+
+    async def worker(pos: int, idx: int, audio_rel: str, raw_text: str) -> None:
+        async with semaphore:
+            try:
+                cleaned = await clean_text_with_llm_async(
+                    aclient, raw_text, request_bucket, token_bucket
+                )
+                clean_cache.put(_cache_key(raw_text), cleaned)
+                cleaned_texts[pos] = cleaned
+            except Exception as e:
+                print(f"[WARN] Satır temizlenemedi, orijinali kullanılıyor: {e}")
+                cleaned_texts[pos] = raw_text
+            print(f"[{idx}/{n_lines}] LLM temizliği: {audio_rel}")
+
+    await asyncio.gather(*(worker(*job) for job in todo))
+
+    cleaned_lines = [
+        f"{audio_rel}|{text}"
+        for (_, audio_rel, _), text in zip(entries, cleaned_texts)
+    ]
+    atomic_write_text(out_path, "\n".join(cleaned_lines))
+    print(f"[OK] Temizlenmiş metadata kaydedildi: {out_path}")
+    return out_path
+
+
 def clean_metadata_file(
     metadata_path: Path,
     out_path: Path | None = None,
     sleep_between: float = 0.2,
+    concurrency: int = 1,
+    batched: bool = False,
 ) -> Path:
     """
     metadata.csv içindeki tüm satırları LLM ile temizler.
     Girdi formatı:  audio/utt_0001.wav|Merhaba esra simdi sana guzel bir hikaye anlatacagim
     Çıktı formatı:  audio/utt_0001.wav|Merhaba Esra, şimdi sana güzel bir hikâye anlatacağım.
 
-    Orijinal dosyaya dokunmaz, yeni bir .cleaned.csv oluşturur.
+    Orijinal dosyaya dokunmaz, yeni bir .cleaned.csv oluşturur (atomik).
+    Her LLM sonucu anında kalıcı cache'e yazılır; yarıda kalan ya da örtüşen
+    veri setleriyle tekrar çalıştırınca sadece yeni/değişen satırlar LLM'e gider.
+    concurrency > 1 ise clean_metadata_file_async kullanılır.
+    batched=True ise satırlar paketlenip istek başına birden çok cümle gönderilir
+    (sıralı; concurrency > 1 ile birlikte kullanılamaz).
     """
+    if batched and concurrency > 1:
+        raise ValueError("batched=True sadece concurrency=1 ile kullanılabilir")
+    if concurrency > 1:
+        return asyncio.run(
+            clean_metadata_file_async(metadata_path, out_path, concurrency=concurrency)
+        )
+
     metadata_path = metadata_path.resolve()
     if out_path is None:
         out_path = metadata_path.with_suffix(".cleaned.csv")
@@ -62,22 +282,24 @@ def clean_metadata_file(
     print(f"  Girdi : {metadata_path}")
     print(f"  Çıktı : {out_path}")
 
-    lines = metadata_path.read_text(encoding="utf-8").splitlines()
-    cleaned_lines: list[str] = []
+    n_lines, entries = _read_metadata(metadata_path)
+    if batched:
+        return _clean_entries_batched(entries, out_path)
 
-    for idx, line in enumerate(lines, start=1):
-        if "|" not in line:
-            continue
-
-        audio_rel, raw_text = line.split("|", 1)
-        raw_text = raw_text.strip()
+    cleaned_lines: list[str] = []
 
-        if not raw_text:
+    for idx, audio_rel, raw_text in entries:
+        key = _cache_key(raw_text)
+        cached = clean_cache.get(key)
+        if cached is not None:
+            # Önceki (yarıda kalmış ya da örtüşen) çalıştırmada zaten ödenmiş
+            cleaned_lines.append(f"{audio_rel}|{cached}")
             continue
 
-        print(f"[{idx}/{len(lines)}] LLM temizliği: {audio_rel}")
+        print(f"[{idx}/{n_lines}] LLM temizliği: {audio_rel}")
         try:
             cleaned_text = clean_text_with_llm(raw_text)
+            clean_cache.put(key, cleaned_text)
         except Exception as e:
             print(f"[WARN] Satır temizlenemedi, orijinali kullanılıyor: {e}")
             cleaned_text = raw_text
@@ -85,6 +307,37 @@ def clean_metadata_file(
         cleaned_lines.append(f"{audio_rel}|{cleaned_text}")
         time.sleep(sleep_between)  # oranı çok zorlamamak için
 
-    out_path.write_text("\n".join(cleaned_lines), encoding="utf-8")
+    atomic_write_text(out_path, "\n".join(cleaned_lines))
+    print(f"[OK] Temizlenmiş metadata kaydedildi: {out_path}")
+    return out_path
+
+
+def _clean_entries_batched(entries: List[Tuple[int, str, str]], out_path: Path) -> Path:
+    cleaned_texts: List[Optional[str]] = [
+        clean_cache.get(_cache_key(raw_text, batched=True)) for _, _, raw_text in entries
+    ]
+    todo = [pos for pos, text in enumerate(cleaned_texts) if text is None]
+    print(f"[INFO] {len(entries) - len(todo)} satır cache'ten, {len(todo)} satır paketlenecek")
+
+    # Paket paket ilerle ki her paketin sonucu hemen cache'e yazılsın
+    chunk = 100
+    for start in range(0, len(todo), chunk):
+        part = todo[start:start + chunk]
+        raw_texts = [entries[pos][2] for pos in part]
+        results = clean_texts_with_llm_batched(raw_texts)
+        for pos, raw_text, cleaned in zip(part, raw_texts, results):
+            if cleaned is None:
+                print(f"[WARN] Satır temizlenemedi, orijinali kullanılıyor: {entries[pos][1]}")
+                cleaned = raw_text
+            else:
+                clean_cache.put(_cache_key(raw_text, batched=True), cleaned)
+            cleaned_texts[pos] = cleaned
+        print(f"[{min(start + chunk, len(todo))}/{len(todo)}] paketli LLM temizliği")
+
+    cleaned_lines = [
+        f"{audio_rel}|{text}"
+        for (_, audio_rel, _), text in zip(entries, cleaned_texts)
+    ]
+    atomic_write_text(out_path, "\n".join(cleaned_lines))
     print(f"[OK] Temizlenmiş metadata kaydedildi: {out_path}")
     return out_path
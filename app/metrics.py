@@ -0,0 +1,272 @@
+# app/metrics.py
+"""
+Hafif span / metrik katmanı.
+
+    with metrics.span("filter", audio_sec=audio.duration_seconds):
+        ...
+
+    with metrics.span("tts") as sp:
+        wav = ...
+        sp.set(audio_sec=len(wav) / sr)
+
+Kapalıyken (varsayılan) span() paylaşılan bir no-op nesne döndürür: tek bir
+bool kontrolü dışında maliyet yok. Açmak için METRICS=1 (ve isteğe bağlı
+METRICS_PATH=...jsonl, METRICS_TRACEMALLOC=1) ya da metrics.enable().
+
+Her span bitince: duvar süresi, RSS (anlık fark + tepe), isteğe bağlı
+tracemalloc farkı/tepesi, işlenen ses saniyesi ve real-time factor
+(süre / ses). Span'lar JSON satırı olarak dosyaya eklenir ve süreç içinde
+isme göre toplanır (summary(), prometheus_text()).
+"""
+import functools
+import json
+import os
+import resource
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .config import METRICS_ENABLED, METRICS_PATH, METRICS_TRACEMALLOC
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _rss_bytes() -> int:
+    """Anlık RSS (Linux: /proc), yoksa tepe RSS."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return _peak_rss_bytes()
+
+
+def _peak_rss_bytes() -> int:
+    # Linux'ta KB, macOS'ta byte
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+@dataclass
+class StageTotals:
+    calls: int = 0
+    wall_sec: float = 0.0
+    audio_sec: float = 0.0
+    max_wall_sec: float = 0.0
+    peak_rss_bytes: int = 0
+    max_alloc_peak_bytes: int = 0
+
+    @property
+    def rtf(self) -> Optional[float]:
+        return self.wall_sec / self.audio_sec if self.audio_sec > 0 else None
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def set(self, **fields) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Registry:
+    def __init__(self):
+        self.enabled = False
+        self.jsonl_path: Optional[Path] = None
+        self.tracemalloc = False
+        self.totals: Dict[str, StageTotals] = {}
+        # tracemalloc tepesi süreç geneli: açık span'lar (tüm thread'ler) burada
+        self.alloc_spans: set = set()
+        self._lock = threading.Lock()
+        self._fh = None
+
+    def record(self, row: dict) -> None:
+        with self._lock:
+            t = self.totals.setdefault(row["name"], StageTotals())
+            t.calls += 1
+            t.wall_sec += row["wall_sec"]
+            t.max_wall_sec = max(t.max_wall_sec, row["wall_sec"])
+            t.audio_sec += row.get("audio_sec") or 0.0
+            t.peak_rss_bytes = max(t.peak_rss_bytes, row["rss_peak_bytes"])
+            t.max_alloc_peak_bytes = max(t.max_alloc_peak_bytes, row.get("alloc_peak_bytes", 0))
+
+            if self.jsonl_path is not None:
+                if self._fh is None:
+                    self.jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+                    self._fh = self.jsonl_path.open("a", encoding="utf-8")
+                self._fh.write(json.dumps(row, ensure_ascii=False) + "\n")
+                self._fh.flush()
+
+
+_registry = _Registry()
+
+
+class Span:
+    __slots__ = ("name", "fields", "_t0", "_rss0", "_alloc0", "_alloc_peak")
+
+    def __init__(self, name: str, fields: dict):
+        self.name = name
+        self.fields = fields
+
+    def set(self, **fields) -> None:
+        """Span sürerken bilinen değerleri ekler (ör. audio_sec)."""
+        self.fields.update(fields)
+
+    def __enter__(self) -> "Span":
+        self._rss0 = _rss_bytes()
+        if _registry.tracemalloc:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            with _registry._lock:
+                # reset_peak açık (dış / paralel) span'ların tepesini siler:
+                # o ana kadarki tepe önce onlara aktarılır
+                current, peak = tracemalloc.get_traced_memory()
+                for other in _registry.alloc_spans:
+                    other._alloc_peak = max(other._alloc_peak, peak)
+                tracemalloc.reset_peak()
+                self._alloc0 = self._alloc_peak = current
+                _registry.alloc_spans.add(self)
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        wall = time.perf_counter() - self._t0
+        row = {
+            "ts": time.time(),
+            "name": self.name,
+            "wall_sec": wall,
+            "rss_delta_bytes": _rss_bytes() - self._rss0,
+            "rss_peak_bytes": _peak_rss_bytes(),
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+        }
+        if _registry.tracemalloc and tracemalloc.is_tracing():
+            with _registry._lock:
+                current, peak = tracemalloc.get_traced_memory()
+                _registry.alloc_spans.discard(self)
+            row["alloc_delta_bytes"] = current - self._alloc0
+            row["alloc_peak_bytes"] = max(peak, self._alloc_peak) - self._alloc0
+        audio_sec = self.fields.get("audio_sec")
+        if audio_sec:
+            row["rtf"] = wall / audio_sec
+        if exc_type is not None:
+            row["error"] = exc_type.__name__
+        row.update(self.fields)
+        _registry.record(row)
+
+
+def span(name: str, **fields):
+    """Ölçüm bloğu. Kapalıyken no-op; açıkken bitişte kaydedilir."""
+    if not _registry.enabled:
+        return _NOOP
+    return Span(name, dict(fields))
+
+
+def traced(name: str):
+    """Fonksiyonun tamamını span olarak ölçen dekoratör (etkinlik çağrı anında kontrol edilir)."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _registry.enabled:
+                return fn(*args, **kwargs)
+            with Span(name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def enable(jsonl_path: Optional[Path] = None, trace_allocations: bool = False) -> None:
+    _registry.enabled = True
+    _registry.jsonl_path = Path(jsonl_path) if jsonl_path else None
+    _registry.tracemalloc = trace_allocations
+    # spawn ile açılan worker'lar (Whisper havuzu) config'i env'den okur
+    os.environ["METRICS"] = "1"
+    if jsonl_path:
+        os.environ["METRICS_PATH"] = str(jsonl_path)
+    if trace_allocations:
+        os.environ["METRICS_TRACEMALLOC"] = "1"
+
+
+def disable() -> None:
+    _registry.enabled = False
+
+
+def is_enabled() -> bool:
+    return _registry.enabled
+
+
+def reset() -> None:
+    with _registry._lock:
+        _registry.totals.clear()
+
+
+def summary() -> Dict[str, StageTotals]:
+    with _registry._lock:
+        return {k: StageTotals(**vars(v)) for k, v in _registry.totals.items()}
+
+
+def print_summary() -> None:
+    totals = summary()
+    if not totals:
+        return
+    print("Aşama metrikleri:")
+    print(f"  {'aşama':<26} {'çağrı':>6} {'toplam sn':>10} {'ses sn':>9} {'RTF':>8} {'tepe RSS MB':>12}")
+    for name, t in sorted(totals.items(), key=lambda kv: -kv[1].wall_sec):
+        rtf = f"{t.rtf:.4f}" if t.rtf is not None else "-"
+        print(
+            f"  {name:<26} {t.calls:>6} {t.wall_sec:>10.2f} {t.audio_sec:>9.1f} "
+            f"{rtf:>8} {t.peak_rss_bytes / 1024**2:>12.0f}"
+        )
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(prefix: str = "tts") -> str:
+    """Toplamları Prometheus text exposition formatında döndürür."""
+    totals = summary()
+    metrics = [
+        ("stage_calls_total", "counter", "Aşama çağrı sayısı", lambda t: t.calls),
+        ("stage_seconds_total", "counter", "Aşamada geçen toplam süre (sn)", lambda t: t.wall_sec),
+        ("stage_seconds_max", "gauge", "En uzun tek çağrı (sn)", lambda t: t.max_wall_sec),
+        ("stage_audio_seconds_total", "counter", "İşlenen toplam ses (sn)", lambda t: t.audio_sec),
+        ("stage_real_time_factor", "gauge", "Toplam süre / toplam ses", lambda t: t.rtf),
+        ("stage_peak_rss_bytes", "gauge", "Aşama bitişinde görülen tepe RSS", lambda t: t.peak_rss_bytes),
+        ("stage_alloc_peak_bytes", "gauge", "tracemalloc tepe artışı", lambda t: t.max_alloc_peak_bytes),
+    ]
+    lines: List[str] = []
+    for suffix, kind, help_text, get in metrics:
+        name = f"{prefix}_{suffix}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for stage, t in sorted(totals.items()):
+            value = get(t)
+            if value is None:
+                continue
+            lines.append(f'{name}{{stage="{_label(stage)}"}} {float(value):.6g}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: Path, prefix: str = "tts") -> Path:
+    """node_exporter textfile collector'ı için atomik yazım."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(prometheus_text(prefix), encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+
+if METRICS_ENABLED:
+    enable(METRICS_PATH, METRICS_TRACEMALLOC)
@@ -0,0 +1,115 @@
+# app/output_cache.py
+import hashlib
+import json
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from .array_cache import evict_lru
+from .tts_engine import backend_id
+from .config import (
+    OUTPUTS_DIR,
+    XTTS_GENERATION_OVERRIDES,
+    OUTPUT_CACHE_MAX_BYTES,
+    OUTPUT_CACHE_MAX_FILES,
+)
+
+OUTPUT_CACHE_DIR = OUTPUTS_DIR / "cache"
+# Tek bir çıktının yazımı bundan uzun sürmez: daha eski .tmp. dosyası yarım kalmıştır
+STALE_TMP_SEC = 3600.0
+
+
+@dataclass
+class OutputCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+_stats = OutputCacheStats()
+_lock = threading.Lock()
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def output_key(voice_id: str, refs_key: str, text: str, language: str) -> str:
+    """
+    voice + referans içeriği + normalize metin + dil + model + üretim
+    parametrelerinden çıktı anahtarı. Referanslar güncellenirse (refs_key)
+    eski çıktılar kendiliğinden geçersiz olur.
+    """
+    payload = json.dumps(
+        {
+            "voice_id": voice_id,
+            "refs": refs_key,
+            "text": normalize_text(text),
+            "language": language,
+            "model": backend_id(),
+            "generation": XTTS_GENERATION_OVERRIDES,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cached_output_path(key: str) -> Path:
+    return OUTPUT_CACHE_DIR / f"{key}.wav"
+
+
+def link_output(key: str, dest: Path) -> None:
+    """
+    Cache'teki çıktıyı isteğe özel dest'e bağlar (hard link; farklı dosya
+    sistemi vb. yüzünden olmazsa kopya). Cache dosyası LRU ile silinse de dest
+    kalır. Cache dosyası yoksa FileNotFoundError.
+    """
+    path = cached_output_path(key)
+    try:
+        os.link(path, dest)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        shutil.copyfile(path, dest)
+
+
+def lookup(key: str, dest: Path) -> bool:
+    """Hit ise mevcut dosyayı dest'e bağlar (ve LRU için mtime'ını tazeler)."""
+    try:
+        os.utime(cached_output_path(key))
+        link_output(key, dest)
+    except FileNotFoundError:  # yok ya da bu arada LRU ile silindi
+        with _lock:
+            _stats.misses += 1
+        return False
+    with _lock:
+        _stats.hits += 1
+    return True
+
+
+def store(key: str) -> None:
+    """Yeni çıktı yazıldıktan sonra çağrılır; bütçe aşıldıysa eskileri siler."""
+    with _lock:
+        removed = evict_lru(
+            OUTPUT_CACHE_DIR,
+            "*.wav",
+            max_bytes=OUTPUT_CACHE_MAX_BYTES,
+            max_files=OUTPUT_CACHE_MAX_FILES,
+            keep=key,
+            stale_tmp_sec=STALE_TMP_SEC,
+        )
+        _stats.evictions += removed
+
+
+def cache_stats() -> OutputCacheStats:
+    with _lock:
+        return OutputCacheStats(_stats.hits, _stats.misses, _stats.evictions)
@@ -1,59 +1,112 @@
 # app/pipeline.py
 import uuid
 from pathlib import Path
-from dataclasses import dataclass
-from typing import Dict, List
-
-from .config import OUTPUTS_DIR
-from .audio_preprocess import extract_speaker_segments
-from .tts_engine import synthesize_to_wav, LanguageCode
-# İstersen sonra açarız:
-# from .llm_cleaner import clean_text_for_tts
-
-
-@dataclass
-class VoiceProfile:
-    voice_id: str
-    person_dir: Path
-    speaker_wav_paths: List[Path]   # çoklu referans segmentler
-    total_duration_sec: float
-
-
-# Basit bir registry: bu session içinde oluşturulan profilleri tutuyoruz
-VOICE_REGISTRY: Dict[str, VoiceProfile] = {}
-
-
-def enroll_from_person_folder(person_dir: Path) -> VoiceProfile:
+from typing import AsyncIterator, Iterator, Optional
+
+from . import metrics, output_cache
+from .config import (
+    OUTPUTS_DIR,
+    VOICE_DB_PATH,
+    OUTPUT_CACHE_ENABLED,
+    TTS_TEXT_NORMALIZE,
+    TTS_LLM_FALLBACK,
+)
+from .audio_preprocess import list_audio_files, extract_speaker_segments
+from .fingerprint import refresh_fingerprints
+from .speaker_latents import get_speaker_latents, latents_key
+from .streaming import AudioChunk, StreamStats, aiter_chunks, collect_to_wav, stream_sentences
+from .llm_cleaner import cached_clean_text_for_tts, submit_clean_text_for_tts
+from .text_normalize import normalize_for_tts
+from .text_split import split_sentences
+from .tts_engine import (
+    synthesize_with_latents,
+    synthesize_sentence,
+    get_output_sample_rate,
+    LanguageCode,
+)
+from .voice_store import UnknownVoice, VoiceProfile, VoiceStore
+
+
+# Kalıcı registry: profiller SQLite'ta, restart sonrası yeniden enroll gerekmez
+VOICE_REGISTRY = VoiceStore(VOICE_DB_PATH)
+
+
+@metrics.traced("enroll")
+def enroll_from_person_folder(person_dir: Path, new_voice: bool = False) -> VoiceProfile:
     """
     Aynı kişiye ait bir klasörden (içinde mp3/mp4/m4a/wav vb.)
     voice profile oluşturur.
 
-    - Tüm kayıtları birleştirir
-    - Denoise + normalize + sessizlik kırpma yapar
-    - 8 sn'lik chunk'lara böler
-    - Konuşma skoruna göre en iyi N chunk'ı seçer
+    - Kayıtları dosya dosya denoise + normalize + sessizlik kırpma yapar
+    - ~8 sn'lik, kenarları sessiz anlara oturan chunk'lara böler
+    - Konuşma skoruna göre referansları seçer (REF_SELECTION): varsayılan en
+      iyi N chunk, "min_duration" ile ~REF_TARGET_SEC'i karşılayan en az chunk
     - Bu segmentleri XTTS referansı olarak saklar
-    """
-    voice_id = str(uuid.uuid4())
 
-    ref_paths, total_dur = extract_speaker_segments(
+    Klasör daha önce enroll edildiyse (new_voice=False) aynı voice_id
+    korunur: sadece yeni / değişmiş dosyalar işlenir, referanslar yerinde
+    güncellenir. Hiçbir dosya değişmediyse profil olduğu gibi döner.
+    """
+    files = list_audio_files(person_dir)
+    existing = None if new_voice else VOICE_REGISTRY.find_by_person_dir(person_dir)
+
+    if existing is not None:
+        fingerprints = refresh_fingerprints(files, existing.source_fingerprints)
+        if fingerprints == existing.source_fingerprints and all(p.exists() for p in existing.speaker_wav_paths):
+            print(f"[INFO] Klasör değişmemiş, mevcut voice kullanılıyor: {existing.voice_id}")
+            return existing
+        voice_id = existing.voice_id
+        changed = [n for n, fp in fingerprints.items() if existing.source_fingerprints.get(n) != fp]
+        removed = [n for n in existing.source_fingerprints if n not in fingerprints]
+        print(
+            f"[INFO] Yeniden enroll: {voice_id} "
+            f"({len(changed)} yeni/değişmiş, {len(removed)} silinmiş dosya)"
+        )
+    else:
+        fingerprints = refresh_fingerprints(files, {})
+        voice_id = str(uuid.uuid4())
+
+    refs, total_dur = extract_speaker_segments(
         person_dir=person_dir,
         voice_id=voice_id,
-        segment_sec=8.0,   # her segment ~8 saniye
-        max_segments=12,   # en iyi 12 segmenti al (toplam ~1.5–2 dk referans)
+        segment_sec=8.0,   # her segment ~8 saniye (kesimler sessiz anlara oturur)
+        max_segments=12,   # top_n: bu kadar; min_duration: üst sınır (~REF_TARGET_SEC kadar referans)
+        known_sha256={name: fp["sha256"] for name, fp in fingerprints.items()},
     )
 
     profile = VoiceProfile(
         voice_id=voice_id,
         person_dir=person_dir,
-        speaker_wav_paths=ref_paths,
+        speaker_wav_paths=[r.path for r in refs],
         total_duration_sec=total_dur,
+        ref_durations=[r.duration_sec for r in refs],
+        ref_scores=[r.score for r in refs],
+        source_fingerprints=fingerprints,
     )
 
     VOICE_REGISTRY[voice_id] = profile
     return profile
 
 
+def prepare_tts_text(text: str, language: LanguageCode = "tr") -> str:
+    """
+    Sentez öncesi metin hazırlığı: yerel kurallar (text_normalize, LRU'lu,
+    ağ çağrısı yok). Kuralların çözemediği bir şey kaldıysa ve
+    TTS_LLM_FALLBACK açıksa metin arka planda LLM'e gönderilir; bu istek
+    beklemez, LLM cevabı geldikten sonraki istekler onu kullanır.
+    """
+    if not TTS_TEXT_NORMALIZE:
+        return text
+    normalized = normalize_for_tts(text, language)
+    if normalized.unresolved and TTS_LLM_FALLBACK:
+        cleaned = cached_clean_text_for_tts(text, language)
+        if cleaned is not None:
+            return normalize_for_tts(cleaned, language).text
+        submit_clean_text_for_tts(text, language)
+    return normalized.text
+
+
+@metrics.traced("synthesize_with_voice")
 def synthesize_with_voice(
     voice_id: str,
     text: str,
@@ -61,27 +114,99 @@ def synthesize_with_voice(
 ) -> Path:
     """
     Verilen voice_id profili ile metni okutur.
-    - (İstersek) metni önce LLM ile temizleyebiliriz
-    - XTTS-v2'yi, çoklu referans segment ile kullanır
+    - Metni önce yerel kurallarla normalize eder (bkz. prepare_tts_text)
+    - XTTS-v2'yi, çoklu referans segmentten bir kez hesaplanan latent'lerle kullanır
+    - Aynı voice + metin + dil daha önce üretildiyse cache'teki dosyayı yeniden
+      kullanır; dönen yol her zaman isteğe özeldir (OUTPUTS_DIR altında)
     """
-    if voice_id not in VOICE_REGISTRY:
-        raise ValueError(f"Geçersiz voice_id: {voice_id}")
+    profile = VOICE_REGISTRY.get(voice_id)
+    if profile is None:
+        raise UnknownVoice(f"Geçersiz voice_id: {voice_id}")
+
+    cleaned_text = prepare_tts_text(text, language)
+
+    # Cache'teki dosya LRU ile silinebilir: her istek kendi dosyasını alır
+    out_path = OUTPUTS_DIR / f"{voice_id}_{uuid.uuid4()}.wav"
+    cache_key = None
+    if OUTPUT_CACHE_ENABLED:
+        refs_key = latents_key(profile.speaker_wav_paths)
+        cache_key = output_cache.output_key(voice_id, refs_key, cleaned_text, language)
+        if output_cache.lookup(cache_key, out_path):
+            return out_path
+        render_path = output_cache.cached_output_path(cache_key)
+    else:
+        render_path = out_path
+
+    # Çoklu referansın latent'leri voice başına bir kez hesaplanıp cache'leniyor
+    latents = get_speaker_latents(profile.voice_id, profile.speaker_wav_paths)
+
+    # Yarım dosya cache'e girmesin: önce geçici isme yaz, sonra taşı
+    tmp_path = render_path.with_name(f"{render_path.stem}.{uuid.uuid4().hex}.tmp.wav")
+    try:
+        synthesize_with_latents(
+            text=cleaned_text,
+            latents=latents,
+            out_path=tmp_path,
+            language=language,
+        )
+        tmp_path.replace(render_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)  # hata: yarım dosya kalmasın (başarıda zaten taşındı)
+
+    if cache_key is not None:
+        output_cache.link_output(cache_key, out_path)
+        output_cache.store(cache_key)
+    return out_path
 
-    profile = VOICE_REGISTRY[voice_id]
 
-    # Şimdilik LLM temizliğini kapalı tutalım, OpenAI tarafı ayrı stabil olunca açarız.
-    # cleaned_text = clean_text_for_tts(text, target_lang=language)
-    cleaned_text = text
+def stream_with_voice(
+    voice_id: str,
+    text: str,
+    language: LanguageCode = "tr",
+    crossfade_ms: int = 0,
+    out_path: Optional[Path] = None,
+    stats: Optional[StreamStats] = None,
+) -> Iterator[AudioChunk]:
+    """
+    synthesize_with_voice'un akışlı hali: metni cümlelere böler ve her cümlenin
+    sesini hazır olur olmaz AudioChunk olarak verir.
+    - crossfade_ms: cümle sınırlarında yumuşak geçiş
+    - out_path: verilirse akış bitince tüm ses tek WAV olarak yazılır
+    - stats: time_to_first_audio / RTF ölçümleri buraya yazılır
+    """
+    profile = VOICE_REGISTRY.get(voice_id)
+    if profile is None:
+        raise UnknownVoice(f"Geçersiz voice_id: {voice_id}")
+
+    if stats is None:
+        stats = StreamStats()
+
+    latents = get_speaker_latents(profile.voice_id, profile.speaker_wav_paths)
+    chunks = stream_sentences(
+        split_sentences(prepare_tts_text(text, language)),
+        render=lambda sen: synthesize_sentence(sen, latents, language),
+        sample_rate=get_output_sample_rate(),
+        crossfade_ms=crossfade_ms,
+        stats=stats,
+    )
+    if out_path is not None:
+        chunks = collect_to_wav(chunks, out_path)
 
-    out_id = str(uuid.uuid4())
-    out_path = OUTPUTS_DIR / f"{voice_id}_{out_id}.wav"
+    for chunk in chunks:
+        if chunk.index == 0:
+            print(f"[INFO] İlk ses: {stats.time_to_first_audio * 1000:.0f} ms")
+        yield chunk
 
-    # 🔥 ÖNEMLİ: Artık BİR DOSYA DEĞİL, ÇOKLU REFERANS veriyoruz
-    synthesize_to_wav(
-        text=cleaned_text,
-        speaker_wav=profile.speaker_wav_paths,
-        out_path=out_path,
-        language=language,
-    )
 
-    return out_path
+def astream_with_voice(
+    voice_id: str,
+    text: str,
+    language: LanguageCode = "tr",
+    crossfade_ms: int = 0,
+    out_path: Optional[Path] = None,
+    stats: Optional[StreamStats] = None,
+) -> AsyncIterator[AudioChunk]:
+    """stream_with_voice'un async iterator hali (inference ayrı thread'de)."""
+    return aiter_chunks(
+        stream_with_voice(voice_id, text, language, crossfade_ms, out_path, stats)
+    )
@@ -0,0 +1,38 @@
+# app/rate_limit.py
+import asyncio
+import time
+
+
+class AsyncTokenBucket:
+    """
+    Basit token bucket: saniyede `rate` token dolar, en fazla `capacity` birikir.
+    acquire(n) yeterli token yoksa gereken süre kadar bekler.
+    Dakika bazlı limitler için: AsyncTokenBucket.per_minute(limit).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def per_minute(cls, limit: float) -> "AsyncTokenBucket":
+        return cls(rate=limit / 60.0, capacity=limit)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        # Kapasiteden büyük istek sonsuza kadar beklemesin
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
@@ -0,0 +1,539 @@
+# app/service.py
+"""
+Yerel HTTP sentez servisi (sadece stdlib asyncio).
+
+    POST /enroll      {"person_dir": "..."}                        -> voice profili
+    POST /synthesize  {"voice_id": "...", "text": "...", "language": "tr"} -> {"path": ...}
+    POST /stream      aynı gövde -> chunked 16 bit PCM (X-Sample-Rate başlığı)
+    GET  /health, GET /stats
+
+Model tek bir inference thread'inde bellekte kalır. İstekler sınırlı bir
+kuyruğa girer (dolunca 503 + Retry-After). Worker kuyruktan bir seferde
+batch_max işe kadar toplar (micro-batch): aynı voice'un işleri art arda
+çalışır, aynı (voice, metin, dil) tek kez üretilip hepsine döner.
+"""
+import asyncio
+import json
+import math
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncGenerator, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .config import (
+    OUTPUTS_DIR,
+    SERVICE_BATCH_MAX,
+    SERVICE_BATCH_WINDOW_MS,
+    SERVICE_QUEUE_SIZE,
+    SERVICE_STREAM_BUFFER,
+)
+from .streaming import AudioChunk
+from .text_split import split_sentences
+from .tts_backends import FakeTTSBackend
+from .voice_store import UnknownVoice, VoiceProfile
+
+
+class QueueFull(Exception):
+    pass
+
+
+# --- backend'ler: servis sadece bu dört metodu kullanır ---
+
+
+class PipelineBackend:
+    """Gerçek XTTS pipeline'ı (enroll_from_person_folder / synthesize_with_voice)."""
+
+    def load(self) -> None:
+        from .tts_engine import ensure_tts_loaded
+
+        ensure_tts_loaded()
+
+    def enroll(self, person_dir: Path) -> VoiceProfile:
+        from .pipeline import enroll_from_person_folder
+
+        return enroll_from_person_folder(person_dir)
+
+    def synthesize(self, voice_id: str, text: str, language: str) -> Path:
+        from .pipeline import synthesize_with_voice
+
+        return synthesize_with_voice(voice_id=voice_id, text=text, language=language)
+
+    def stream(self, voice_id: str, text: str, language: str) -> Iterator[AudioChunk]:
+        from .pipeline import stream_with_voice
+
+        return stream_with_voice(voice_id=voice_id, text=text, language=language)
+
+
+class FakeBackend:
+    """
+    Model indirmeden uçtan uca test / yük testi için sahte backend: sesi
+    tts_backends.FakeTTSBackend üretir (gecikme metin uzunluğuyla orantılı,
+    çıktı deterministik).
+    """
+
+    def __init__(
+        self,
+        out_dir: Path = OUTPUTS_DIR / "fake",
+        sample_rate: int = 24000,
+        load_sec: float = 0.0,
+        sec_per_char: float = 0.001,
+        audio_sec_per_char: float = 0.06,
+    ):
+        self.out_dir = out_dir
+        self.load_sec = load_sec
+        self.tts = FakeTTSBackend(
+            sample_rate=sample_rate,
+            base_latency_sec=0.0,
+            sec_per_char=sec_per_char,
+            audio_sec_per_char=audio_sec_per_char,
+        )
+        self._latents = self.tts.compute_latents([])
+        self.calls = 0
+
+    @property
+    def sample_rate(self) -> int:
+        return self.tts.output_sample_rate()
+
+    def load(self) -> None:
+        time.sleep(self.load_sec)
+        self.tts.load()
+
+    def enroll(self, person_dir: Path) -> VoiceProfile:
+        return VoiceProfile(
+            voice_id=str(uuid.uuid4()),
+            person_dir=person_dir,
+            speaker_wav_paths=[],
+            total_duration_sec=0.0,
+        )
+
+    def _render(self, text: str, language: str) -> np.ndarray:
+        self.calls += 1
+        return self.tts.synthesize_sentence(text, self._latents, language)
+
+    def synthesize(self, voice_id: str, text: str, language: str) -> Path:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        out_path = self.out_dir / f"{voice_id}_{uuid.uuid4().hex}.wav"
+        self.tts.save_wav(self._render(text, language), out_path)
+        return out_path
+
+    def stream(self, voice_id: str, text: str, language: str) -> Iterator[AudioChunk]:
+        for i, sentence in enumerate(split_sentences(text)):
+            yield AudioChunk(self._render(sentence, language), self.sample_rate, i, sentence)
+
+
+# --- kuyruk / inference worker ---
+
+
+@dataclass
+class _Job:
+    voice_id: str
+    text: str
+    language: str
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    chunks: Optional[asyncio.Queue] = None   # stream işi ise chunk'lar buraya (sınırlı)
+    cancelled: threading.Event = field(default_factory=threading.Event)  # istemci gitti
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return self.voice_id, " ".join(self.text.split()), self.language
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, math.ceil(q / 100.0 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+@dataclass
+class ServiceStats:
+    requests: int = 0
+    rejected: int = 0
+    failed: int = 0
+    batches: int = 0
+    batched_jobs: int = 0
+    deduplicated: int = 0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=10000))
+
+    def to_dict(self, queue_depth: int) -> dict:
+        lat = list(self.latencies)
+        p50, p99 = _percentile(lat, 50), _percentile(lat, 99)
+        return {
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "queue_depth": queue_depth,
+            "batches": self.batches,
+            "avg_batch_size": self.batched_jobs / self.batches if self.batches else 0.0,
+            "deduplicated": self.deduplicated,
+            "latency_p50_ms": p50 * 1000 if p50 is not None else None,
+            "latency_p99_ms": p99 * 1000 if p99 is not None else None,
+        }
+
+
+_STREAM_END = object()
+
+
+class SynthesisService:
+    def __init__(
+        self,
+        backend=None,
+        queue_size: int = SERVICE_QUEUE_SIZE,
+        batch_max: int = SERVICE_BATCH_MAX,
+        batch_window_ms: float = SERVICE_BATCH_WINDOW_MS,
+        stream_buffer: int = SERVICE_STREAM_BUFFER,
+    ):
+        self.backend = backend if backend is not None else PipelineBackend()
+        self.queue_size = queue_size
+        self.batch_max = max(1, batch_max)
+        self.batch_window = batch_window_ms / 1000.0
+        self.stream_buffer = max(1, stream_buffer)
+        self.stats = ServiceStats()
+        self.ready = False
+        # Tek inference thread'i: model bellekte kalır, GPU/CPU'da tek iş çalışır
+        self._inference = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        # Enroll ayrı thread'de: ön işleme sentezi bloklamasın
+        self._enroll = ThreadPoolExecutor(max_workers=1, thread_name_prefix="enroll")
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        self._active_stream: Optional[_Job] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        t0 = time.perf_counter()
+        await loop.run_in_executor(self._inference, self.backend.load)
+        self.ready = True
+        print(f"[INFO] Model hazır ({time.perf_counter() - t0:.1f} sn)")
+        self._worker_task = asyncio.create_task(self._worker())
+
+    async def stop(self) -> None:
+        if self._active_stream is not None:
+            self._active_stream.cancelled.set()
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+        self._inference.shutdown(wait=False, cancel_futures=True)
+        self._enroll.shutdown(wait=False, cancel_futures=True)
+
+    def _enqueue(self, job: _Job) -> None:
+        self.stats.requests += 1
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.stats.rejected += 1
+            raise QueueFull(f"Kuyruk dolu ({self.queue_size})")
+
+    async def enroll(self, person_dir: Path) -> VoiceProfile:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._enroll, self.backend.enroll, person_dir)
+
+    async def synthesize(self, voice_id: str, text: str, language: str = "tr") -> Path:
+        job = _Job(voice_id, text, language, asyncio.get_running_loop().create_future())
+        self._enqueue(job)
+        return await job.future
+
+    async def stream(self, voice_id: str, text: str, language: str = "tr") -> AsyncIterator[AudioChunk]:
+        job = _Job(
+            voice_id, text, language,
+            asyncio.get_running_loop().create_future(),
+            chunks=asyncio.Queue(maxsize=self.stream_buffer),
+        )
+        self._enqueue(job)
+        finished = False
+        try:
+            while True:
+                item = await job.chunks.get()
+                if item is _STREAM_END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+            finished = True
+        finally:
+            if not finished:
+                # İstemci koptu / yazma hatası: inference boşuna devam etmesin
+                job.cancelled.set()
+        await job.future
+
+    async def _collect_batch(self) -> List[_Job]:
+        """İlk işi bekler, sonra batch_window içinde gelenleri batch_max'a kadar ekler."""
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.batch_window
+        while len(batch) < self.batch_max:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _run_batch(self, jobs: List[_Job]) -> Dict[Tuple[str, str, str], object]:
+        """Inference thread'inde: voice'a göre sıralı, aynı metin bir kez."""
+        results: Dict[Tuple[str, str, str], object] = {}
+        for job in sorted(jobs, key=lambda j: j.voice_id):
+            if job.key in results:
+                continue
+            try:
+                results[job.key] = self.backend.synthesize(job.voice_id, job.text, job.language)
+            except Exception as e:
+                results[job.key] = e
+        return results
+
+    @staticmethod
+    def _put_chunk(job: _Job, item: object, loop: asyncio.AbstractEventLoop) -> bool:
+        """
+        Inference thread'inden chunk kuyruğuna ekler; kuyruk doluysa yer açılana
+        kadar bekler (yavaş istemci inference'ı yavaşlatır, bellek büyümez).
+        İş iptal edildiyse False.
+        """
+        if job.cancelled.is_set():
+            return False
+        fut = asyncio.run_coroutine_threadsafe(job.chunks.put(item), loop)
+        while True:
+            try:
+                fut.result(timeout=0.1)
+                return not job.cancelled.is_set()
+            except FutureTimeout:
+                if job.cancelled.is_set():
+                    fut.cancel()
+                    return False
+
+    def _run_stream(self, job: _Job, loop: asyncio.AbstractEventLoop) -> None:
+        """Inference thread'inde: her chunk hazır olunca event loop'a aktarılır."""
+        if job.cancelled.is_set():
+            return  # istemci sırada beklerken gitmiş
+        chunks = self.backend.stream(job.voice_id, job.text, job.language)
+        try:
+            for chunk in chunks:
+                if not self._put_chunk(job, chunk, loop):
+                    return
+        except Exception as e:
+            self._put_chunk(job, e, loop)
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()  # generator'ı bırak: kalan cümleler sentezlenmesin
+        self._put_chunk(job, _STREAM_END, loop)
+
+    def _finish(self, job: _Job, result: object) -> None:
+        if job.future.done():
+            return  # istemci vazgeçmiş
+        if isinstance(result, Exception):
+            self.stats.failed += 1
+            job.future.set_exception(result)
+        else:
+            self.stats.latencies.append(time.perf_counter() - job.enqueued_at)
+            job.future.set_result(result)
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            streams = [j for j in batch if j.chunks is not None]
+            plain = [j for j in batch if j.chunks is None]
+
+            if plain:
+                self.stats.batches += 1
+                self.stats.batched_jobs += len(plain)
+                self.stats.deduplicated += len(plain) - len({j.key for j in plain})
+                results = await loop.run_in_executor(self._inference, self._run_batch, plain)
+                for job in plain:
+                    self._finish(job, results[job.key])
+
+            for job in streams:
+                self._active_stream = job
+                try:
+                    await loop.run_in_executor(self._inference, self._run_stream, job, loop)
+                finally:
+                    self._active_stream = None
+                self._finish(job, None)
+
+
+# --- HTTP katmanı ---
+
+_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    500: "Internal Server Error", 503: "Service Unavailable",
+}
+_MAX_BODY = 1024 * 1024
+
+
+def _profile_json(profile: VoiceProfile) -> dict:
+    return {
+        "voice_id": profile.voice_id,
+        "person_dir": str(profile.person_dir),
+        "speaker_wav_paths": [str(p) for p in profile.speaker_wav_paths],
+        "total_duration_sec": profile.total_duration_sec,
+    }
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, dict]:
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    if not request_line:
+        raise ConnectionError("boş istek")
+    method, path, _ = request_line.split(" ", 2)
+    headers: Dict[str, str] = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line in ("\r\n", "\n", ""):
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", "0"))
+    if length > _MAX_BODY:
+        raise ValueError("İstek gövdesi çok büyük")
+    body = json.loads(await reader.readexactly(length)) if length else {}
+    return method, path.split("?", 1)[0], body
+
+
+def _send_json(writer: asyncio.StreamWriter, code: int, payload: dict, headers: Optional[dict] = None) -> None:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = [
+        f"HTTP/1.1 {code} {_REASONS.get(code, '')}",
+        "Content-Type: application/json; charset=utf-8",
+        f"Content-Length: {len(body)}",
+        "Connection: close",
+    ]
+    head += [f"{k}: {v}" for k, v in (headers or {}).items()]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+
+async def _send_stream(writer: asyncio.StreamWriter, chunks: AsyncGenerator[AudioChunk, None]) -> None:
+    try:
+        await _write_stream(writer, chunks)
+    finally:
+        # Yazma hatasında generator hemen kapanır: iş iptal edilir (SynthesisService.stream)
+        await chunks.aclose()
+
+
+async def _write_stream(writer: asyncio.StreamWriter, chunks: AsyncIterator[AudioChunk]) -> None:
+    started = False
+    async for chunk in chunks:
+        if not started:
+            writer.write(
+                (
+                    "HTTP/1.1 200 OK\r\n"
+                    "Content-Type: audio/L16\r\n"
+                    f"X-Sample-Rate: {chunk.sample_rate}\r\n"
+                    "Transfer-Encoding: chunked\r\n"
+                    "Connection: close\r\n\r\n"
+                ).encode("latin-1")
+            )
+            started = True
+        pcm = chunk.to_pcm16()
+        writer.write(f"{len(pcm):x}\r\n".encode("latin-1") + pcm + b"\r\n")
+        await writer.drain()
+    if not started:
+        _send_json(writer, 200, {"chunks": 0})
+        return
+    writer.write(b"0\r\n\r\n")
+
+
+def make_handler(service: SynthesisService):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, path, body = await _read_request(reader)
+            except (ValueError, json.JSONDecodeError) as e:
+                _send_json(writer, 400, {"error": str(e)})
+                return
+
+            if path == "/health":
+                _send_json(writer, 200, {"ready": service.ready, "queue_depth": service.queue_depth})
+                return
+            if path == "/stats":
+                _send_json(writer, 200, service.stats.to_dict(service.queue_depth))
+                return
+            if path not in ("/enroll", "/synthesize", "/stream"):
+                _send_json(writer, 404, {"error": f"Bilinmeyen yol: {path}"})
+                return
+            if method != "POST":
+                _send_json(writer, 405, {"error": "POST bekleniyor"})
+                return
+
+            if path == "/enroll":
+                if "person_dir" not in body:
+                    _send_json(writer, 400, {"error": "person_dir gerekli"})
+                    return
+                profile = await service.enroll(Path(body["person_dir"]))
+                _send_json(writer, 200, _profile_json(profile))
+                return
+
+            voice_id, text = body.get("voice_id"), (body.get("text") or "").strip()
+            language = body.get("language") or "tr"
+            if not voice_id or not text:
+                _send_json(writer, 400, {"error": "voice_id ve text gerekli"})
+                return
+
+            if path == "/synthesize":
+                t0 = time.perf_counter()
+                out_path = await service.synthesize(voice_id, text, language)
+                _send_json(
+                    writer, 200,
+                    {"path": str(out_path), "latency_ms": (time.perf_counter() - t0) * 1000},
+                )
+            else:
+                await _send_stream(writer, service.stream(voice_id, text, language))
+        except QueueFull as e:
+            _send_json(writer, 503, {"error": str(e)}, {"Retry-After": "1"})
+        except (FileNotFoundError, UnknownVoice) as e:
+            _send_json(writer, 404, {"error": str(e)})
+        except ValueError as e:
+            # Geçersiz dil, backend doğrulaması vb.: istemci hatası
+            _send_json(writer, 400, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            print(f"[WARN] İstek hatası: {e}")
+            _send_json(writer, 500, {"error": str(e)})
+        finally:
+            try:
+                await writer.drain()
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    return handle
+
+
+async def start_server(
+    service: SynthesisService,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+) -> asyncio.base_events.Server:
+    await service.start()
+    return await asyncio.start_server(make_handler(service), host, port)
+
+
+async def serve_forever(service: SynthesisService, host: str = "127.0.0.1", port: int = 8000) -> None:
+    server = await start_server(service, host, port)
+    addr = server.sockets[0].getsockname()
+    print(f"[OK] Servis dinliyor: http://{addr[0]}:{addr[1]}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
@@ -0,0 +1,70 @@
+# app/speaker_latents.py
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+from .config import VOICES_DIR, LATENT_CACHE_SIZE
+from .fingerprint import hash_files
+from .tts_engine import (
+    SpeakerLatents,
+    backend_id,
+    compute_speaker_latents,
+    load_speaker_latents,
+    save_speaker_latents,
+)
+
+LATENT_FILE_PREFIX = "latents_"
+
+# key -> latents; en son kullanılan sonda
+_memory: "OrderedDict[str, SpeakerLatents]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def latents_key(speaker_wav_paths: List[Path], model_name: Optional[str] = None) -> str:
+    """Referans dosyalarının içeriği + model (backend) adından türetilen cache anahtarı."""
+    return hash_files(speaker_wav_paths, model_name or backend_id())
+
+
+def _latents_path(voice_id: str, key: str) -> Path:
+    return VOICES_DIR / voice_id / f"{LATENT_FILE_PREFIX}{key[:16]}.pt"
+
+
+def _remember(key: str, latents: SpeakerLatents) -> None:
+    with _lock:
+        _memory[key] = latents
+        _memory.move_to_end(key)
+        while len(_memory) > LATENT_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+
+def _drop_stale_files(voice_dir: Path, keep: Path) -> None:
+    for p in voice_dir.glob(f"{LATENT_FILE_PREFIX}*.pt"):
+        if p != keep:
+            p.unlink(missing_ok=True)
+
+
+def get_speaker_latents(voice_id: str, speaker_wav_paths: List[Path]) -> SpeakerLatents:
+    """
+    Voice için XTTS conditioning latent'lerini döndürür.
+    Sıra: bellek (LRU) -> VOICES_DIR/<voice_id>/latents_*.pt -> hesapla + kaydet.
+    Referanslar değişirse anahtar da değişir, eski dosya silinir.
+    """
+    key = latents_key(speaker_wav_paths)
+
+    with _lock:
+        latents = _memory.get(key)
+        if latents is not None:
+            _memory.move_to_end(key)
+            return latents
+
+    path = _latents_path(voice_id, key)
+    if path.exists():
+        latents = load_speaker_latents(path)
+    else:
+        latents = compute_speaker_latents(speaker_wav_paths)
+        save_speaker_latents(latents, path)
+        _drop_stale_files(path.parent, keep=path)
+
+    _remember(key, latents)
+    return latents
@@ -0,0 +1,130 @@
+# app/streaming.py
+import asyncio
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Callable, Iterable, Iterator, List, Optional
+
+import numpy as np
+import soundfile as sf
+
+
+@dataclass
+class AudioChunk:
+    samples: np.ndarray        # float32, mono, [-1, 1]
+    sample_rate: int
+    index: int
+    sentence: str
+
+    @property
+    def duration_sec(self) -> float:
+        return len(self.samples) / float(self.sample_rate)
+
+    def to_pcm16(self) -> bytes:
+        """Ham 16 bit little-endian PCM (HTTP/soket üzerinden göndermek için)."""
+        pcm = np.clip(self.samples, -1.0, 1.0) * 32767.0
+        return pcm.astype("<i2").tobytes()
+
+
+@dataclass
+class StreamStats:
+    started_at: float = field(default_factory=time.perf_counter)
+    time_to_first_audio: Optional[float] = None
+    total_time: float = 0.0
+    audio_sec: float = 0.0
+    sentences: int = 0
+
+    @property
+    def real_time_factor(self) -> Optional[float]:
+        if self.audio_sec <= 0:
+            return None
+        return self.total_time / self.audio_sec
+
+
+def _ramps(n: int) -> tuple[np.ndarray, np.ndarray]:
+    fade_in = np.linspace(0.0, 1.0, n, endpoint=False, dtype=np.float32)
+    return fade_in, 1.0 - fade_in
+
+
+def stream_sentences(
+    sentences: Iterable[str],
+    render: Callable[[str], np.ndarray],
+    sample_rate: int,
+    crossfade_ms: int = 0,
+    pause_ms: int = 250,
+    stats: Optional[StreamStats] = None,
+) -> Iterator[AudioChunk]:
+    """
+    Her cümleyi `render` ile sese çevirip biter bitmez verir.
+
+    - crossfade_ms > 0: cümle sınırında önceki cümlenin kuyruğu ile sonrakinin
+      başı üst üste bindirilir (kuyruk bir sonraki chunk'a kadar bekletilir)
+    - crossfade_ms == 0: cümlelerin arasına pause_ms kadar sessizlik eklenir
+    """
+    if stats is None:
+        stats = StreamStats()
+
+    xf = int(sample_rate * crossfade_ms / 1000)
+    pause = np.zeros(int(sample_rate * pause_ms / 1000), dtype=np.float32)
+    fade_in, fade_out = _ramps(xf) if xf else (None, None)
+
+    held: Optional[np.ndarray] = None
+    index = 0
+    last_sentence = ""
+
+    for sentence in sentences:
+        wav = np.asarray(render(sentence), dtype=np.float32)
+        stats.sentences += 1
+        last_sentence = sentence
+
+        if xf and len(wav) > 2 * xf:
+            if held is not None:
+                head = held * fade_out + wav[:xf] * fade_in
+                body = np.concatenate([head, wav[xf:-xf]])
+            else:
+                body = wav[:-xf]
+            held = wav[-xf:]
+        else:
+            if held is not None:
+                wav = np.concatenate([held, wav])
+                held = None
+            body = np.concatenate([wav, pause]) if not xf else wav
+
+        if stats.time_to_first_audio is None:
+            stats.time_to_first_audio = time.perf_counter() - stats.started_at
+        stats.audio_sec += len(body) / float(sample_rate)
+        stats.total_time = time.perf_counter() - stats.started_at
+
+        yield AudioChunk(body, sample_rate, index, sentence)
+        index += 1
+
+    if held is not None:
+        stats.audio_sec += len(held) / float(sample_rate)
+        yield AudioChunk(held, sample_rate, index, last_sentence)
+
+    stats.total_time = time.perf_counter() - stats.started_at
+
+
+def collect_to_wav(chunks: Iterable[AudioChunk], out_path: Path) -> Iterator[AudioChunk]:
+    """Chunk'ları olduğu gibi geçirir; akış bitince hepsini tek WAV'a yazar."""
+    parts: List[np.ndarray] = []
+    sample_rate = 24000
+    for chunk in chunks:
+        parts.append(chunk.samples)
+        sample_rate = chunk.sample_rate
+        yield chunk
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    audio = np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+    sf.write(str(out_path), np.clip(audio, -1.0, 1.0), sample_rate, subtype="PCM_16")
+
+
+async def aiter_chunks(chunks: Iterator[AudioChunk]) -> AsyncIterator[AudioChunk]:
+    """Senkron chunk üretecini event loop'u bloklamadan async iterator yapar."""
+    loop = asyncio.get_running_loop()
+    sentinel = object()
+    while True:
+        chunk = await loop.run_in_executor(None, next, chunks, sentinel)
+        if chunk is sentinel:
+            break
+        yield chunk
@@ -0,0 +1,479 @@
+# app/text_normalize.py
+"""
+TTS öncesi yerel, kurala dayalı metin normalizasyonu (ağ çağrısı yok).
+
+    normalize_for_tts("Dr. Ayşe 3. kata çıktı, 12,50 TL ödedi 😂 slm!!!")
+    -> NormalizedText(text="Doktor Ayşe üçüncü kata çıktı, on iki lira elli kuruş ödedi selam!",
+                      unresolved=())
+
+Türkçe için:
+- Sayılar: "1.250.000", "3,75", "-5", "3-5", "1990'larda", "3'te", "1.2.3",
+  sıfırla başlayan hane dizileri ("0532", "0006") rakam rakam
+- Sıra sayıları: "3. sınıf", "5'inci"
+- Tarih / saat: "12.03.2024", "12/03/2024", "2024-03-12", "14:30"
+- Para / yüzde / birim: "₺150", "12,50 TL", "$20", "%25", "5 km"; ekler açılıma
+  uydurulur ("100 TL'ye" -> "yüz liraya")
+- Kısaltmalar ("Dr.", "vb."), sesli harfsiz kısaltmaların harf harf okunuşu ("THY")
+Her dilde:
+- Emoji, ifade (":)", "<3"), kahkaha ("hahaha", "jsjsjs") ve uzatmalar ("çoooook")
+- Noktalama onarımı (tekrarlar, boşluklar, büyük harf, cümle sonu)
+
+Kuralların çözemediği parçalar (URL, "MP3" gibi harf+rakam karışımları,
+Latin dışı yazı, "2024-03-12'de" gibi ekli ISO tarihler) `unresolved` içinde döner; çağıran
+isterse bunları LLM'e gönderir (bkz. pipeline.prepare_tts_text).
+Sonuçlar sınırlı bir LRU'da tutulur; aynı metin tekrar işlenmez.
+"""
+import functools
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .config import TEXT_NORMALIZE_CACHE_SIZE
+
+
+@dataclass(frozen=True)
+class NormalizedText:
+    text: str
+    unresolved: Tuple[str, ...] = ()
+
+    @property
+    def resolved(self) -> bool:
+        return not self.unresolved
+
+
+# --- Sayıdan yazıya ----------------------------------------------------------
+
+_ONES = ["", "bir", "iki", "üç", "dört", "beş", "altı", "yedi", "sekiz", "dokuz"]
+_TENS = ["", "on", "yirmi", "otuz", "kırk", "elli", "altmış", "yetmiş", "seksen", "doksan"]
+_SCALES = [(10**12, "trilyon"), (10**9, "milyar"), (10**6, "milyon"), (1000, "bin")]
+_MAX_NUMBER = 10**15
+
+# Sıra sayısı eki son kelimeye göre (dört -> dördüncü yumuşaması dahil)
+_ORDINAL_LAST = {
+    "sıfır": "sıfırıncı", "bir": "birinci", "iki": "ikinci", "üç": "üçüncü",
+    "dört": "dördüncü", "beş": "beşinci", "altı": "altıncı", "yedi": "yedinci",
+    "sekiz": "sekizinci", "dokuz": "dokuzuncu", "on": "onuncu", "yirmi": "yirminci",
+    "otuz": "otuzuncu", "kırk": "kırkıncı", "elli": "ellinci", "altmış": "altmışıncı",
+    "yetmiş": "yetmişinci", "seksen": "sekseninci", "doksan": "doksanıncı",
+    "yüz": "yüzüncü", "bin": "bininci", "milyon": "milyonuncu",
+    "milyar": "milyarıncı", "trilyon": "trilyonuncu",
+}
+
+_MONTHS = [
+    "Ocak", "Şubat", "Mart", "Nisan", "Mayıs", "Haziran",
+    "Temmuz", "Ağustos", "Eylül", "Ekim", "Kasım", "Aralık",
+]
+
+
+def _under_thousand(n: int) -> List[str]:
+    hundreds, rest = divmod(n, 100)
+    tens, ones = divmod(rest, 10)
+    words = []
+    if hundreds:
+        words += ["yüz"] if hundreds == 1 else [_ONES[hundreds], "yüz"]
+    if tens:
+        words.append(_TENS[tens])
+    if ones:
+        words.append(_ONES[ones])
+    return words
+
+
+def number_to_words(n: int) -> str:
+    """Tam sayıyı Türkçe okunuşuna çevirir: 2024 -> "iki bin yirmi dört"."""
+    if n < 0:
+        return "eksi " + number_to_words(-n)
+    if n == 0:
+        return "sıfır"
+    if n >= _MAX_NUMBER:
+        return " ".join(_ONES[int(d)] or "sıfır" for d in str(n))
+    words: List[str] = []
+    for scale, name in _SCALES:
+        q, n = divmod(n, scale)
+        if q:
+            # "bin" başında "bir" okunmaz: 1000 -> "bin", ama 1000000 -> "bir milyon"
+            if not (scale == 1000 and q == 1):
+                words += _under_thousand(q)
+            words.append(name)
+    words += _under_thousand(n)
+    return " ".join(words)
+
+
+def ordinal_to_words(n: int) -> str:
+    """3 -> "üçüncü", 21 -> "yirmi birinci"."""
+    words = number_to_words(n).split()
+    words[-1] = _ORDINAL_LAST.get(words[-1], words[-1])
+    return " ".join(words)
+
+
+def _digits_to_words(digits: str) -> str:
+    """Ondalık kısım: baştaki sıfırlar tek tek, kalan sayı olarak ("05" -> "sıfır beş")."""
+    stripped = digits.lstrip("0")
+    words = ["sıfır"] * (len(digits) - len(stripped))
+    if stripped:
+        words.append(number_to_words(int(stripped)))
+    return " ".join(words)
+
+
+# Sayı yazımları: Türkçe binlik nokta / ondalık virgül, sade tam sayı,
+# İngilizce "1,250.50" ve "2.5" gibi nokta ondalığı
+_NUM = r"\d{1,3}(?:\.\d{3})+(?:,\d+)?|\d{1,3}(?:,\d{3})+\.\d+|\d+(?:[.,]\d+)?"
+
+
+def _split_number(s: str) -> Optional[Tuple[int, str, str]]:
+    """Sayı yazımını (tam kısım, ondalık ayırıcı kelimesi, ondalık haneler) olarak çözer."""
+    if re.fullmatch(r"\d+(?:,\d+)?", s):
+        whole, _, frac = s.partition(",")
+        return int(whole), "virgül", frac
+    if re.fullmatch(r"\d{1,3}(?:\.\d{3})+(?:,\d+)?", s):
+        whole, _, frac = s.partition(",")
+        return int(whole.replace(".", "")), "virgül", frac
+    if re.fullmatch(r"\d{1,3}(?:,\d{3})+\.\d+", s):
+        whole, _, frac = s.partition(".")
+        return int(whole.replace(",", "")), "virgül", frac
+    if re.fullmatch(r"\d+\.\d+", s):
+        whole, _, frac = s.partition(".")
+        return int(whole), "nokta", frac
+    return None
+
+
+def _number_words(s: str) -> str:
+    if len(s) > 1 and s[0] == "0" and s.isdigit():
+        # Telefon, IBAN, kod: baştaki sıfır değer değil, hane olarak okunur
+        return " ".join(_ONES[int(d)] or "sıfır" for d in s)
+    parsed = _split_number(s)
+    if parsed is None:
+        return s
+    whole, sep, frac = parsed
+    words = number_to_words(whole)
+    if frac:
+        words += f" {sep} {_digits_to_words(frac)}"
+    return words
+
+
+# --- Türkçe kurallar ---------------------------------------------------------
+
+def _upper_tr(s: str) -> str:
+    return s.replace("i", "İ").replace("ı", "I").upper()
+
+
+def _capitalize_tr(s: str) -> str:
+    return _upper_tr(s[:1]) + s[1:]
+
+
+_SUFFIX = r"(?:['’]([a-zçğıöşü]+))?"
+_ORDINAL_SUFFIXES = {"inci", "ıncı", "uncu", "üncü", "nci", "ncı", "ncu", "ncü", "ci", "cı", "cu", "cü"}
+
+_CURRENCY = {
+    "₺": ("lira", "kuruş"), "tl": ("lira", "kuruş"), "try": ("lira", "kuruş"),
+    "$": ("dolar", "sent"), "usd": ("dolar", "sent"),
+    "€": ("avro", "sent"), "eur": ("avro", "sent"),
+    "£": ("sterlin", "peni"), "gbp": ("sterlin", "peni"),
+}
+_UNITS = {
+    "km": "kilometre", "m": "metre", "cm": "santimetre", "mm": "milimetre",
+    "kg": "kilogram", "g": "gram", "gr": "gram", "lt": "litre", "l": "litre",
+    "ml": "mililitre", "°c": "derece", "°": "derece", "sa": "saat", "dk": "dakika",
+    "sn": "saniye", "gb": "gigabayt", "mb": "megabayt", "kb": "kilobayt",
+}
+_ABBREVIATIONS = {
+    "dr": "doktor", "prof": "profesör", "doç": "doçent", "yrd": "yardımcı",
+    "av": "avukat", "sn": "sayın", "bkz": "bakınız", "vb": "ve benzeri",
+    "vs": "vesaire", "örn": "örneğin", "mah": "mahallesi", "cad": "caddesi",
+    "sok": "sokağı", "apt": "apartmanı", "no": "numara", "tel": "telefon",
+    "müh": "mühendis", "uzm": "uzman", "öğr": "öğretmen", "hz": "hazreti",
+}
+_SLANG = {
+    "slm": "selam", "mrb": "merhaba", "mrhb": "merhaba", "tmm": "tamam",
+    "tmam": "tamam", "tşk": "teşekkürler", "tsk": "teşekkürler",
+    "tşkler": "teşekkürler", "tskler": "teşekkürler", "nbr": "ne haber",
+    "kib": "kendine iyi bak", "cnm": "canım", "knk": "kanka", "gnydn": "günaydın",
+    "hg": "hoş geldin", "hb": "hoş bulduk", "bşy": "bir şey", "bsy": "bir şey",
+    "herşey": "her şey", "birşey": "bir şey", "yk": "yok", "vr": "var",
+}
+# Kısaltma okunuşu; H için alfabe adı "he" yerine yerleşik "ha" (THY, CHP)
+_LETTER_NAMES = {
+    "A": "a", "B": "be", "C": "ce", "Ç": "çe", "D": "de", "E": "e", "F": "fe",
+    "G": "ge", "Ğ": "yumuşak ge", "H": "ha", "I": "ı", "İ": "i", "J": "je",
+    "K": "ke", "L": "le", "M": "me", "N": "ne", "O": "o", "Ö": "ö", "P": "pe",
+    "Q": "kü", "R": "re", "S": "se", "Ş": "şe", "T": "te", "U": "u", "Ü": "ü",
+    "V": "ve", "W": "çift ve", "X": "iks", "Y": "ye", "Z": "ze",
+}
+_VOWELS = set("AEIİOÖUÜaeıioöuü")
+
+_DATE_RE = re.compile(r"(?<![\d.])(\d{1,2})([./])(\d{1,2})\2(\d{4})(?![\d])" + _SUFFIX)
+# ISO yazımı aralık kuralından önce: "2024-03-12" tireleri aralık sanılmasın
+_ISO_DATE_RE = re.compile(r"(?<![\w.-])(\d{4})-(\d{1,2})-(\d{1,2})(?![\w-])" + _SUFFIX)
+_TIME_RE = re.compile(r"(?<![\d:])([01]?\d|2[0-3]):([0-5]\d)(?![\d:])" + _SUFFIX)
+_CURRENCY_PRE_RE = re.compile(r"(?<![\w])([₺$€£])\s?(" + _NUM + r")(?![\d])" + _SUFFIX)
+_CURRENCY_POST_RE = re.compile(
+    r"(?<![\w.,])(" + _NUM + r")\s?(₺|\$|€|£|TL|TRY|USD|EUR|GBP)(?![\w])" + _SUFFIX
+)
+_PERCENT_RE = re.compile(
+    r"(?<![\w])%\s?(" + _NUM + r")(?![\d])" + _SUFFIX
+    + r"|(?<![\w.,])(" + _NUM + r")\s?%" + _SUFFIX
+)
+_UNIT_RE = re.compile(
+    r"(?<![\w.,])(" + _NUM + r")\s?(" + "|".join(sorted(map(re.escape, _UNITS), key=len, reverse=True))
+    + r")(?![\w])" + _SUFFIX + r"(?:\.(?=\s+[a-zçğıöşü]))?",
+    re.IGNORECASE,
+)
+_ORDINAL_DOT_RE = re.compile(r"(?<![\w.,])(\d+)\.(?=\s+[a-zçğıöşü])")
+_ORDINAL_SUFFIX_RE = re.compile(r"(?<![\w.,])(\d+)['’]?(" + "|".join(_ORDINAL_SUFFIXES) + r")(?![\w])")
+# Binlik ayraçlı yazım dışındaki çok noktalı sayılar: sürüm, IP
+_DOTTED_RE = re.compile(r"(?<![\w.,])(?!\d{1,3}(?:\.\d{3})+(?![.\d]))\d+(?:\.\d+){2,}(?![.\d])")
+# Aralık / skor / oran: "3-5", "3:2" (saat kuralından sonra) -> "üç beş", "üç iki"
+_RANGE_RE = re.compile(r"(?<=\d)(?:\s?[-–]\s?|:)(?=\d)")
+_NEGATIVE_RE = re.compile(r"(?:^|(?<=[\s(]))[-−](?=\d)")
+_NUMBER_RE = re.compile(r"(?<![\w.,])(" + _NUM + r")(?!\w)" + _SUFFIX)
+# Sayıdan sonra gelen "sn.", "m." vb. kısaltma değil birimdir (_UNIT_RE)
+_ABBREV_RE = re.compile(
+    r"(?<![\w.])(?<!\d\s)(" + "|".join(map(re.escape, _ABBREVIATIONS)) + r")\.(?=\s|$)", re.IGNORECASE
+)
+# Sadece küçük harf / baş harfi büyük yazım: "TSK", "VR" gibi kısaltmalar
+# argo sanılmasın (_spell_acronym'a kalır)
+_SLANG_FORMS = {**_SLANG, **{_capitalize_tr(k): v for k, v in _SLANG.items()}}
+_SLANG_RE = re.compile(r"(?<![\w])(" + "|".join(map(re.escape, _SLANG_FORMS)) + r")(?![\w])")
+_ACRONYM_RE = re.compile(r"(?<![\w])([A-ZÇĞİÖŞÜ]{2,6})(?![\w])" + _SUFFIX)
+
+# --- Dilden bağımsız kurallar ------------------------------------------------
+
+_EMOJI_RE = re.compile(
+    "["
+    "\U0001F000-\U0001FAFF"   # emoji, semboller, bayrak harfleri
+    "\U00002600-\U000027BF"   # çeşitli semboller, dingbat'ler
+    "\U00002B00-\U00002BFF"
+    "\U0000FE00-\U0000FE0F"   # varyasyon seçicileri
+    "\U0000200D\U000020E3"
+    "\U000E0020-\U000E007F"
+    "]+"
+)
+_EMOTICON_RE = re.compile(
+    r"(?:(?<=\s)|^)(?:[:;=][-'’o^]?[)(\]\[dDpPoO3/\\|*]+|<3+|\^_*\^|[-tTxX]_+[-tTxX]|xD+)(?=\s|$|[.,!?])"
+)
+_LAUGH_RE = re.compile(
+    r"(?<![\w])(?:a?h(?:a|e|ı|i){1,2}(?:h(?:a|e|ı|i)){1,}h?|(?:ja|js|jk|sj|sk){2,}\w*|l+o+l+|x+d+|asd\w*)(?![\w])",
+    re.IGNORECASE,
+)
+_ELONGATION_RE = re.compile(r"([^\W\d_])\1{2,}")
+_URL_RE = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+_MENTION_RE = re.compile(r"(?<![\w])@\w+")
+_HASHTAG_RE = re.compile(r"(?<![\w])#(\w+)")
+_NON_LATIN_RE = re.compile("[^\u0000-\u024F\u2000-\u206F\u20A0-\u20CF]+")
+_SYMBOLS_RE = re.compile(r"[*_~|^<>=#\[\]{}\\]+")
+_REPEAT_MARK_RE = re.compile(r"([!?])[!?]+")
+_REPEAT_DOTS_RE = re.compile(r"\.{4,}")
+_REPEAT_COMMA_RE = re.compile(r"([,;])\1+")
+_SPACE_BEFORE_PUNCT_RE = re.compile(r"\s+([,.!?;:…])")
+_SPACE_AFTER_PUNCT_RE = re.compile(r"([,.!?;:…])(?=[^\W\d_])")
+_SENTENCE_START_RE = re.compile(r"([.!?…]\s+)([a-zçğıöşü])")
+
+
+def _with_suffix(words: str, suffix: Optional[str]) -> str:
+    # "3'te" -> "üçte": ek okunuşa zaten uygun yazılıyor, kesme işareti düşer
+    return words + suffix if suffix else words
+
+
+def _date_words(m: re.Match, day: int, month: int, year: int, suffix: Optional[str]) -> str:
+    if not (1 <= day <= 31 and 1 <= month <= 12):
+        return m.group(0)
+    return _with_suffix(f"{number_to_words(day)} {_MONTHS[month - 1]} {number_to_words(year)}", suffix)
+
+
+def _expand_date(m: re.Match) -> str:
+    return _date_words(m, int(m.group(1)), int(m.group(3)), int(m.group(4)), m.group(5))
+
+
+def _expand_iso_date(m: re.Match, unresolved: List[str]) -> str:
+    # "2024-03-12'de": ek güne göre yazılmış, okunuşta sona yıl geliyor
+    if m.group(4):
+        unresolved.append(m.group(0))
+    return _date_words(m, int(m.group(3)), int(m.group(2)), int(m.group(1)), m.group(4))
+
+
+def _expand_time(m: re.Match) -> str:
+    hour, minute = int(m.group(1)), m.group(2)
+    words = number_to_words(hour)
+    if minute != "00":
+        words += " " + _digits_to_words(minute)
+    return _with_suffix(words, m.group(3))
+
+
+def _money_words(amount: str, unit: str) -> str:
+    main, sub = _CURRENCY[unit.lower()]
+    parsed = _split_number(amount)
+    if parsed is None:
+        return f"{amount} {main}"
+    whole, _, frac = parsed
+    words = f"{number_to_words(whole)} {main}"
+    cents = int((frac + "00")[:2]) if frac else 0
+    if cents:
+        words += f" {number_to_words(cents)} {sub}"
+    return words
+
+
+_SUFFIX_VOWELS = "aeıioöuü"
+_BACK_VOWELS = "aıou"
+_VOICELESS = "çfhkpsşt"
+_FRONT_STEMS = {"saat"}   # kalın ünlülü ama ince ek alan ("saatte")
+_FOUR_WAY = {"a": "ı", "ı": "ı", "e": "i", "i": "i", "o": "u", "u": "u", "ö": "ü", "ü": "ü"}
+
+
+def _harmonize_suffix(stem: str, suffix: str) -> str:
+    """
+    Kısaltmanın okunuşuna ("te le") göre yazılmış eki açılımın son kelimesine
+    uydurur: "TL'ye" -> "liraya", "$'ın" -> "doların", "kg'dan" -> "kilogramdan".
+    Ünlü uyumu (iki / dört yönlü), kaynaştırma harfi (y / n) ve d/t, c/ç benzeşmesi.
+    """
+    last = stem.split()[-1].lower()
+    vowel = "e" if last in _FRONT_STEMS else next((c for c in reversed(last) if c in _SUFFIX_VOWELS), "e")
+    after_vowel = last[-1] in _SUFFIX_VOWELS
+    s = suffix.lower()
+    tail = ""
+    if len(s) > 2 and s.endswith("ki"):
+        s, tail = s[:-2], "ki"   # "-deki": "ki" uyuma girmez
+
+    # Kaynaştırma harfini çıkar, gövdeye göre yeniden ekle
+    if len(s) > 1 and s[0] in "yn" and s[1] in _SUFFIX_VOWELS:
+        s = s[1:]
+    elif s.startswith("yl"):
+        s = s[1:]
+    if after_vowel:
+        if s[0] in _SUFFIX_VOWELS:
+            genitive = s[0] in "ıiuü" and s[1:2] == "n" and s[2:3] not in tuple(_SUFFIX_VOWELS)
+            s = ("n" if genitive else "y") + s
+        elif s in ("la", "le"):
+            s = "y" + s   # vasıta: "lirayla"
+
+    out = []
+    prev = last[-1]
+    for i, c in enumerate(s):
+        if c in "ae":
+            c = "a" if vowel in _BACK_VOWELS else "e"
+        elif c in "ıiuü":
+            c = _FOUR_WAY[vowel]
+        elif i == 0 and c in "dt":
+            c = "t" if prev in _VOICELESS else "d"
+        elif i == 0 and c in "cç":
+            c = "ç" if prev in _VOICELESS else "c"
+        if c in _SUFFIX_VOWELS:
+            vowel = c
+        out.append(c)
+    return "".join(out) + tail
+
+
+def _with_unit_suffix(words: str, suffix: Optional[str]) -> str:
+    return words + _harmonize_suffix(words, suffix) if suffix else words
+
+
+def _expand_currency_pre(m: re.Match) -> str:
+    return _with_unit_suffix(_money_words(m.group(2), m.group(1)), m.group(3))
+
+
+def _expand_currency_post(m: re.Match) -> str:
+    return _with_unit_suffix(_money_words(m.group(1), m.group(2)), m.group(3))
+
+
+def _expand_percent(m: re.Match) -> str:
+    if m.group(1) is not None:
+        return _with_suffix("yüzde " + _number_words(m.group(1)), m.group(2))
+    return _with_suffix("yüzde " + _number_words(m.group(3)), m.group(4))
+
+
+def _expand_unit(m: re.Match) -> str:
+    words = f"{_number_words(m.group(1))} {_UNITS[m.group(2).lower()]}"
+    return _with_unit_suffix(words, m.group(3))
+
+
+def _expand_number(m: re.Match) -> str:
+    return _with_suffix(_number_words(m.group(1)), m.group(2))
+
+
+def _expand_abbreviation(m: re.Match) -> str:
+    word = _ABBREVIATIONS[m.group(1).lower()]
+    return _capitalize_tr(word) if m.group(1)[0].isupper() else word
+
+
+def _expand_slang(m: re.Match) -> str:
+    word = _SLANG_FORMS[m.group(1)]
+    return _capitalize_tr(word) if m.group(1)[0].isupper() else word
+
+
+def _spell_acronym(m: re.Match) -> str:
+    # Sesli harf içermeyen kısaltmalar harf harf okunur ("THY" -> "te ha ye");
+    # "NATO", "ASELSAN" gibi okunabilenler olduğu gibi kalır
+    token = m.group(1)
+    if any(c in _VOWELS for c in token) or token in ("TL", "TRY"):
+        return m.group(0)
+    return _with_suffix(" ".join(_LETTER_NAMES[c] for c in token), m.group(2))
+
+
+def _normalize_turkish(text: str, unresolved: List[str]) -> str:
+    text = _ABBREV_RE.sub(_expand_abbreviation, text)
+    text = _SLANG_RE.sub(_expand_slang, text)
+    text = _DATE_RE.sub(_expand_date, text)
+    text = _ISO_DATE_RE.sub(lambda m: _expand_iso_date(m, unresolved), text)
+    text = _TIME_RE.sub(_expand_time, text)
+    text = _DOTTED_RE.sub(lambda m: " nokta ".join(number_to_words(int(d)) for d in m.group(0).split(".")), text)
+    text = _RANGE_RE.sub(" ", text)
+    text = _NEGATIVE_RE.sub("eksi ", text)
+    text = _CURRENCY_PRE_RE.sub(_expand_currency_pre, text)
+    text = _CURRENCY_POST_RE.sub(_expand_currency_post, text)
+    text = _PERCENT_RE.sub(_expand_percent, text)
+    text = _UNIT_RE.sub(_expand_unit, text)
+    text = _ORDINAL_DOT_RE.sub(lambda m: ordinal_to_words(int(m.group(1))), text)
+    text = _ORDINAL_SUFFIX_RE.sub(lambda m: ordinal_to_words(int(m.group(1))), text)
+    text = _NUMBER_RE.sub(_expand_number, text)
+    text = _ACRONYM_RE.sub(_spell_acronym, text)
+    if any(c.isdigit() for c in text):
+        # "MP3", "4K" gibi harf+rakam karışımları
+        unresolved += [t.strip(".,!?;:()\"'") for t in text.split() if any(c.isdigit() for c in t)]
+    return text
+
+
+def _repair_punctuation(text: str) -> str:
+    text = _SYMBOLS_RE.sub(" ", text)
+    text = text.replace("&", " ve ")
+    text = _REPEAT_MARK_RE.sub(r"\1", text)
+    text = _REPEAT_DOTS_RE.sub("...", text)
+    text = _REPEAT_COMMA_RE.sub(r"\1", text)
+    text = " ".join(text.split())
+    text = _SPACE_BEFORE_PUNCT_RE.sub(r"\1", text)
+    text = _SPACE_AFTER_PUNCT_RE.sub(r"\1 ", text)
+    text = text.strip(" ,;:-–")
+    if not text:
+        return text
+    text = _SENTENCE_START_RE.sub(lambda m: m.group(1) + _upper_tr(m.group(2)), text)
+    text = _capitalize_tr(text)
+    if text[-1] not in ".!?…\"'”’»)":
+        text += "."
+    return text
+
+
+@functools.lru_cache(maxsize=TEXT_NORMALIZE_CACHE_SIZE)
+def normalize_for_tts(text: str, language: str = "tr") -> NormalizedText:
+    """
+    Metni TTS'e hazırlar (deterministik, tek geçişlik regex'ler, LRU'lu).
+    Türkçe dışındaki dillerde sadece dilden bağımsız kurallar uygulanır.
+    """
+    unresolved: List[str] = []
+
+    def drop(m: re.Match) -> str:
+        unresolved.append(m.group(0))
+        return " "
+
+    text = _URL_RE.sub(drop, text)
+    text = _EMAIL_RE.sub(drop, text)
+    text = _MENTION_RE.sub(" ", text)
+    text = _HASHTAG_RE.sub(r"\1", text)
+    text = _EMOJI_RE.sub(" ", text)
+    text = _EMOTICON_RE.sub(" ", text)
+    text = _ELONGATION_RE.sub(r"\1", text)
+    text = _LAUGH_RE.sub(" ", text)
+    unresolved += _NON_LATIN_RE.findall(text)
+
+    if language == "tr":
+        text = _normalize_turkish(text, unresolved)
+
+    text = _repair_punctuation(text)
+    return NormalizedText(text, tuple(dict.fromkeys(unresolved)))
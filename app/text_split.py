@@ -0,0 +1,98 @@
+# app/text_split.py
+import re
+from typing import List
+
+# Nokta ile biten ama cümleyi bitirmeyen kısaltmalar (küçük harfe çevrilmiş)
+TR_ABBREVIATIONS = {
+    "dr", "prof", "doç", "doc", "yrd", "av", "sn", "bkz", "vb", "vs", "örn",
+    "tel", "no", "cad", "sok", "mah", "apt", "blv", "st", "mr", "mrs", "ltd",
+    "şti", "a.ş", "t.c", "hz", "alb", "gen", "org", "kur", "tic", "müh",
+    "uzm", "öğr", "gör", "yy", "bk", "s", "syf", "vd",
+}
+
+# XTTS'in Türkçe için önerdiği karakter sınırının biraz altı
+MAX_SENTENCE_CHARS = 220
+
+_CLOSERS = "\"'”’»)]"
+_BOUNDARY_RE = re.compile(r"([.!?…]+[" + re.escape(_CLOSERS) + r"]*)(\s+)")
+_SOFT_BREAK_RE = re.compile(r"(?<=[,;:])\s+")
+
+
+def _is_false_boundary(before: str, punct: str, after: str) -> bool:
+    """Nokta bir kısaltma, baş harf veya sıra sayısına aitse cümle bitmez."""
+    # '"Evet." dedi' gibi: sonrası küçük harfle başlıyorsa cümle sürüyor.
+    # Sayı + nokta da yalnızca burada sıra sayısıdır ("3. sınıf"); "Saat 5.
+    # Sonra gel." iki cümle (text_normalize._ORDINAL_DOT_RE ile aynı kural)
+    if after[:1].islower():
+        return True
+    # "...", "?!", '."' gibi işaretler bunun dışında her zaman cümle sonu
+    if punct != ".":
+        return False
+
+    words = before.split()
+    last = words[-1] if words else ""
+    last = last.lstrip("(\"'“«").lower()
+
+    if last in TR_ABBREVIATIONS:
+        return True
+    # "M. Kemal" gibi tek harfli baş harfler
+    return len(last) == 1 and last.isalpha()
+
+
+def _split_long(sentence: str, max_chars: int) -> List[str]:
+    """Çok uzun cümleyi önce virgül/noktalı virgülden, sonra boşluktan böler."""
+    if len(sentence) <= max_chars:
+        return [sentence]
+
+    parts: List[str] = []
+    current = ""
+    for piece in _SOFT_BREAK_RE.split(sentence):
+        candidate = f"{current} {piece}".strip()
+        if len(candidate) <= max_chars:
+            current = candidate
+            continue
+        if current:
+            parts.append(current)
+        current = piece
+        while len(current) > max_chars:
+            cut = current.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            parts.append(current[:cut].strip())
+            current = current[cut:].strip()
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_sentences(text: str, max_chars: int = MAX_SENTENCE_CHARS) -> List[str]:
+    """
+    Metni TTS için cümlelere böler (Türkçe kısaltma ve sıra sayılarına duyarlı).
+    - "Dr. Ayşe", "3. sınıf", "M. Kemal" cümleyi bölmez
+    - "?!", "..." ve kapanan tırnak/parantezler cümlenin parçası kalır
+    - max_chars'ı aşan cümleler virgül/boşluktan ikiye bölünür
+    """
+    text = " ".join(text.split())
+    if not text:
+        return []
+
+    sentences: List[str] = []
+    start = 0
+    for m in _BOUNDARY_RE.finditer(text):
+        before = text[start:m.start()]
+        after = text[m.end():]
+        if _is_false_boundary(before, m.group(1), after):
+            continue
+        sentence = text[start:m.end(1)].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = m.end()
+
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+
+    out: List[str] = []
+    for s in sentences:
+        out.extend(_split_long(s, max_chars))
+    return out
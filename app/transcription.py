@@ -0,0 +1,296 @@
+# app/transcription.py
+import hashlib
+import json
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from math import gcd
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from scipy.signal import resample_poly
+
+from . import metrics
+from .clean_cache import atomic_write_text
+from .config import ASR_CACHE_DIR, ASR_WINDOW_SEC, ASR_WORKERS
+from .loudness import LoudnessIndex
+
+WHISPER_SAMPLE_RATE = 16000
+
+# Pencereleme / transcribe parametreleri değişirse bunu artır: eski cache geçersiz olur
+ASR_VERSION = 1
+
+# Pencere sınırı aranırken kullanılan loudness frame'i
+_SILENCE_FRAME_MS = 100
+
+
+@dataclass
+class AsrWindow:
+    index: int
+    start_ms: int
+    end_ms: int
+    key: str
+
+
+def whisper_input(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """int16 kaydı Whisper'ın beklediği 16 kHz float32 diziye çevirir (diske yazmadan)."""
+    audio = samples.astype(np.float32) / 32768.0
+    if sample_rate != WHISPER_SAMPLE_RATE:
+        g = gcd(sample_rate, WHISPER_SAMPLE_RATE)
+        audio = resample_poly(audio, WHISPER_SAMPLE_RATE // g, sample_rate // g)
+    return audio.astype(np.float32, copy=False)
+
+
+def silence_windows(
+    samples: np.ndarray,
+    sample_rate: int,
+    max_window_sec: float = ASR_WINDOW_SEC,
+    min_window_sec: Optional[float] = None,
+    loudness: Optional[LoudnessIndex] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Kaydı en fazla max_window_sec uzunluğunda [start_ms, end_ms) pencerelerine böler.
+    Her kesim, pencerenin ikinci yarısındaki en sessiz 100 ms'lik frame'in
+    ortasına konur; böylece kelimeler ortadan bölünmez.
+    """
+    if loudness is None:
+        loudness = LoudnessIndex(samples, sample_rate, samples.dtype.itemsize)
+    total = loudness.duration_ms
+    max_ms = int(max_window_sec * 1000)
+    min_ms = int((min_window_sec if min_window_sec is not None else max_window_sec / 2) * 1000)
+    if total <= max_ms:
+        return [(0, total)]
+
+    starts = np.arange(0, total, _SILENCE_FRAME_MS, dtype=np.int64)
+    levels = loudness.dbfs(starts, starts + _SILENCE_FRAME_MS)
+
+    windows: List[Tuple[int, int]] = []
+    pos = 0
+    while total - pos > max_ms:
+        lo = (pos + min_ms) // _SILENCE_FRAME_MS
+        hi = (pos + max_ms - _SILENCE_FRAME_MS) // _SILENCE_FRAME_MS + 1
+        quietest = lo + int(np.argmin(levels[lo:hi]))
+        cut = int(starts[quietest]) + _SILENCE_FRAME_MS // 2
+        windows.append((pos, cut))
+        pos = cut
+    windows.append((pos, total))
+    return windows
+
+
+def _window_key(audio: np.ndarray, sample_rate: int, model_name: str, language: str) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps(["asr", ASR_VERSION, model_name, language, sample_rate]).encode("utf-8"))
+    h.update(np.ascontiguousarray(audio).data)
+    return h.hexdigest()
+
+
+def _cache_path(key: str):
+    return ASR_CACHE_DIR / f"{key}.json"
+
+
+def _load_cached(key: str) -> Optional[List[dict]]:
+    path = _cache_path(key)
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))["segments"]
+    except (ValueError, KeyError):
+        return None
+
+
+def _transcribe_one(model, audio: np.ndarray, sample_rate: int, language: str) -> List[dict]:
+    audio_sec = len(audio) / sample_rate
+    with metrics.span("resample", audio_sec=audio_sec, from_sr=sample_rate, to_sr=WHISPER_SAMPLE_RATE):
+        audio = whisper_input(audio, sample_rate)
+    # Worker process'lerde de çalışır: süreç içi toplamlar ana process'e taşınmaz,
+    # METRICS_PATH verilmişse satırlar aynı JSONL dosyasına eklenir
+    with metrics.span("whisper_window", audio_sec=audio_sec):
+        result = model.transcribe(audio, language=language, verbose=None)
+    return [
+        {"start": float(s["start"]), "end": float(s["end"]), "text": s["text"]}
+        for s in result.get("segments", [])
+    ]
+
+
+# --- process havuzu: her worker modeli bir kez yükler ---
+
+_worker_model = None
+_worker_language = "tr"
+
+
+def _init_worker(model_name: str, language: str, threads: int) -> None:
+    global _worker_model, _worker_language
+    import torch
+    import whisper
+
+    torch.set_num_threads(threads)
+    _worker_model = whisper.load_model(model_name)
+    _worker_language = language
+
+
+def _ensure_model_downloaded(model_name: str) -> None:
+    """Worker'lar aynı checkpoint'i aynı anda indirmeye çalışmasın diye önce burada indir."""
+    import whisper
+
+    url = getattr(whisper, "_MODELS", {}).get(model_name)
+    if url is None:
+        return  # yerel checkpoint yolu
+    root = os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "whisper")
+    whisper._download(url, root, False)
+
+
+def _worker_transcribe(audio: np.ndarray, sample_rate: int) -> List[dict]:
+    return _transcribe_one(_worker_model, audio, sample_rate, _worker_language)
+
+
+class AsrPool:
+    """
+    Birden fazla transcribe_windows çağrısı boyunca (ör. çok konuşmacılı
+    dataset üretimi) açık kalan Whisper havuzu: her worker modeli bir kez
+    yükler, konuşmacı başına yeniden yükleme olmaz.
+
+    - workers > 1: spawn process havuzu, her worker kendi modeliyle
+    - workers == 1: model bu process'te tutulur; `model` verilirse o kullanılır
+    Model / process'ler ilk transcribe edilecek pencere geldiğinde açılır;
+    her şey cache'teyse hiç yüklenmez.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "medium",
+        language: str = "tr",
+        workers: Optional[int] = None,
+        model=None,
+    ):
+        self.model_name = model_name
+        self.language = language
+        self.workers = 1 if model is not None else max(1, workers if workers is not None else ASR_WORKERS)
+        self._model = model
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _local_model(self):
+        if self._model is None:
+            import whisper
+
+            print(f"[INFO] Whisper modeli yükleniyor: {self.model_name}")
+            self._model = whisper.load_model(self.model_name)
+        return self._model
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            _ensure_model_downloaded(self.model_name)
+            print(f"[INFO] Whisper: {self.workers} process x {threads} thread ({self.model_name})")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=mp.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name, self.language, threads),
+            )
+        return self._executor
+
+    def transcribe(self, audios: List[np.ndarray], sample_rate: int) -> Iterator[Tuple[int, List[dict]]]:
+        """Pencereleri transcribe eder; (sıra, segmentler) biten sırayla döner."""
+        if self.workers == 1:
+            model = self._local_model()
+            for i, audio in enumerate(audios):
+                yield i, _transcribe_one(model, audio, sample_rate, self.language)
+            return
+        ex = self._pool()
+        futures = {ex.submit(_worker_transcribe, np.array(audio), sample_rate): i for i, audio in enumerate(audios)}
+        for fut in as_completed(futures):
+            yield futures[fut], fut.result()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "AsrPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def transcribe_windows(
+    samples: np.ndarray,
+    sample_rate: int,
+    model_name: str = "medium",
+    language: str = "tr",
+    workers: Optional[int] = None,
+    max_window_sec: float = ASR_WINDOW_SEC,
+    model=None,
+    pool: Optional[AsrPool] = None,
+) -> List[dict]:
+    """
+    Uzun kaydı sessizlik sınırlarından pencerelere bölüp transcribe eder ve
+    segmentleri global zamana taşıyarak birleştirir.
+
+    - Her pencerenin sonucu içerik özetiyle CACHE_DIR/asr altına yazılır;
+      tekrar çalıştırmada değişmemiş pencereler için Whisper hiç çalışmaz
+    - workers > 1: pencereler process havuzunda, her worker kendi modeliyle
+    - workers == 1: tek process; `model` verilirse o kullanılır
+    - pool verilirse (AsrPool) onun modeli / worker'ları kullanılır, çağrı
+      bitince kapatılmaz; model_name / language havuzunkiyle aynı olmalı
+
+    Dönüş: Whisper'ın `segments` listesiyle aynı biçimde
+    [{"start": sn, "end": sn, "text": str}, ...], zamana göre sıralı.
+    """
+    if workers is None:
+        workers = ASR_WORKERS
+    if pool is not None and (pool.model_name, pool.language) != (model_name, language):
+        raise ValueError(
+            f"AsrPool ({pool.model_name}, {pool.language}) ile istenen ({model_name}, {language}) farklı"
+        )
+
+    bounds = silence_windows(samples, sample_rate, max_window_sec)
+    windows: List[AsrWindow] = []
+    audio_of: Dict[int, np.ndarray] = {}
+    for i, (start_ms, end_ms) in enumerate(bounds):
+        audio = samples[int(start_ms * sample_rate / 1000):int(end_ms * sample_rate / 1000)]
+        windows.append(AsrWindow(i, start_ms, end_ms, _window_key(audio, sample_rate, model_name, language)))
+        audio_of[i] = audio
+
+    results: Dict[int, List[dict]] = {}
+    todo: List[AsrWindow] = []
+    for w in windows:
+        cached = _load_cached(w.key)
+        if cached is None:
+            todo.append(w)
+        else:
+            results[w.index] = cached
+    print(f"[INFO] ASR: {len(windows)} pencere, {len(windows) - len(todo)} tanesi cache'ten")
+
+    def store(w: AsrWindow, segments: List[dict]) -> None:
+        results[w.index] = segments
+        atomic_write_text(
+            _cache_path(w.key),
+            json.dumps({"segments": segments}, ensure_ascii=False),
+        )
+        done = len(results)
+        print(f"[{done}/{len(windows)}] ASR: {w.start_ms / 1000:.1f}-{w.end_ms / 1000:.1f} sn")
+
+    if todo:
+        ASR_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        owned = pool is None
+        if owned:
+            pool = AsrPool(model_name, language, max(1, min(workers, len(todo))), model)
+        try:
+            for i, segments in pool.transcribe([audio_of[w.index] for w in todo], sample_rate):
+                store(todo[i], segments)
+        finally:
+            if owned:
+                pool.close()
+
+    merged: List[dict] = []
+    for w in windows:
+        offset = w.start_ms / 1000.0
+        limit = w.end_ms / 1000.0
+        for seg in results[w.index]:
+            start = min(seg["start"] + offset, limit)
+            end = min(seg["end"] + offset, limit)
+            if end > start and seg["text"].strip():
+                merged.append({"start": start, "end": end, "text": seg["text"]})
+    return merged
@@ -0,0 +1,361 @@
+# app/tts_backends.py
+import hashlib
+import os
+import pickle
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, List, Optional, Protocol, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from .config import (
+    FAKE_TTS_BASE_LATENCY_SEC,
+    FAKE_TTS_SEC_PER_CHAR,
+    TTS_CPU_INTEROP_THREADS,
+    TTS_CPU_PROFILE,
+    TTS_CPU_THREADS,
+    TTS_MODEL_NAME,
+    XTTS_GENERATION_OVERRIDES,
+)
+
+# torch / TTS ağır modüller (birkaç saniye): sadece gerçekten lazım olunca import edilir
+if TYPE_CHECKING:
+    from TTS.api import TTS
+
+# (gpt_cond_latent, speaker_embedding) — backend'e özgü opak nesneler
+SpeakerLatents = Tuple[Any, Any]
+
+
+class TTSBackend(Protocol):
+    """
+    tts_engine'in konuştuğu arayüz. Üst katmanlar (pipeline, batch, servis)
+    sadece tts_engine fonksiyonlarını kullanır; hangi modelin çalıştığını
+    config.TTS_BACKEND belirler.
+    """
+
+    # Cache anahtarlarına girer: farklı backend'in latent/çıktısı karışmasın
+    backend_id: str
+
+    def load(self) -> None: ...
+
+    def is_loaded(self) -> bool: ...
+
+    def output_sample_rate(self) -> int: ...
+
+    def split_into_sentences(self, text: str) -> List[str]: ...
+
+    def compute_latents(self, speaker_wav: List[Path]) -> SpeakerLatents: ...
+
+    def save_latents(self, latents: SpeakerLatents, path: Path) -> None: ...
+
+    def load_latents(self, path: Path) -> SpeakerLatents: ...
+
+    def synthesize_sentence(self, text: str, latents: SpeakerLatents, language: str) -> np.ndarray: ...
+
+    def save_wav(self, wav: np.ndarray, path: Path) -> None: ...
+
+
+@dataclass(frozen=True)
+class CpuInferenceProfile:
+    """
+    XTTS'in CPU'da nasıl çalıştırılacağı.
+    - intra_op_threads / inter_op_threads: 0 ise torch varsayılanı, None ise
+      config'teki TTS_CPU_THREADS / process'e ayrılmış çekirdek sayısı
+    - inference_mode: True -> torch.inference_mode, False -> torch.no_grad
+    - quantize_int8: GPT2 gövdesi ve başlıklarındaki lineer katmanları dinamik int8'e çevirir (deneysel)
+      (ses değişir; cache anahtarlarına backend_id üzerinden girer)
+    """
+    name: str
+    intra_op_threads: Optional[int] = 0
+    inter_op_threads: Optional[int] = 0
+    inference_mode: bool = True
+    quantize_int8: bool = False
+
+
+CPU_PROFILES = {
+    "default": CpuInferenceProfile("default"),
+    "tuned": CpuInferenceProfile("tuned", intra_op_threads=None, inter_op_threads=None),
+    "int8": CpuInferenceProfile("int8", intra_op_threads=None, inter_op_threads=None, quantize_int8=True),
+}
+
+
+def _available_cpus() -> int:
+    # cgroup / taskset kısıtlarını da hesaba katar
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def apply_cpu_threads(profile: CpuInferenceProfile) -> None:
+    """Profilin thread ayarlarını torch'a uygular (process geneli, model yüklenmeden önce)."""
+    import torch
+
+    intra = profile.intra_op_threads
+    if intra is None:
+        intra = TTS_CPU_THREADS or _available_cpus()
+    inter = profile.inter_op_threads
+    if inter is None:
+        inter = TTS_CPU_INTEROP_THREADS
+    if intra:
+        torch.set_num_threads(intra)
+    if inter:
+        try:
+            torch.set_num_interop_threads(inter)
+        except RuntimeError as e:
+            # Paralel bir iş başladıktan sonra değiştirilemez
+            print(f"[WARN] inter-op thread sayısı ayarlanamadı: {e}")
+    print(
+        f"[INFO] CPU profili: {profile.name} "
+        f"({torch.get_num_threads()} intra / {torch.get_num_interop_threads()} inter-op thread)"
+    )
+
+
+def _conv1d_to_linear(module) -> int:
+    """
+    HF GPT-2 blokları (XTTS'in GPT'si) nn.Linear yerine transformers Conv1D
+    kullanır; quantize_dynamic onları görmez. Aynı hesabı yapan nn.Linear'a
+    çevirir (Conv1D ağırlığı (in, out), Linear'ınki (out, in)). Dönüş: sayı.
+    """
+    import torch
+
+    replaced = 0
+    for name, child in list(module.named_children()):
+        if type(child).__name__ == "Conv1D" and hasattr(child, "nf"):
+            in_features, out_features = child.weight.shape
+            linear = torch.nn.Linear(in_features, out_features, bias=child.bias is not None)
+            with torch.no_grad():
+                linear.weight.copy_(child.weight.t())
+                if child.bias is not None:
+                    linear.bias.copy_(child.bias)
+            setattr(module, name, linear)
+            replaced += 1
+        else:
+            replaced += _conv1d_to_linear(child)
+    return replaced
+
+
+def quantize_gpt_int8(model) -> None:
+    """
+    XTTS'in otoregresif GPT2 gövdesindeki ve text / mel başlıklarındaki
+    lineer katmanları dinamik int8'e çevirir (ağırlık int8, aktivasyon
+    çalışma anında). model.gpt altındaki koşullandırma kodlayıcısı ve
+    perceiver, embedding'ler ve vocoder (HiFi-GAN) float kalır. Sadece CPU.
+    """
+    import torch
+
+    gpt = model.gpt
+    converted = _conv1d_to_linear(gpt.gpt)
+    targets = {"gpt", "text_head", "mel_head"}
+    # Üretim gpt_inference üzerinden çalışır ve gövdeyi + mel_head'i paylaşır;
+    # hedefte olmazsa o yoldan dolaşılırken paylaşılan modüllerin qconfig'i silinir
+    if hasattr(gpt, "gpt_inference"):
+        targets.add("gpt_inference")
+    torch.ao.quantization.quantize_dynamic(gpt, targets, dtype=torch.qint8, inplace=True)
+    print(f"[INFO] GPT2 gövdesi ve başlıkları int8'e çevrildi ({converted} Conv1D -> Linear)")
+
+
+class XTTSBackend:
+    """Coqui XTTS-v2 (TTS.api.TTS) üzerinden gerçek sentez."""
+
+    def __init__(self, model_name: str = TTS_MODEL_NAME, cpu_profile: str = TTS_CPU_PROFILE):
+        try:
+            self.cpu_profile = CPU_PROFILES[cpu_profile]
+        except KeyError:
+            raise ValueError(
+                f"Bilinmeyen TTS_CPU_PROFILE: {cpu_profile} (seçenekler: {', '.join(CPU_PROFILES)})"
+            )
+        self.model_name = model_name
+        # int8 çıktıyı değiştirir: latent / çıktı cache'i ayrı tutulsun
+        self.backend_id = f"{model_name}+int8" if self.cpu_profile.quantize_int8 else model_name
+        self._tts: Optional["TTS"] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def device() -> str:
+        import torch
+
+        return "cuda" if torch.cuda.is_available() else "cpu"
+
+    @property
+    def tts(self) -> "TTS":
+        """
+        XTTS-v2 modelini yükler.
+        İlk çağrıda HuggingFace'ten indirir, sonra cache'den kullanır.
+        Başka thread yüklerken çağrılırsa onu bekler.
+        """
+        with self._lock:
+            if self._tts is None:
+                from TTS.api import TTS
+
+                device = self.device()
+                if device == "cpu":
+                    apply_cpu_threads(self.cpu_profile)
+                tts = TTS(self.model_name, progress_bar=False).to(device)
+                model = tts.synthesizer.tts_model
+                model.eval()
+                model.requires_grad_(False)
+                if self.cpu_profile.quantize_int8:
+                    if device == "cpu":
+                        quantize_gpt_int8(model)
+                    else:
+                        print(f"[WARN] int8 profili sadece CPU'da uygulanır (cihaz: {device})")
+                self._tts = tts
+            return self._tts
+
+    def _inference_context(self):
+        import torch
+
+        return torch.inference_mode() if self.cpu_profile.inference_mode else torch.no_grad()
+
+    def load(self) -> None:
+        self.tts
+
+    def is_loaded(self) -> bool:
+        return self._tts is not None
+
+    def output_sample_rate(self) -> int:
+        return int(self.tts.synthesizer.tts_model.config.audio.output_sample_rate)
+
+    def split_into_sentences(self, text: str) -> List[str]:
+        return self.tts.synthesizer.split_into_sentences(text)
+
+    def compute_latents(self, speaker_wav: List[Path]) -> SpeakerLatents:
+        """tts_to_file'ın her çağrıda içeride yaptığı işin aynısı, ama bir kez."""
+        model = self.tts.synthesizer.tts_model
+        cfg = model.config
+
+        with self._inference_context():
+            gpt_cond_latent, speaker_embedding = model.get_conditioning_latents(
+                audio_path=[str(p) for p in speaker_wav],
+                gpt_cond_len=cfg.gpt_cond_len,
+                gpt_cond_chunk_len=cfg.gpt_cond_chunk_len,
+                max_ref_length=cfg.max_ref_len,
+                sound_norm_refs=cfg.sound_norm_refs,
+            )
+        return gpt_cond_latent, speaker_embedding
+
+    def save_latents(self, latents: SpeakerLatents, path: Path) -> None:
+        import torch
+
+        gpt_cond_latent, speaker_embedding = latents
+        torch.save(
+            {
+                "gpt_cond_latent": gpt_cond_latent.cpu(),
+                "speaker_embedding": speaker_embedding.cpu(),
+            },
+            path,
+        )
+
+    def load_latents(self, path: Path) -> SpeakerLatents:
+        import torch
+
+        data = torch.load(path, map_location=self.device())
+        return data["gpt_cond_latent"], data["speaker_embedding"]
+
+    def synthesize_sentence(self, text: str, latents: SpeakerLatents, language: str) -> np.ndarray:
+        model = self.tts.synthesizer.tts_model
+        cfg = model.config
+        gpt_cond_latent, speaker_embedding = latents
+
+        settings = {
+            "temperature": cfg.temperature,
+            "length_penalty": cfg.length_penalty,
+            "repetition_penalty": cfg.repetition_penalty,
+            "top_k": cfg.top_k,
+            "top_p": cfg.top_p,
+            **XTTS_GENERATION_OVERRIDES,
+        }
+
+        with self._inference_context():
+            out = model.inference(
+                text,
+                language,
+                gpt_cond_latent,
+                speaker_embedding,
+                **settings,
+            )
+        return np.asarray(out["wav"], dtype=np.float32)
+
+    def save_wav(self, wav: np.ndarray, path: Path) -> None:
+        self.tts.synthesizer.save_wav(np.asarray(wav, dtype=np.float32), str(path))
+
+
+class FakeTTSBackend:
+    """
+    Model indirmeden benchmark / yük testi için deterministik CPU backend'i.
+
+    - Latent: referans dosyalarının içerik özetinden türetilen küçük vektörler
+    - Ses: (metin, latent) ile tohumlanan sinüs + gürültü; aynı girdi aynı çıktı
+    - Gecikme: base_latency_sec + len(text) * sec_per_char (time.sleep)
+    """
+
+    backend_id = "fake-tts-v1"
+
+    def __init__(
+        self,
+        sample_rate: int = 24000,
+        base_latency_sec: float = FAKE_TTS_BASE_LATENCY_SEC,
+        sec_per_char: float = FAKE_TTS_SEC_PER_CHAR,
+        audio_sec_per_char: float = 0.065,
+    ):
+        self.sample_rate = sample_rate
+        self.base_latency_sec = base_latency_sec
+        self.sec_per_char = sec_per_char
+        self.audio_sec_per_char = audio_sec_per_char
+
+    def load(self) -> None:
+        pass
+
+    def is_loaded(self) -> bool:
+        return True
+
+    def output_sample_rate(self) -> int:
+        return self.sample_rate
+
+    def split_into_sentences(self, text: str) -> List[str]:
+        from .text_split import split_sentences
+
+        return split_sentences(text)
+
+    def compute_latents(self, speaker_wav: List[Path]) -> SpeakerLatents:
+        h = hashlib.sha256()
+        for p in speaker_wav:
+            h.update(Path(p).read_bytes())
+        seed = int.from_bytes(h.digest()[:8], "little")
+        rng = np.random.default_rng(seed)
+        return rng.standard_normal(32).astype(np.float32), rng.standard_normal(16).astype(np.float32)
+
+    def save_latents(self, latents: SpeakerLatents, path: Path) -> None:
+        with path.open("wb") as f:
+            pickle.dump(latents, f)
+
+    def load_latents(self, path: Path) -> SpeakerLatents:
+        with path.open("rb") as f:
+            return pickle.load(f)
+
+    def synthesize_sentence(self, text: str, latents: SpeakerLatents, language: str) -> np.ndarray:
+        time.sleep(self.base_latency_sec + len(text) * self.sec_per_char)
+        h = hashlib.sha256(f"{language}|{text}".encode("utf-8"))
+        h.update(np.asarray(latents[1], dtype=np.float32).tobytes())
+        rng = np.random.default_rng(int.from_bytes(h.digest()[:8], "little"))
+
+        n = max(1, int(len(text) * self.audio_sec_per_char * self.sample_rate))
+        t = np.arange(n, dtype=np.float32) / self.sample_rate
+        pitch = 110.0 + 80.0 * rng.random()
+        wav = 0.3 * np.sin(2 * np.pi * pitch * t) + 0.02 * rng.standard_normal(n)
+        return wav.astype(np.float32)
+
+    def save_wav(self, wav: np.ndarray, path: Path) -> None:
+        # XTTS'in save_wav'ı ile aynı: tepe değere göre normalize, 16 bit PCM
+        wav = np.asarray(wav, dtype=np.float32)
+        peak = max(0.01, float(np.max(np.abs(wav)))) if len(wav) else 1.0
+        sf.write(str(path), (wav * (32767 / peak)).astype(np.int16), self.sample_rate, subtype="PCM_16")
+
+
+BACKENDS = {
+    "xtts": XTTSBackend,
+    "fake": FakeTTSBackend,
+}
@@ -1,12 +1,23 @@
 # app/tts_engine.py
+import threading
+import time
 from pathlib import Path
-from functools import lru_cache
-from typing import Literal, Union, List
+from typing import TYPE_CHECKING, Literal, Optional, Union, List
 
-import torch
-from TTS.api import TTS
+import numpy as np
 
-from .config import TTS_MODEL_NAME
+from . import metrics
+from .config import TTS_BACKEND
+from .tts_backends import (
+    BACKENDS,
+    CpuInferenceProfile,
+    SpeakerLatents,
+    TTSBackend,
+    XTTSBackend,
+)
+
+if TYPE_CHECKING:
+    from TTS.api import TTS
 
 
 LanguageCode = Literal[
@@ -30,18 +41,83 @@ LanguageCode = Literal[
 ]
 
 
+_backend: Optional[TTSBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> TTSBackend:
+    """config.TTS_BACKEND'e göre backend'i (bir kez) oluşturur. Model yüklemez."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            try:
+                _backend = BACKENDS[TTS_BACKEND]()
+            except KeyError:
+                raise ValueError(
+                    f"Bilinmeyen TTS_BACKEND: {TTS_BACKEND} (seçenekler: {', '.join(BACKENDS)})"
+                )
+        return _backend
+
+
+def set_backend(backend: TTSBackend) -> None:
+    """Backend'i elle değiştirir (test / benchmark)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def backend_id() -> str:
+    """Latent / çıktı cache anahtarlarına giren backend kimliği."""
+    return get_backend().backend_id
+
+
 def get_device() -> str:
-    return "cuda" if torch.cuda.is_available() else "cpu"
+    return XTTSBackend.device()
+
+
+def get_cpu_profile() -> Optional[CpuInferenceProfile]:
+    """Aktif backend'in CPU çalışma profili (config.TTS_CPU_PROFILE; xtts dışında None)."""
+    return getattr(get_backend(), "cpu_profile", None)
 
 
-@lru_cache
-def get_tts() -> TTS:
+def get_tts() -> "TTS":
     """
-    XTTS-v2 modelini yükler.
-    İlk çağrıda HuggingFace'ten indirir, sonra cache'den kullanır.
+    XTTS-v2 modelini yükler (sadece xtts backend'inde anlamlı).
+    Arka planda warm_up_tts() ile yükleme sürerken çağrılırsa onu bekler.
     """
-    tts = TTS(TTS_MODEL_NAME, progress_bar=False).to(get_device())
-    return tts
+    backend = get_backend()
+    if not isinstance(backend, XTTSBackend):
+        raise RuntimeError(f"get_tts() xtts backend'i gerektirir (aktif: {backend.backend_id})")
+    return backend.tts
+
+
+def ensure_tts_loaded() -> None:
+    get_backend().load()
+
+
+def is_tts_loaded() -> bool:
+    return get_backend().is_loaded()
+
+
+def warm_up_tts() -> threading.Thread:
+    """
+    Modeli arka plan thread'inde yükler (torch/TTS import'u dahil).
+    Kullanıcı klasör seçerken / metin yazarken model hazırlanmış olur.
+    Hata olursa sadece uyarı basılır; ilk gerçek kullanım tekrar dener.
+    """
+
+    def run() -> None:
+        t0 = time.perf_counter()
+        try:
+            ensure_tts_loaded()
+        except Exception as e:
+            print(f"[WARN] TTS modeli arka planda yüklenemedi: {e}")
+            return
+        print(f"[INFO] TTS modeli arka planda yüklendi ({time.perf_counter() - t0:.1f} sn)")
+
+    thread = threading.Thread(target=run, name="tts-warmup", daemon=True)
+    thread.start()
+    return thread
 
 
 def synthesize_to_wav(
@@ -52,19 +128,72 @@ def synthesize_to_wav(
 ) -> Path:
     """
     Metni, tek bir referans ya da çoklu referans segment kullanarak sese çevirir.
+    (tts_to_file ile aynı iş: latent hesapla + cümle cümle üret)
+    """
+    if not isinstance(speaker_wav, list):
+        speaker_wav = [speaker_wav]
+    latents = compute_speaker_latents(speaker_wav)
+    return synthesize_with_latents(text, latents, out_path, language)
+
+
+def compute_speaker_latents(speaker_wav: List[Path]) -> SpeakerLatents:
+    """
+    Referans segmentlerden conditioning latent'lerini hesaplar.
+    tts_to_file'ın her çağrıda içeride yaptığı işin aynısı, ama bir kez.
+    """
+    with metrics.span("tts_latents", refs=len(speaker_wav)):
+        return get_backend().compute_latents(speaker_wav)
+
+
+def save_speaker_latents(latents: SpeakerLatents, path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    get_backend().save_latents(latents, tmp_path)
+    tmp_path.replace(path)
+    return path
+
+
+def load_speaker_latents(path: Path) -> SpeakerLatents:
+    return get_backend().load_latents(path)
+
+
+def get_output_sample_rate() -> int:
+    return get_backend().output_sample_rate()
+
+
+def synthesize_sentence(
+    text: str,
+    latents: SpeakerLatents,
+    language: LanguageCode = "tr",
+) -> np.ndarray:
+    """Tek bir cümleyi hazır latent'lerle float32 dalga formuna çevirir."""
+    backend = get_backend()
+    with metrics.span("tts", backend=backend.backend_id, chars=len(text)) as sp:
+        wav = backend.synthesize_sentence(text, latents, language)
+        sp.set(audio_sec=len(wav) / backend.output_sample_rate())
+    return wav
+
+
+def synthesize_with_latents(
+    text: str,
+    latents: SpeakerLatents,
+    out_path: Path,
+    language: LanguageCode = "tr",
+) -> Path:
     """
-    tts = get_tts()
+    Önceden hesaplanmış latent'lerle doğrudan inference yapar.
+    Cümle bölme ve cümle arası boşluk tts_to_file ile aynıdır.
+    """
+    backend = get_backend()
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    if isinstance(speaker_wav, list):
-        speaker_arg = [str(p) for p in speaker_wav]
-    else:
-        speaker_arg = str(speaker_wav)
-
-    tts.tts_to_file(
-        text=text,
-        speaker_wav=speaker_arg,
-        language=language,
-        file_path=str(out_path),
-    )
+    pad = np.zeros(10000, dtype=np.float32)
+    parts: List[np.ndarray] = []
+    for sen in backend.split_into_sentences(text):
+        parts.append(np.asarray(synthesize_sentence(sen, latents, language), dtype=np.float32))
+        parts.append(pad)
+
+    wav = np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+    with metrics.span("tts_save", audio_sec=len(wav) / backend.output_sample_rate()):
+        backend.save_wav(wav, out_path)
     return out_path
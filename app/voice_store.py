@@ -0,0 +1,152 @@
+# app/voice_store.py
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+
+class UnknownVoice(ValueError):
+    """Kayıtlı olmayan voice_id (servis 404 döner)."""
+
+
+@dataclass
+class VoiceProfile:
+    voice_id: str
+    person_dir: Path
+    speaker_wav_paths: List[Path]   # çoklu referans segmentler
+    total_duration_sec: float
+    ref_durations: List[float] = field(default_factory=list)
+    ref_scores: List[float] = field(default_factory=list)
+    # dosya adı -> {"size", "mtime_ns", "sha256"}
+    source_fingerprints: Dict[str, Dict[str, object]] = field(default_factory=dict)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS voices (
+    voice_id            TEXT PRIMARY KEY,
+    person_dir          TEXT NOT NULL,
+    speaker_wav_paths   TEXT NOT NULL,
+    total_duration_sec  REAL NOT NULL,
+    ref_durations       TEXT NOT NULL,
+    ref_scores          TEXT NOT NULL,
+    source_fingerprints TEXT NOT NULL,
+    updated_at          REAL NOT NULL DEFAULT (julianday('now'))
+)
+"""
+
+
+class VoiceStore:
+    """
+    Voice profillerini SQLite'ta kalıcı tutan indeks.
+
+    - Bağlantı ilk erişimde açılır (lazy), her thread kendi bağlantısını kullanır
+    - WAL modu: yazma sürerken okuyucular (başka process'ler dahil) bloklanmaz
+    - voice_id primary key olduğu için arama tek index lookup'ı
+    - dict gibi kullanılabilir: `voice_id in store`, `store[voice_id]`
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row_to_profile(row: tuple) -> VoiceProfile:
+        (voice_id, person_dir, wav_paths, total_dur,
+         ref_durations, ref_scores, fingerprints) = row
+        return VoiceProfile(
+            voice_id=voice_id,
+            person_dir=Path(person_dir),
+            speaker_wav_paths=[Path(p) for p in json.loads(wav_paths)],
+            total_duration_sec=total_dur,
+            ref_durations=json.loads(ref_durations),
+            ref_scores=json.loads(ref_scores),
+            source_fingerprints=json.loads(fingerprints),
+        )
+
+    def get(self, voice_id: str) -> Optional[VoiceProfile]:
+        row = self._conn().execute(
+            "SELECT voice_id, person_dir, speaker_wav_paths, total_duration_sec,"
+            " ref_durations, ref_scores, source_fingerprints"
+            " FROM voices WHERE voice_id = ?",
+            (voice_id,),
+        ).fetchone()
+        return self._row_to_profile(row) if row else None
+
+    def put(self, profile: VoiceProfile) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO voices (voice_id, person_dir, speaker_wav_paths,"
+                " total_duration_sec, ref_durations, ref_scores, source_fingerprints,"
+                " updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, julianday('now'))",
+                (
+                    profile.voice_id,
+                    str(profile.person_dir),
+                    json.dumps([str(p) for p in profile.speaker_wav_paths]),
+                    float(profile.total_duration_sec),
+                    json.dumps(profile.ref_durations),
+                    json.dumps(profile.ref_scores),
+                    json.dumps(profile.source_fingerprints),
+                ),
+            )
+
+    def delete(self, voice_id: str) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM voices WHERE voice_id = ?", (voice_id,))
+
+    def find_by_person_dir(self, person_dir: Path) -> Optional[VoiceProfile]:
+        """Klasörden en son enroll edilen profil (yoksa None)."""
+        row = self._conn().execute(
+            "SELECT voice_id, person_dir, speaker_wav_paths, total_duration_sec,"
+            " ref_durations, ref_scores, source_fingerprints"
+            " FROM voices WHERE person_dir = ? ORDER BY updated_at DESC LIMIT 1",
+            (str(person_dir),),
+        ).fetchone()
+        return self._row_to_profile(row) if row else None
+
+    def voice_ids(self) -> List[str]:
+        rows = self._conn().execute("SELECT voice_id FROM voices ORDER BY updated_at")
+        return [r[0] for r in rows]
+
+    def __contains__(self, voice_id: object) -> bool:
+        if not isinstance(voice_id, str):
+            return False
+        row = self._conn().execute(
+            "SELECT 1 FROM voices WHERE voice_id = ?", (voice_id,)
+        ).fetchone()
+        return row is not None
+
+    def __getitem__(self, voice_id: str) -> VoiceProfile:
+        profile = self.get(voice_id)
+        if profile is None:
+            raise KeyError(voice_id)
+        return profile
+
+    def __setitem__(self, voice_id: str, profile: VoiceProfile) -> None:
+        if voice_id != profile.voice_id:
+            raise ValueError(f"voice_id uyuşmuyor: {voice_id} != {profile.voice_id}")
+        self.put(profile)
+
+    def __delitem__(self, voice_id: str) -> None:
+        self.delete(voice_id)
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM voices").fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.voice_ids())
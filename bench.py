@@ -0,0 +1,292 @@
+# bench.py
+"""
+Tekrarlanabilir benchmark seti. Model indirmeden (TTS_BACKEND=fake, sahte
+Whisper, yerel OpenAI taklidi) sentetik ses fixture'ları üzerinde:
+
+    enroll   : decode, temizleme (soğuk / cache), skor, referans seçimi, enroll,
+               değişmemiş / tek dosya eklenmiş klasörü yeniden enroll
+    dataset  : build_training_dataset_for_person ve tüm konuşmacılar (sahte ASR)
+    clean    : metadata temizliği sıralı / async / paketli (stub LLM)
+    synth    : synthesize_with_voice verimi, RTF, cache hit, akışta ilk ses
+
+Sonuçlar makinece okunur JSON olarak yazılır; iki çalıştırma `--compare` ile
+karşılaştırılabilir.
+
+    python bench.py --minutes 10 --out bench_results.json
+    python bench.py --compare eski.json yeni.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+SUITES = ("enroll", "dataset", "clean", "synth")
+
+
+class FakeASRModel:
+    """whisper modelinin transcribe() arayüzü: sabit aralıklı deterministik segmentler."""
+
+    def __init__(self, segment_sec: float = 4.0):
+        self.segment_sec = segment_sec
+        self._count = 0   # pencereler arasında da benzersiz metin
+
+    def transcribe(self, audio, language=None, verbose=None):
+        total = len(audio) / 16000.0
+        segments, t = [], 0.0
+        while t < total:
+            end = min(t + self.segment_sec, total)
+            segments.append({"start": t, "end": end, "text": f" eee bu {self._count} numaralı cümle yani"})
+            t = end + 0.3
+            self._count += 1
+        return {"segments": segments}
+
+
+class Recorder:
+    def __init__(self):
+        self.results: List[dict] = []
+
+    def measure(self, suite: str, stage: str, fn: Callable, audio_sec: Optional[float] = None, **extra):
+        t0 = time.perf_counter()
+        value = fn()
+        wall = time.perf_counter() - t0
+        row = {"suite": suite, "stage": stage, "wall_sec": round(wall, 4)}
+        if audio_sec:
+            row["audio_sec"] = round(audio_sec, 3)
+            row["rtf"] = round(wall / audio_sec, 5)
+        row.update(extra)
+        self.results.append(row)
+        print(f"  {suite:<8} {stage:<22} {wall * 1000:10.1f} ms" + (f"  RTF {row['rtf']:.4f}" if audio_sec else ""))
+        return value
+
+
+def write_fixtures(root: Path, minutes: float, files: int, seed: int) -> Path:
+    from benchmarks.bench_framing import synthetic_speech
+
+    person_dir = root / "speakers" / "bench_speaker"
+    person_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(files):
+        seg = synthetic_speech(minutes / files, seed=seed + i)
+        seg.export(person_dir / f"rec_{i:02d}.wav", format="wav")
+    return person_dir
+
+
+def bench_enroll(rec: Recorder, person_dir: Path) -> None:
+    from app import audio_preprocess as ap
+    from app.loudness import LoudnessIndex
+    from app.pipeline import enroll_from_person_folder
+
+    files = ap.list_audio_files(person_dir)
+    raw = rec.measure("enroll", "decode", lambda: [ap.decode_file(f) for f in files])
+    audio_sec = sum(len(r) for r in raw) / 24000
+    del raw
+
+    cleaned = rec.measure("enroll", "clean_cold", lambda: ap.load_cleaned_audio(files), audio_sec)
+    rec.measure("enroll", "clean_cached", lambda: ap.load_cleaned_audio(files), audio_sec)
+    rec.measure(
+        "enroll", "chunk_scores",
+        lambda: LoudnessIndex(cleaned.samples, cleaned.sample_rate, 2).chunk_scores(8000),
+        audio_sec,
+    )
+    rec.measure(
+        "enroll", "extract_refs",
+        lambda: ap.extract_speaker_segments(person_dir, "bench_refs"),
+        audio_sec,
+    )
+    rec.measure("enroll", "enroll_total", lambda: enroll_from_person_folder(person_dir, new_voice=True), audio_sec)
+    rec.measure("enroll", "reenroll_unchanged", lambda: enroll_from_person_folder(person_dir))
+
+    # Klasöre tek kayıt eklenince sadece o dosya işlenir, voice_id korunur
+    from benchmarks.bench_framing import synthetic_speech
+
+    extra = person_dir / "rec_added.wav"
+    synthetic_speech(0.5, seed=999).export(extra, format="wav")
+    rec.measure("enroll", "reenroll_one_new", lambda: enroll_from_person_folder(person_dir))
+    extra.unlink()
+
+
+def bench_dataset(rec: Recorder, person_dir: Path) -> Path:
+    from app.dataset_builder import build_training_dataset_for_person
+
+    metadata = rec.measure(
+        "dataset", "build_dataset",
+        lambda: build_training_dataset_for_person(person_dir, "bench_spk", asr_model=FakeASRModel()),
+    )
+    lines = metadata.read_text(encoding="utf-8").splitlines()
+    rec.results[-1]["utterances"] = len(lines)
+
+    # Çok konuşmacılı zamanlayıcı: ikinci çalıştırmada değişmemiş kişiler atlanır
+    from app.dataset_scheduler import build_all_speakers
+
+    model = FakeASRModel()
+    results = rec.measure("dataset", "build_all", lambda: build_all_speakers(person_dir.parent, asr_model=model))
+    rec.results[-1]["speakers"] = len(results)
+    rec.measure("dataset", "build_all_unchanged", lambda: build_all_speakers(person_dir.parent, asr_model=model))
+    return metadata
+
+
+def bench_clean(rec: Recorder, metadata: Path, tmp: Path, lines: int, latency: float) -> None:
+    import asyncio
+
+    from openai import AsyncOpenAI, OpenAI
+
+    from app import metadata_cleaner
+    from app.clean_cache import CleanCache
+    from benchmarks.stub_openai import StubOpenAIServer
+
+    src = tmp / "clean_src.csv"
+    src.write_text("\n".join(metadata.read_text(encoding="utf-8").splitlines()[:lines]), encoding="utf-8")
+    n = len(src.read_text(encoding="utf-8").splitlines())
+
+    with StubOpenAIServer(latency=latency) as stub:
+        metadata_cleaner.client = OpenAI(base_url=stub.base_url, api_key="stub")
+        runs = [
+            ("sequential", lambda out: metadata_cleaner.clean_metadata_file(src, out, sleep_between=0.0)),
+            ("async", lambda out: asyncio.run(metadata_cleaner.clean_metadata_file_async(
+                src, out, concurrency=16, requests_per_minute=60_000, tokens_per_minute=10_000_000,
+                aclient=AsyncOpenAI(base_url=stub.base_url, api_key="stub", max_retries=0),
+            ))),
+            ("batched", lambda out: metadata_cleaner.clean_metadata_file(src, out, batched=True)),
+        ]
+        for name, run in runs:
+            metadata_cleaner.clean_cache = CleanCache(tmp / f"clean_{name}.jsonl")
+            before = stub.requests
+            rec.measure("clean", name, lambda: run(tmp / f"clean_{name}.csv"))
+            rec.results[-1].update(lines=n, llm_requests=stub.requests - before)
+
+
+def bench_synth(rec: Recorder, person_dir: Path, requests: int) -> None:
+    import soundfile as sf
+
+    from app.pipeline import enroll_from_person_folder, stream_with_voice, synthesize_with_voice
+    from app.streaming import StreamStats
+
+    profile = enroll_from_person_folder(person_dir)
+    texts = [
+        f"Bu {i} numaralı deneme cümlesi. Sentez hızını ölçüyoruz, sonuçlar JSON olarak yazılacak."
+        for i in range(requests)
+    ]
+
+    rec.measure("synth", "first_request", lambda: synthesize_with_voice(profile.voice_id, texts[0]))
+    out = rec.measure("synth", "throughput", lambda: [synthesize_with_voice(profile.voice_id, t) for t in texts[1:]])
+    audio_sec = sum(sf.info(str(p)).duration for p in out)
+    row = rec.results[-1]
+    row.update(
+        jobs=len(out),
+        jobs_per_sec=round(len(out) / row["wall_sec"], 3) if row["wall_sec"] else None,
+        audio_sec=round(audio_sec, 3),
+        rtf=round(row["wall_sec"] / audio_sec, 5) if audio_sec else None,
+    )
+    rec.measure("synth", "cached_repeat", lambda: [synthesize_with_voice(profile.voice_id, t) for t in texts[1:]])
+
+    stats = StreamStats()
+    rec.measure("synth", "stream", lambda: list(stream_with_voice(profile.voice_id, " ".join(texts[:5]), stats=stats)))
+    rec.results[-1].update(
+        time_to_first_audio_sec=round(stats.time_to_first_audio or 0.0, 4),
+        audio_sec=round(stats.audio_sec, 3),
+    )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=Path(__file__).parent, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_path: Path, new_path: Path) -> None:
+    old = {(r["suite"], r["stage"]): r for r in json.loads(old_path.read_text())["results"]}
+    new = json.loads(new_path.read_text())["results"]
+    print(f"{'suite':<8} {'stage':<22} {'eski ms':>10} {'yeni ms':>10} {'oran':>7}")
+    for r in new:
+        o = old.get((r["suite"], r["stage"]))
+        if o is None or "wall_sec" not in r:
+            continue
+        ratio = r["wall_sec"] / o["wall_sec"] if o["wall_sec"] else float("nan")
+        print(f"{r['suite']:<8} {r['stage']:<22} {o['wall_sec'] * 1000:10.1f} {r['wall_sec'] * 1000:10.1f} {ratio:6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline benchmark seti (JSON çıktı).")
+    parser.add_argument("--suites", default=",".join(SUITES), help=f"virgülle: {','.join(SUITES)}")
+    parser.add_argument("--minutes", type=float, default=5.0, help="sentetik kayıt süresi")
+    parser.add_argument("--files", type=int, default=4, help="kayıt kaç dosyaya bölünsün")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", default="fake", help="TTS_BACKEND (fake / xtts)")
+    parser.add_argument("--synth-requests", type=int, default=20)
+    parser.add_argument("--clean-lines", type=int, default=60)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--out", type=Path, default=None, help="JSON sonuç dosyası")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("ESKI", "YENI"))
+    parser.add_argument("--metrics-dir", type=Path, default=None,
+                        help="aşama span'larını buraya yaz (spans.jsonl + metrics.prom)")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"Bilinmeyen suite: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory(prefix="tts_bench_") as tmp_str:
+        tmp = Path(tmp_str)
+        # app modülleri import edilmeden önce: tüm cache/çıktılar geçici klasöre, sahte backend
+        os.environ["DATA_DIR"] = str(tmp / "data")
+        os.environ["TTS_BACKEND"] = args.backend
+        os.environ.setdefault("OPENAI_API_KEY", "stub")
+        sys.path.insert(0, str(Path(__file__).parent))
+        if args.metrics_dir:
+            os.environ["METRICS"] = "1"
+            os.environ["METRICS_PATH"] = str(args.metrics_dir / "spans.jsonl")
+
+        rec = Recorder()
+        print(f"[INFO] Fixture: {args.minutes} dk, {args.files} dosya (seed {args.seed})")
+        person_dir = rec.measure("fixture", "write_fixtures", lambda: write_fixtures(tmp, args.minutes, args.files, args.seed))
+
+        metadata = None
+        if "enroll" in suites:
+            bench_enroll(rec, person_dir)
+        if "dataset" in suites or "clean" in suites:
+            metadata = bench_dataset(rec, person_dir)
+        if "clean" in suites:
+            bench_clean(rec, metadata, tmp, args.clean_lines, args.llm_latency)
+        if "synth" in suites:
+            bench_synth(rec, person_dir, args.synth_requests)
+
+        if args.metrics_dir:
+            from app import metrics
+
+            metrics.print_summary()
+            metrics.write_prometheus(args.metrics_dir / "metrics.prom")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        },
+        "results": rec.results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+        print(f"[OK] Sonuçlar: {args.out}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
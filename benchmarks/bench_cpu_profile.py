@@ -0,0 +1,127 @@
+# benchmarks/bench_cpu_profile.py
+"""
+XTTS'in CPU çalışma profillerinin karşılaştırması (bkz. tts_backends.CPU_PROFILES):
+model yükleme süresi, yükleme sonrası RSS, tepe RSS ve sentez real-time
+factor'ı (süre / üretilen ses).
+
+Thread ayarları process geneli, int8 dönüşümü yerinde yapıldığı için her
+profil ayrı bir process'te (GPU kapalı) çalıştırılır. Gerçek XTTS modeli
+gerekir (ilk çalıştırmada indirilir).
+
+Çalıştırma:  python -m benchmarks.bench_cpu_profile --profiles default,tuned,int8 --sentences 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SENTENCES = [
+    "Bugün hava çok güzel, birlikte parka yürüyüşe çıkalım mı?",
+    "Toplantı saat on dörtte başlayacak, lütfen geç kalmayın.",
+    "Kitabın son bölümünü okuduğumda gözlerim doldu.",
+    "Yarın sabah erkenden yola çıkıp akşama kadar orada olacağız.",
+    "Bu sesi dinlediğinde kimin konuştuğunu hemen anlayacaksın.",
+]
+
+
+def run_profile(profile: str, sentences: int, threads: int) -> dict:
+    """Alt process: tek profili ölçer, sonucu JSON olarak döndürür."""
+    os.environ["TTS_BACKEND"] = "xtts"
+    os.environ["TTS_CPU_PROFILE"] = profile
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    if threads:
+        os.environ["TTS_CPU_THREADS"] = str(threads)
+
+    from app.metrics import _peak_rss_bytes, _rss_bytes
+    from app.tts_engine import (
+        compute_speaker_latents,
+        ensure_tts_loaded,
+        get_cpu_profile,
+        get_output_sample_rate,
+        synthesize_sentence,
+    )
+    from benchmarks.bench_framing import synthetic_speech
+
+    rss0 = _rss_bytes()
+    t0 = time.perf_counter()
+    ensure_tts_loaded()
+    load_sec = time.perf_counter() - t0
+    rss_loaded = _rss_bytes()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ref = Path(tmp) / "ref.wav"
+        synthetic_speech(10 / 60, seed=0).export(ref, format="wav")
+        t0 = time.perf_counter()
+        latents = compute_speaker_latents([ref])
+        latents_sec = time.perf_counter() - t0
+
+    # İlk cümle ısınma (lazy init'ler ölçüme girmesin)
+    synthesize_sentence(SENTENCES[0], latents, "tr")
+    texts = [SENTENCES[i % len(SENTENCES)] for i in range(sentences)]
+    sr = get_output_sample_rate()
+    audio_sec = 0.0
+    t0 = time.perf_counter()
+    for text in texts:
+        audio_sec += len(synthesize_sentence(text, latents, "tr")) / sr
+    synth_sec = time.perf_counter() - t0
+
+    import torch
+
+    return {
+        "profile": get_cpu_profile().name,
+        "intra_op_threads": torch.get_num_threads(),
+        "inter_op_threads": torch.get_num_interop_threads(),
+        "load_sec": round(load_sec, 3),
+        "latents_sec": round(latents_sec, 3),
+        "synth_sec": round(synth_sec, 3),
+        "audio_sec": round(audio_sec, 3),
+        "rtf": round(synth_sec / audio_sec, 4) if audio_sec else None,
+        "model_rss_mb": round((rss_loaded - rss0) / 1024**2, 1),
+        "peak_rss_mb": round(_peak_rss_bytes() / 1024**2, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", default="default,tuned,int8")
+    parser.add_argument("--sentences", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=0, help="TTS_CPU_THREADS (0: çekirdek sayısı)")
+    parser.add_argument("--out", type=Path, default=None, help="JSON sonuç dosyası")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_profile(args.worker, args.sentences, args.threads)))
+        return
+
+    results = []
+    for profile in [p.strip() for p in args.profiles.split(",") if p.strip()]:
+        print(f"[INFO] Profil: {profile}")
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_cpu_profile", "--worker", profile,
+             "--sentences", str(args.sentences), "--threads", str(args.threads)],
+            cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"[WARN] {profile} çalıştırılamadı:\n{proc.stderr[-2000:]}")
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"{'profil':<8} {'thread':>7} {'yükleme sn':>11} {'RTF':>8} {'model MB':>9} {'tepe MB':>8}")
+    for r in results:
+        print(
+            f"{r['profile']:<8} {r['intra_op_threads']:>4}/{r['inter_op_threads']:<2} {r['load_sec']:>11.1f} "
+            f"{r['rtf']:>8.3f} {r['model_rss_mb']:>9.0f} {r['peak_rss_mb']:>8.0f}"
+        )
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"[OK] Sonuçlar: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/bench_dataset_shards.py
+"""
+Eğitim datası okuma: metadata.csv + tek tek utt wav dosyaları ile paketli
+shard'lar (np.memmap) karşılaştırması. Bir "epoch" = tüm utt'leri karışık
+sırayla okuyup float32'ye çevirmek (data loader'ın yaptığı iş). Ayrıca
+export -> import gidiş-dönüşünün birebir aynı olduğu kontrol edilir.
+
+Not: dosyalar yeni yazıldığı için page cache sıcaktır; ağ diskinde dosya
+başına açma maliyeti çok daha yüksektir, fark burada görülenden büyük olur.
+
+Çalıştırma:  python -m benchmarks.bench_dataset_shards --utts 3000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+from app.dataset_shards import ShardReader, export_shards, import_shards
+
+
+def write_dataset(root: Path, n: int, sr: int, rng) -> Path:
+    audio_dir = root / "audio"
+    audio_dir.mkdir(parents=True)
+    lines = []
+    for i in range(1, n + 1):
+        samples = (rng.standard_normal(int(rng.uniform(1.5, 10.0) * sr)) * 3000).clip(-32768, 32767)
+        sf.write(str(audio_dir / f"utt_{i:04d}.wav"), samples.astype(np.int16), sr, subtype="PCM_16")
+        lines.append(f"audio/utt_{i:04d}.wav|bu {i} numaralı cümle\n")
+    metadata = root / "metadata.csv"
+    metadata.write_text("".join(lines), encoding="utf-8")
+    return metadata
+
+
+def epoch_files(metadata: Path, order) -> float:
+    rows = [line.split("|", 1) for line in metadata.read_text(encoding="utf-8").splitlines()]
+    total = 0.0
+    for i in order:
+        audio, _ = sf.read(str(metadata.parent / rows[i][0]), dtype="float32")
+        total += float(audio[0])
+    return total
+
+
+def epoch_shards(reader: ShardReader, order) -> float:
+    scale = 1.0 / 32768.0 if reader.dtype == np.int16 else 1.0
+    total = 0.0
+    for i in order:
+        audio = reader.audio(i).astype(np.float32) * scale
+        total += float(audio[0])
+    return total
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--utts", type=int, default=3000)
+    parser.add_argument("--epochs", type=int, default=3)
+    args = parser.parse_args()
+
+    sr = 24000
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        metadata = write_dataset(root / "ds", args.utts, sr, rng)
+        audio_sec = sum(sf.info(str(p)).duration for p in (root / "ds" / "audio").iterdir())
+
+        t_export = timed(lambda: export_shards(metadata, root / "shards_i16", dtype="int16"))
+        export_shards(metadata, root / "shards_f16", dtype="float16")
+        readers = {
+            "int16": ShardReader(root / "shards_i16"),
+            "float16": ShardReader(root / "shards_f16"),
+        }
+
+        # Gidiş-dönüş: int16 birebir aynı olmalı
+        back = import_shards(root / "shards_i16", root / "back")
+        same_meta = back.read_text(encoding="utf-8") == metadata.read_text(encoding="utf-8")
+        same_audio = all(
+            np.array_equal(sf.read(str(root / "ds" / p), dtype="int16")[0], sf.read(str(root / "back" / p), dtype="int16")[0])
+            for p in readers["int16"].paths
+        )
+
+        rows = {"dosyalar": [], "int16": [], "float16": []}
+        for _ in range(args.epochs):
+            order = rng.permutation(args.utts)
+            rows["dosyalar"].append(timed(lambda: epoch_files(metadata, order)))
+            for name, reader in readers.items():
+                rows[name].append(timed(lambda: epoch_shards(reader, order)))
+
+        print(f"{args.utts} utt, {audio_sec / 60:.1f} dk ses, export {t_export:.2f} sn")
+        base = min(rows["dosyalar"])
+        for name, times in rows.items():
+            best = min(times)
+            print(
+                f"  {name:<9} epoch {best * 1000:8.1f} ms   {args.utts / best:9.0f} utt/sn"
+                f"   {base / best:5.1f}x"
+            )
+        print(f"  gidiş-dönüş (int16): metadata {'aynı' if same_meta else 'FARKLI'}, "
+              f"ses {'aynı' if same_audio else 'FARKLI'}")
+
+
+if __name__ == "__main__":
+    main()
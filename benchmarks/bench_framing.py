@@ -0,0 +1,118 @@
+# benchmarks/bench_framing.py
+"""
+Eski pydub döngüsü (her 200/300 ms dilim için .dBFS) ile LoudnessIndex
+karşılaştırması. Seçilen chunk'ların birebir aynı olduğunu da kontrol eder.
+
+Çalıştırma:  python -m benchmarks.bench_framing --minutes 30
+"""
+import argparse
+import time
+
+import numpy as np
+from pydub import AudioSegment
+
+from app.loudness import LoudnessIndex
+
+
+def synthetic_speech(minutes: float, sr: int = 24000, seed: int = 0) -> AudioSegment:
+    """Konuşma benzeri sinyal: rastgele uzunlukta gürültü patlamaları + sessizlikler."""
+    rng = np.random.default_rng(seed)
+    n = int(minutes * 60 * sr)
+    out = np.zeros(n, dtype=np.float64)
+    pos = int(rng.uniform(0.5, 2.0) * sr)   # baştaki sessizlik
+    while pos < n - 2 * sr:
+        burst = int(rng.uniform(0.2, 3.0) * sr)
+        amp = rng.uniform(500, 8000)
+        out[pos:pos + burst] = rng.normal(0, amp, size=min(burst, n - pos))
+        pos += burst + int(rng.uniform(0.05, 1.5) * sr)
+    samples = np.clip(out, -32768, 32767).astype(np.int16)
+    return AudioSegment(samples.tobytes(), frame_rate=sr, sample_width=2, channels=1)
+
+
+# --- Referans (eski) implementasyon -----------------------------------------
+
+def _legacy_trim(audio, silence_thresh_dbfs=-45.0, chunk_ms=300):
+    if len(audio) <= chunk_ms:
+        return 0, len(audio)
+    start_ms = 0
+    while start_ms + chunk_ms < len(audio):
+        if audio[start_ms:start_ms + chunk_ms].dBFS > silence_thresh_dbfs:
+            break
+        start_ms += chunk_ms
+    end_ms = len(audio)
+    while end_ms - chunk_ms > start_ms + chunk_ms:
+        if audio[end_ms - chunk_ms:end_ms].dBFS > silence_thresh_dbfs:
+            break
+        end_ms -= chunk_ms
+    return start_ms, end_ms
+
+
+def _legacy_score(chunk, silence_threshold_dbfs=-45.0, frame_ms=200):
+    if len(chunk) < frame_ms:
+        return None
+    loud = [
+        chunk[s:min(s + frame_ms, len(chunk))].dBFS
+        for s in range(0, len(chunk), frame_ms)
+    ]
+    silent = sum(1 for v in loud if v < silence_threshold_dbfs)
+    ratio = silent / len(loud)
+    if ratio > 0.7:
+        return None
+    return float(sum(loud) / len(loud) - ratio * 20.0)
+
+
+def legacy_select(audio, chunk_ms=8000, top_k=12):
+    start_ms, end_ms = _legacy_trim(audio)
+    trimmed = audio[start_ms:end_ms]
+    scored = []
+    for idx, start in enumerate(range(0, len(trimmed), chunk_ms)):
+        sc = _legacy_score(trimmed[start:start + chunk_ms])
+        if sc is not None:
+            scored.append((sc, idx))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return (start_ms, end_ms), scored[:top_k]
+
+
+def vectorized_select(audio, chunk_ms=8000, top_k=12):
+    index = LoudnessIndex.from_segment(audio)
+    start_ms, end_ms = index.trim_bounds()
+    scores = index.chunk_scores(chunk_ms, start_ms=start_ms, end_ms=end_ms)
+    scored = [(sc, idx) for idx, sc in enumerate(scores) if sc is not None]
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return (start_ms, end_ms), scored[:top_k]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=10.0)
+    args = parser.parse_args()
+
+    audio = synthetic_speech(args.minutes)
+    print(f"[INFO] Sentetik kayıt: {len(audio) / 1000.0:.1f} sn")
+
+    t0 = time.perf_counter()
+    legacy = legacy_select(audio)
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    fast = vectorized_select(audio)
+    t_fast = time.perf_counter() - t0
+
+    same_bounds = legacy[0] == fast[0]
+    same_chunks = [i for _, i in legacy[1]] == [i for _, i in fast[1]]
+    max_diff = max(
+        (abs(a[0] - b[0]) for a, b in zip(legacy[1], fast[1]) if a[0] != b[0]),
+        default=0.0,
+    )
+
+    print(f"  pydub döngüsü : {t_legacy * 1000:9.1f} ms")
+    print(f"  LoudnessIndex : {t_fast * 1000:9.1f} ms  (x{t_legacy / t_fast:.1f})")
+    print(f"  trim aynı     : {same_bounds} {fast[0]}")
+    print(f"  seçim aynı    : {same_chunks}  (max skor farkı {max_diff:.2e})")
+
+    if not (same_bounds and same_chunks):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# benchmarks/bench_metadata_cleaning.py
+"""
+Sıralı clean_metadata_file ile async/eşzamanlı yolu yerel OpenAI taklidine
+karşı karşılaştırır. Çıktıların birebir aynı (ve aynı sırada) olduğunu da
+kontrol eder.
+
+Çalıştırma:  python -m benchmarks.bench_metadata_cleaning --lines 200 --latency 0.2
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from openai import AsyncOpenAI, OpenAI
+
+from app.clean_cache import CleanCache
+from app.llm_batching import get_batch_stats
+from benchmarks.stub_openai import StubOpenAIServer
+
+
+def write_fake_metadata(path: Path, n: int) -> None:
+    words = ["merhaba", "simdi", "sana", "guzel", "bir", "hikaye", "anlatacagim", "eee", "yani"]
+    lines = [
+        f"audio/utt_{i:04d}.wav|{i} " + " ".join(words[(i + k) % len(words)] for k in range(8))
+        for i in range(1, n + 1)
+    ]
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    from app import metadata_cleaner
+
+    with StubOpenAIServer(latency=args.latency, error_rate=args.error_rate) as stub, \
+            tempfile.TemporaryDirectory() as tmp:
+        meta = Path(tmp) / "metadata.csv"
+        write_fake_metadata(meta, args.lines)
+
+        # Sıralı yol (hata yüzdesi 0: sıralı yolda retry yok)
+        metadata_cleaner.clean_cache = CleanCache(Path(tmp) / "seq_cache.jsonl")
+        metadata_cleaner.client = OpenAI(base_url=stub.base_url, api_key="stub")
+        stub.error_rate = 0.0
+        t0 = time.perf_counter()
+        seq_out = metadata_cleaner.clean_metadata_file(
+            meta, Path(tmp) / "seq.csv", sleep_between=0.0
+        )
+        t_seq = time.perf_counter() - t0
+
+        # Async yol (429'lar backoff ile tekrar denenir)
+        async_cache = CleanCache(Path(tmp) / "async_cache.jsonl")
+        metadata_cleaner.clean_cache = async_cache
+        stub.error_rate = args.error_rate
+        aclient = AsyncOpenAI(base_url=stub.base_url, api_key="stub", max_retries=0)
+        t0 = time.perf_counter()
+        async_out = asyncio.run(
+            metadata_cleaner.clean_metadata_file_async(
+                meta,
+                Path(tmp) / "async.csv",
+                concurrency=args.concurrency,
+                requests_per_minute=60_000,
+                tokens_per_minute=10_000_000,
+                aclient=aclient,
+            )
+        )
+        t_async = time.perf_counter() - t0
+
+        # Paketli yol: birden fazla cümle tek istekte (hata yüzdesi 0)
+        metadata_cleaner.clean_cache = CleanCache(Path(tmp) / "batch_cache.jsonl")
+        stub.error_rate = 0.0
+        before, stats_before = stub.requests, get_batch_stats()
+        t0 = time.perf_counter()
+        batch_out = metadata_cleaner.clean_metadata_file(
+            meta, Path(tmp) / "batch.csv", batched=True
+        )
+        t_batch = time.perf_counter() - t0
+        batch_requests = stub.requests - before
+        tokens_saved = get_batch_stats().tokens_saved - stats_before.tokens_saved
+
+        seq_text = seq_out.read_text(encoding="utf-8")
+        same = seq_text == async_out.read_text(encoding="utf-8")
+        batch_same = seq_text == batch_out.read_text(encoding="utf-8")
+        print()
+        print(f"  satır            : {args.lines}")
+        print(f"  sıralı           : {t_seq:7.2f} sn ({args.lines / t_seq:6.1f} satır/sn)")
+        print(f"  async (c={args.concurrency:<3})    : {t_async:7.2f} sn ({args.lines / t_async:6.1f} satır/sn)")
+        print(f"  hızlanma         : x{t_seq / t_async:.1f}")
+        print(f"  429 (tekrar den.): {stub.errors}")
+        print(f"  çıktı aynı       : {same}")
+        print(f"  paketli          : {t_batch:7.2f} sn ({batch_requests} istek, ~{tokens_saved} token tasarruf)")
+        print(f"  paketli çıktı aynı: {batch_same}")
+        # Aynı veriyle tekrar: her şey cache'ten, LLM çağrısı olmamalı
+        metadata_cleaner.clean_cache = async_cache
+        before = stub.requests
+        t0 = time.perf_counter()
+        metadata_cleaner.clean_metadata_file(meta, Path(tmp) / "rerun.csv", sleep_between=0.0)
+        t_rerun = time.perf_counter() - t0
+        print(f"  tekrar çalıştırma: {t_rerun:7.2f} sn ({stub.requests - before} LLM çağrısı)")
+
+        if not (same and batch_same):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
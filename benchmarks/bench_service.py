@@ -0,0 +1,115 @@
+# benchmarks/bench_service.py
+"""
+Sentez servisinin sahte backend ile uçtan uca yük testi.
+N eşzamanlı istemci /synthesize'a istek atar; istemci tarafı p50/p99 gecikme,
+iş/sn, 503 sayısı ve servisin /stats çıktısı raporlanır. Bir /stream isteği ile
+/enroll de uçtan uca denenir.
+
+Çalıştırma:  python -m benchmarks.bench_service --requests 400 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from app.service import FakeBackend, SynthesisService, _percentile, start_server
+
+_TEXTS = [
+    "Merhaba, bugün hava çok güzel.",
+    "Şimdi sana kısa bir hikâye anlatacağım.",
+    "Toplantı saat üçte başlayacak, lütfen geç kalma.",
+    "Bu bir yük testi cümlesidir.",
+]
+
+
+async def http_request(port: int, method: str, path: str, payload: Optional[dict] = None) -> Tuple[int, bytes]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload or {}).encode("utf-8")
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, rest = raw.partition(b"\r\n\r\n")
+    return int(head.split(b" ", 2)[1]), rest
+
+
+async def run(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = FakeBackend(out_dir=Path(tmp), sec_per_char=args.sec_per_char)
+        service = SynthesisService(backend, queue_size=args.queue_size, batch_max=args.batch_max)
+        server = await start_server(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+
+        status, body = await http_request(port, "POST", "/enroll", {"person_dir": tmp})
+        voice_id = json.loads(body)["voice_id"]
+        voices = [voice_id] + [f"voice_{i}" for i in range(args.voices - 1)]
+
+        status, body = await http_request(
+            port, "POST", "/stream", {"voice_id": voice_id, "text": " ".join(_TEXTS)}
+        )
+        stream_ok = status == 200 and len(body) > 0
+
+        rng = random.Random(0)
+        latencies: List[float] = []
+        rejected = 0
+        sem = asyncio.Semaphore(args.concurrency)
+
+        async def one(i: int) -> None:
+            nonlocal rejected
+            payload = {
+                "voice_id": rng.choice(voices),
+                "text": f"{rng.choice(_TEXTS)} {i % args.distinct}",
+            }
+            async with sem:
+                t0 = time.perf_counter()
+                status, _ = await http_request(port, "POST", "/synthesize", payload)
+                if status == 503:
+                    rejected += 1
+                    return
+                if status != 200:
+                    raise RuntimeError(f"HTTP {status}")
+                latencies.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        wall = time.perf_counter() - t0
+
+        _, body = await http_request(port, "GET", "/stats")
+        stats = json.loads(body)
+        server.close()
+        await server.wait_closed()
+        await service.stop()
+
+    print()
+    print(f"  istek / eşzamanlı : {args.requests} / {args.concurrency}")
+    print(f"  başarılı / 503    : {len(latencies)} / {rejected}")
+    print(f"  süre              : {wall:6.2f} sn ({len(latencies) / wall:6.1f} istek/sn)")
+    print(f"  p50 / p99         : {_percentile(latencies, 50) * 1000:6.1f} / {_percentile(latencies, 99) * 1000:6.1f} ms")
+    print(f"  backend çağrısı   : {backend.calls}")
+    print(f"  ort. batch        : {stats['avg_batch_size']:.2f} (dedupe {stats['deduplicated']})")
+    print(f"  stream            : {'OK' if stream_ok else 'HATA'}")
+    if not stream_ok:
+        raise SystemExit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--voices", type=int, default=3)
+    parser.add_argument("--distinct", type=int, default=50, help="farklı metin sayısı (tekrarlar dedupe edilir)")
+    parser.add_argument("--sec-per-char", type=float, default=0.0002)
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--batch-max", type=int, default=8)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
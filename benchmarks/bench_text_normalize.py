@@ -0,0 +1,100 @@
+# benchmarks/bench_text_normalize.py
+"""
+Sentez öncesi yerel metin normalizasyonunun gecikmesi: soğuk (LRU boş) ve
+sıcak (aynı metin tekrar) çağrı başına mikro saniye, p50/p99 ve kuralların
+çözemeyip LLM'e bırakacağı metin oranı. Önce CASES'teki beklenen çıktılar
+kontrol edilir.
+
+Çalıştırma:  python -m benchmarks.bench_text_normalize --texts 5000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.text_normalize import normalize_for_tts
+
+TEMPLATES = [
+    "Dr. Ayşe {i}. kata çıktı, {i},50 TL ödedi 😂 slm!!!",
+    "Toplantı 12.03.2024 saat 14:{m:02d}'da, merkeze {i} km uzakta.",
+    "çoooook güzel olmuş hahaha :) fiyatı %{m} indirimle ${i}",
+    "{i}.250.000 kişi 1990'larda geldi ve THY'nin uçağına bindi",
+    "MP{m} dosyasını https://ornek.com/{i} adresinden indir",
+    "merhaba   ,nasılsın?? bugün {i} kişiyiz ....   tamam",
+]
+
+# (girdi, beklenen metin, çözülemeyenler)
+CASES = [
+    ("Dr. Ayşe 3. kata çıktı, 12,50 TL ödedi 😂 slm!!!",
+     "Doktor Ayşe üçüncü kata çıktı, on iki lira elli kuruş ödedi selam!", ()),
+    ("5 sn. bekle.", "Beş saniye bekle.", ()),
+    ("Sn. Ahmet geldi.", "Sayın Ahmet geldi.", ()),
+    ("0532 123 45 67", "Sıfır beş üç iki yüz yirmi üç kırk beş altmış yedi.", ()),
+    ("IBAN TR12 0006", "IBAN TR12 sıfır sıfır sıfır altı.", ("TR12",)),
+    ("2024-03-12", "On iki Mart iki bin yirmi dört.", ()),
+    ("3-5 kişi, -5 °C", "Üç beş kişi, eksi beş derece.", ()),
+    ("TSK açıklama yaptı.", "Te se ke açıklama yaptı.", ()),
+    ("VR gözlüğü", "Ve re gözlüğü.", ()),
+    ("HB ile", "Ha be ile.", ()),
+    ("Slm, tşk!", "Selam, teşekkürler!", ()),
+    ("THY uçağı", "Te ha ye uçağı.", ()),
+    ("100 TL'ye aldım", "Yüz liraya aldım.", ()),
+    ("5 kg'dan fazla, $20'ın yarısı", "Beş kilogramdan fazla, yirmi doların yarısı.", ()),
+    ("Maç 3:2 bitti.", "Maç üç iki bitti.", ()),
+]
+
+
+def check_cases() -> int:
+    failed = 0
+    for text, expected, unresolved in CASES:
+        got = normalize_for_tts(text, "tr")
+        if got.text != expected or got.unresolved != unresolved:
+            failed += 1
+            print(f"  [HATA] {text!r}\n         beklenen {expected!r} {unresolved}\n"
+                  f"         çıkan    {got.text!r} {got.unresolved}")
+    print(f"Kontrol: {len(CASES) - failed}/{len(CASES)} doğru")
+    return failed
+
+
+def make_texts(n: int):
+    return [TEMPLATES[i % len(TEMPLATES)].format(i=i, m=i % 60) for i in range(n)]
+
+
+def timed(texts):
+    per_call = np.empty(len(texts))
+    for k, text in enumerate(texts):
+        t0 = time.perf_counter()
+        normalize_for_tts(text, "tr")
+        per_call[k] = time.perf_counter() - t0
+    return per_call * 1e6
+
+
+def report(name: str, us: np.ndarray) -> None:
+    print(
+        f"  {name:<6} ort {us.mean():8.1f} µs   p50 {np.percentile(us, 50):8.1f} µs"
+        f"   p99 {np.percentile(us, 99):8.1f} µs   max {us.max():8.1f} µs"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--texts", type=int, default=5000)
+    args = parser.parse_args()
+
+    failed = check_cases()
+    texts = make_texts(args.texts)
+    normalize_for_tts.cache_clear()
+    cold = timed(texts)
+    hot = timed(texts)
+    unresolved = sum(1 for t in texts if normalize_for_tts(t, "tr").unresolved)
+
+    print(f"{len(texts)} metin:")
+    report("soğuk", cold)
+    report("sıcak", hot)
+    print(f"  LLM'e kalacak: {unresolved / len(texts):.0%}  ({normalize_for_tts.cache_info()})")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/bench_utterance_export.py
+"""
+Eğitim datası export adımı: pydub ile segment segment export (eski yol) ile
+NumPy view + fade rampası + thread havuzu (yeni yol) karşılaştırması.
+Whisper yerine sahte segment listesi kullanılır; çıktı dosyaları birebir
+karşılaştırılır.
+
+Çalıştırma:  python -m benchmarks.bench_utterance_export --minutes 30
+"""
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+from pydub import AudioSegment
+
+from app.audio_preprocess import fade_gains, faded_parts, slice_ms, write_wav_parts
+
+
+def fake_segments(total_sec: float, rng: np.random.Generator):
+    segments, t = [], 0.0
+    while t < total_sec - 1.0:
+        dur = float(rng.uniform(0.8, 9.0))
+        end = min(t + dur, total_sec)
+        segments.append({"start": round(t, 2), "end": round(end, 2)})
+        t = end + float(rng.uniform(0.0, 0.6))
+    return segments
+
+
+def export_legacy(samples, sr, segments, out_dir: Path) -> None:
+    cleaned = AudioSegment(samples.tobytes(), sample_width=2, frame_rate=sr, channels=1)
+    for idx, seg in enumerate(segments, start=1):
+        if seg["end"] - seg["start"] < 1.5:
+            continue
+        audio_seg = cleaned[int(seg["start"] * 1000):int(seg["end"] * 1000)]
+        audio_seg = audio_seg.fade_in(10).fade_out(10)
+        audio_seg.export(out_dir / f"utt_{idx:04d}.wav", format="wav")
+
+
+def export_fast(samples, sr, segments, out_dir: Path, workers: int) -> None:
+    fade_in, fade_out = fade_gains(sr, 10, True), fade_gains(sr, 10, False)
+
+    def export(start_ms, end_ms, path):
+        write_wav_parts(faded_parts(slice_ms(samples, sr, start_ms, end_ms), fade_in, fade_out), sr, path)
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = [
+            ex.submit(export, int(seg["start"] * 1000), int(seg["end"] * 1000), out_dir / f"utt_{idx:04d}.wav")
+            for idx, seg in enumerate(segments, start=1)
+            if seg["end"] - seg["start"] >= 1.5
+        ]
+        for fut in futures:
+            fut.result()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=30.0)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    sr = 24000
+    rng = np.random.default_rng(0)
+    total_sec = args.minutes * 60
+    samples = (rng.standard_normal(int(total_sec * sr)) * 6000).clip(-32768, 32767).astype(np.int16)
+    segments = fake_segments(total_sec, rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_dir, fast_dir = Path(tmp) / "legacy", Path(tmp) / "fast"
+        legacy_dir.mkdir()
+        fast_dir.mkdir()
+
+        t0 = time.perf_counter()
+        export_legacy(samples, sr, segments, legacy_dir)
+        t_legacy = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        export_fast(samples, sr, segments, fast_dir, args.workers)
+        t_fast = time.perf_counter() - t0
+
+        names = sorted(p.name for p in legacy_dir.iterdir())
+        same = names == sorted(p.name for p in fast_dir.iterdir()) and all(
+            np.array_equal(
+                sf.read(legacy_dir / n, dtype="int16")[0],
+                sf.read(fast_dir / n, dtype="int16")[0],
+            )
+            for n in names
+        )
+
+    print()
+    print(f"  kayıt            : {args.minutes:.0f} dk, {len(names)} utterance")
+    print(f"  pydub (eski)     : {t_legacy * 1000:8.0f} ms")
+    print(f"  numpy (w={args.workers:<2})     : {t_fast * 1000:8.0f} ms")
+    print(f"  hızlanma         : x{t_legacy / t_fast:.1f}")
+    print(f"  çıktı aynı       : {same}")
+    if not same:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
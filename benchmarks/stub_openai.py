@@ -0,0 +1,147 @@
+# benchmarks/stub_openai.py
+"""
+OpenAI Responses API'sinin (POST /v1/responses) yerel taklidi.
+Gecikme ve hata oranı ayarlanabilir; metni "temizlenmiş" gibi geri döner.
+
+    with StubOpenAIServer(latency=0.3, error_rate=0.05) as stub:
+        client = OpenAI(base_url=stub.base_url, api_key="stub")
+"""
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_QUOTED_RE = re.compile(r'"""(.*?)"""', re.S)
+
+
+def _fake_clean_one(text: str) -> str:
+    text = text.strip()
+    if text and text[-1] not in ".!?":
+        text += "."
+    return text[:1].upper() + text[1:]
+
+
+def _fake_clean(prompt: str) -> str:
+    # Paketli istek: girdi (son satır) [{"id", "text"}, ...] JSON dizisi
+    try:
+        items = json.loads(prompt.rsplit("\n", 1)[-1])
+    except ValueError:
+        items = None
+    if isinstance(items, list) and all(isinstance(i, dict) and "id" in i for i in items):
+        return json.dumps(
+            [{"id": i["id"], "text": _fake_clean_one(i.get("text", ""))} for i in items],
+            ensure_ascii=False,
+        )
+
+    m = _QUOTED_RE.search(prompt)
+    return _fake_clean_one(m.group(1) if m else prompt)
+
+
+def _response_body(text: str, model: str, prompt: str) -> dict:
+    return {
+        "id": f"resp_{uuid.uuid4().hex}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": model,
+        "output": [
+            {
+                "type": "message",
+                "id": f"msg_{uuid.uuid4().hex}",
+                "status": "completed",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ],
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": len(prompt) // 3,
+            "output_tokens": len(text) // 3,
+            "total_tokens": (len(prompt) + len(text)) // 3,
+        },
+    }
+
+
+class StubOpenAIServer:
+    def __init__(
+        self,
+        latency: float = 0.2,
+        error_rate: float = 0.0,
+        responder=_fake_clean,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.responder = responder
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):  # sessiz
+                pass
+
+            def _send(self, code: int, payload: dict, headers: dict | None = None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", "0"))
+                req = json.loads(self.rfile.read(length) or b"{}")
+                with stub._lock:
+                    stub.requests += 1
+                time.sleep(stub.latency)
+
+                if self.path.rstrip("/") != "/v1/responses":
+                    self._send(404, {"error": {"message": "not found"}})
+                    return
+                if random.random() < stub.error_rate:
+                    with stub._lock:
+                        stub.errors += 1
+                    self._send(
+                        429,
+                        {"error": {"message": "rate limited", "type": "rate_limit"}},
+                        {"retry-after": "0.1"},
+                    )
+                    return
+
+                prompt = req.get("input", "")
+                if not isinstance(prompt, str):
+                    prompt = json.dumps(prompt, ensure_ascii=False)
+                if req.get("instructions"):
+                    prompt = f"{req['instructions']}\n{prompt}"
+                text = stub.responder(prompt)
+                self._send(200, _response_body(text, req.get("model", "stub"), prompt))
+
+        return Handler
+
+    def __enter__(self) -> "StubOpenAIServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
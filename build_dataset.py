@@ -1,28 +1,62 @@
 # build_dataset.py
+import argparse
 from pathlib import Path
 import uuid
 
-from app.config import RAW_SPEAKERS_DIR
+from app import metrics
+from app.config import DATASET_PACK_SHARDS, RAW_SPEAKERS_DIR
 from app.dataset_builder import build_training_dataset_for_person
+from app.dataset_scheduler import build_all_speakers
 
 
 def main():
-    # Burada speaker klasörünü manuel seçiyoruz
-    person_dir = RAW_SPEAKERS_DIR / "speaker_1"  # örnek
-    speaker_id = f"spk_{uuid.uuid4().hex[:8]}"
-
-    print(f"[INFO] Dataset üretimi başlıyor.")
-    print(f"  - Kişi klasörü : {person_dir}")
-    print(f"  - Speaker ID   : {speaker_id}")
-
-    metadata_path = build_training_dataset_for_person(
-        person_dir=person_dir,
-        speaker_id=speaker_id,
-        model_name="medium",   # istersen "small" ile başlarsın
-        language="tr",
-    )
-
-    print(f"[DONE] metadata.csv -> {metadata_path}")
+    parser = argparse.ArgumentParser(description="Whisper ile eğitim datası (metadata.csv + utt wav) üretir.")
+    parser.add_argument("--all", action="store_true",
+                        help="speakers/ altındaki tüm kişiler (değişmemiş olanlar atlanır)")
+    parser.add_argument("--speaker", default="speaker_1", help="tek kişi klasörü adı (--all yoksa)")
+    parser.add_argument("--model", default="medium", help='Whisper modeli (ör. "small")')
+    parser.add_argument("--language", default="tr")
+    parser.add_argument("--asr-workers", type=int, default=None, help="Whisper process sayısı")
+    parser.add_argument("--force", action="store_true", help="--all ile: değişmemiş kişileri de yeniden üret")
+    parser.add_argument("--report", type=Path, default=None, help="--all ile: JSON rapor yolu")
+    parser.add_argument("--shards", action="store_true", default=DATASET_PACK_SHARDS,
+                        help="metadata.csv yanında memmap'lenebilir shard paketi de yaz")
+    args = parser.parse_args()
+
+    if args.all:
+        results = build_all_speakers(
+            RAW_SPEAKERS_DIR,
+            model_name=args.model,
+            language=args.language,
+            asr_workers=args.asr_workers,
+            force=args.force,
+            report_path=args.report,
+            pack_shards=args.shards,
+        )
+        failed = [r.speaker_id for r in results if r.status == "failed"]
+        if failed:
+            print(f"[WARN] Üretilemeyen kişiler: {', '.join(failed)}")
+    else:
+        person_dir = RAW_SPEAKERS_DIR / args.speaker
+        speaker_id = f"spk_{uuid.uuid4().hex[:8]}"
+
+        print(f"[INFO] Dataset üretimi başlıyor.")
+        print(f"  - Kişi klasörü : {person_dir}")
+        print(f"  - Speaker ID   : {speaker_id}")
+
+        metadata_path = build_training_dataset_for_person(
+            person_dir=person_dir,
+            speaker_id=speaker_id,
+            model_name=args.model,
+            language=args.language,
+            asr_workers=args.asr_workers,
+            pack_shards=args.shards,
+        )
+
+        print(f"[DONE] metadata.csv -> {metadata_path}")
+
+    if metrics.is_enabled():
+        metrics.print_summary()
 
 
 if __name__ == "__main__":
@@ -1,12 +1,27 @@
 # clean_metadata.py
+import argparse
 from pathlib import Path
 
 from app.metadata_cleaner import clean_metadata_file
 
+
 def main():
-    # Burayı kendi speaker klasörüne göre ayarla
-    meta = Path("data/training_data/spk_bd53f4a2/metadata.csv")
-    clean_metadata_file(meta)
+    parser = argparse.ArgumentParser(description="metadata.csv metinlerini LLM ile temizler (.cleaned.csv yazar).")
+    # Varsayılanı kendi speaker klasörüne göre ayarla
+    parser.add_argument("metadata", type=Path, nargs="?",
+                        default=Path("data/training_data/spk_bd53f4a2/metadata.csv"))
+    parser.add_argument("--out", type=Path, default=None, help="çıktı yolu (varsayılan: <metadata>.cleaned.csv)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="eşzamanlı istek sayısı (varsayılan 8; --batched ile 1); 1 = eski sıralı mod")
+    parser.add_argument("--batched", action="store_true",
+                        help="istek başına birden çok satır gönder (sıralı, --concurrency 1 ile)")
+    args = parser.parse_args()
+
+    concurrency = args.concurrency if args.concurrency is not None else (1 if args.batched else 8)
+    if args.batched and concurrency > 1:
+        parser.error("--batched sadece --concurrency 1 ile kullanılabilir")
+    clean_metadata_file(args.metadata, args.out, concurrency=concurrency, batched=args.batched)
+
 
 if __name__ == "__main__":
     main()
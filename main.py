@@ -1,9 +1,36 @@
 # main.py
+import time
+
+_T_START = time.perf_counter()
+
 from pathlib import Path
 import sys
 
-from app.config import RAW_SPEAKERS_DIR
+from app import metrics
+from app.config import RAW_SPEAKERS_DIR, ensure_data_dirs
 from app.pipeline import enroll_from_person_folder, synthesize_with_voice
+from app.tts_engine import ensure_tts_loaded, is_tts_loaded, warm_up_tts
+
+_T_IMPORTED = time.perf_counter()
+
+
+class PhaseTimer:
+    """Başlangıç aşamalarının sürelerini toplar, en sonda özet basar."""
+
+    def __init__(self):
+        self.phases = [("import", _T_IMPORTED - _T_START)]
+        self._t = time.perf_counter()
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        self.phases.append((name, now - self._t))
+        self._t = now
+
+    def report(self) -> None:
+        print("Aşama süreleri:")
+        for name, sec in self.phases:
+            print(f"  - {name:<16}: {sec:6.2f} sn")
+        print(f"  - {'toplam':<16}: {time.perf_counter() - _T_START:6.2f} sn")
 
 
 def select_person_folder() -> Path:
@@ -44,10 +71,19 @@ def ask_text() -> str:
 
 
 def run_interactive():
+    timer = PhaseTimer()
+    ensure_data_dirs()
+
+    # TTS modeli, kullanıcı klasör seçip metin yazarken arka planda yüklenir
+    warm_up_tts()
+    print(f"[INFO] Hazır ({_T_IMPORTED - _T_START:.2f} sn). TTS modeli arka planda yükleniyor...\n")
+
     person_dir = select_person_folder()
+    timer.mark("klasör seçimi")
 
     print("\n>>> Enroll başlıyor...\n")
     profile = enroll_from_person_folder(person_dir)
+    timer.mark("enroll")
 
     print(f"Voice ID: {profile.voice_id}")
     print(f"Kişi klasörü: {profile.person_dir}")
@@ -59,6 +95,12 @@ def run_interactive():
     print()
 
     text = ask_text()
+    timer.mark("metin girişi")
+
+    if not is_tts_loaded():
+        print("[INFO] TTS modelinin yüklenmesi bekleniyor...")
+    ensure_tts_loaded()
+    timer.mark("model bekleme")
 
     print("\n>>> Sentez başlıyor...\n")
     out_path = synthesize_with_voice(
@@ -66,9 +108,13 @@ def run_interactive():
         text=text,
         language="tr",
     )
+    timer.mark("sentez")
 
     print(f"[✓] Çıktı dosyası hazır: {out_path}")
     print("Bu dosyayı bir medya oynatıcı ile açıp klonu dinleyebilirsin.\n")
+    timer.report()
+    if metrics.is_enabled():
+        metrics.print_summary()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,33 @@
+# pack_dataset.py
+import argparse
+from pathlib import Path
+
+from app.config import DATASET_SHARD_BYTES, DATASET_SHARD_DTYPE
+from app.dataset_shards import SHARD_DTYPES, export_shards, import_shards
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="metadata.csv + audio/ düzeni ile memmap'lenebilir shard paketi arasında çevirir."
+    )
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    exp = sub.add_parser("export", help="metadata.csv -> shards/")
+    exp.add_argument("metadata", type=Path, help="metadata.csv yolu")
+    exp.add_argument("--out", type=Path, default=None, help="varsayılan: metadata.csv yanında shards/")
+    exp.add_argument("--dtype", choices=SHARD_DTYPES, default=DATASET_SHARD_DTYPE)
+    exp.add_argument("--shard-mb", type=int, default=DATASET_SHARD_BYTES // 1024**2)
+
+    imp = sub.add_parser("import", help="shards/ -> metadata.csv + audio/")
+    imp.add_argument("shards", type=Path, help="index.json'ın bulunduğu klasör")
+    imp.add_argument("out", type=Path, help="metadata.csv ve audio/ buraya yazılır")
+
+    args = parser.parse_args()
+    if args.cmd == "export":
+        export_shards(args.metadata, args.out, dtype=args.dtype, shard_bytes=args.shard_mb * 1024**2)
+    else:
+        import_shards(args.shards, args.out)
+
+
+if __name__ == "__main__":
+    main()
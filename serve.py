@@ -0,0 +1,33 @@
+# serve.py
+import argparse
+import asyncio
+
+from app.config import ensure_data_dirs
+from app.service import FakeBackend, SynthesisService, serve_forever
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yerel sentez servisini başlat.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--fake", action="store_true", help="XTTS yerine sahte backend (test / yük testi)")
+    parser.add_argument("--queue-size", type=int, default=None)
+    parser.add_argument("--batch-max", type=int, default=None)
+    args = parser.parse_args()
+
+    ensure_data_dirs()
+    kwargs = {}
+    if args.queue_size is not None:
+        kwargs["queue_size"] = args.queue_size
+    if args.batch_max is not None:
+        kwargs["batch_max"] = args.batch_max
+    service = SynthesisService(backend=FakeBackend() if args.fake else None, **kwargs)
+
+    try:
+        asyncio.run(serve_forever(service, args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n[INFO] Servis durduruldu.")
+
+
+if __name__ == "__main__":
+    main()
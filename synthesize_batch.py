@@ -0,0 +1,37 @@
+# synthesize_batch.py
+import argparse
+from pathlib import Path
+
+from app.config import OUTPUTS_DIR
+from app.batch_synthesis import read_manifest, synthesize_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manifest'teki metinleri toplu okut.")
+    parser.add_argument("manifest", type=Path, help="voice_id|language|output_name|text satırları")
+    parser.add_argument("--out-dir", type=Path, default=OUTPUTS_DIR / "batch")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--no-resume", action="store_true", help="Journal'ı yok say, hepsini baştan üret")
+    args = parser.parse_args()
+
+    jobs = read_manifest(args.manifest)
+    print(f"[INFO] {len(jobs)} iş okundu: {args.manifest}")
+
+    report = synthesize_batch(
+        jobs,
+        out_dir=args.out_dir,
+        workers=args.workers,
+        resume=not args.no_resume,
+    )
+
+    print(f"[DONE] Çıktılar: {args.out_dir}")
+    print(f"  - render edilen : {report.rendered}")
+    print(f"  - kopya (dedupe): {report.deduplicated}")
+    print(f"  - önceden bitmiş: {report.resumed}")
+    print(f"  - hatalı        : {report.failed}")
+    print(f"  - süre          : {report.wall_sec:.1f} sn ({report.jobs_per_sec:.2f} iş/sn)")
+    print(f"  - üretilen ses  : {report.audio_sec:.1f} sn (RTF {report.real_time_factor:.2f})")
+
+
+if __name__ == "__main__":
+    main()